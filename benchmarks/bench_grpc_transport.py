@@ -0,0 +1,187 @@
+"""
+Latency benchmark of `query_points` over REST against gRPC.
+
+Without `--url` the benchmark starts a Qdrant stand-in in the same process, serving `query_points`
+over both REST and gRPC with fixed results after a fixed server delay, so only the transport and the
+serialization differ between the paths. With `--url` it queries a real Qdrant server, whose collection
+has to exist already, and REST is measured over HTTP/2 as well (the stand-in speaks HTTP/1.1 only).
+The clients are built from `ConnectionProfile`, like the server builds them.
+
+    python benchmarks/bench_grpc_transport.py --clients 1 8 32 --results 10
+    python benchmarks/bench_grpc_transport.py --url http://localhost:6333 --collection kararlar --dim 384
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import statistics
+import time
+from typing import List
+
+import grpc
+import uvicorn
+from qdrant_client import AsyncQdrantClient
+from qdrant_client import grpc as qdrant_grpc
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from mcp_server_qdrant.qdrant import RESULT_PAYLOAD_FIELDS, ConnectionProfile
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def result_payload(index: int, text_length: int) -> dict:
+    payload = {field: f"{field}-{index}" for field in RESULT_PAYLOAD_FIELDS}
+    payload["text"] = "yargıtay kararı " * (text_length // 16)
+    return payload
+
+
+class StandInPoints(qdrant_grpc.PointsServicer):
+    """gRPC stand-in of the Points service, answering `Query` only."""
+
+    def __init__(self, payloads: List[dict], delay: float):
+        self.delay = delay
+        self.response_points = [
+            qdrant_grpc.ScoredPoint(
+                id=qdrant_grpc.PointId(num=index),
+                score=1.0 - index / 100,
+                payload={key: qdrant_grpc.Value(string_value=value) for key, value in payload.items()},
+            )
+            for index, payload in enumerate(payloads)
+        ]
+
+    async def Query(self, request, context):
+        await asyncio.sleep(self.delay)
+        return qdrant_grpc.QueryResponse(result=self.response_points[: request.limit], time=self.delay)
+
+
+def rest_app(payloads: List[dict], delay: float) -> Starlette:
+    """REST stand-in of the Qdrant API, answering `query_points` only."""
+    points = [
+        {"id": index, "version": 0, "score": 1.0 - index / 100, "payload": payload}
+        for index, payload in enumerate(payloads)
+    ]
+
+    async def query_points(request: Request) -> Response:
+        body = json.loads(await request.body())
+        await asyncio.sleep(delay)
+        result = {"result": {"points": points[: body.get("limit", 10)]}, "status": "ok", "time": delay}
+        return Response(json.dumps(result), media_type="application/json")
+
+    return Starlette(routes=[Route("/collections/{name}/points/query", query_points, methods=["POST"])])
+
+
+async def start_stand_in(args) -> tuple:
+    payloads = [result_payload(index, args.text_length) for index in range(args.results)]
+    rest_port, grpc_port = free_port(), free_port()
+
+    grpc_server = grpc.aio.server()
+    qdrant_grpc.add_PointsServicer_to_server(StandInPoints(payloads, args.delay_ms / 1000), grpc_server)
+    grpc_server.add_insecure_port(f"127.0.0.1:{grpc_port}")
+    await grpc_server.start()
+
+    config = uvicorn.Config(
+        rest_app(payloads, args.delay_ms / 1000), host="127.0.0.1", port=rest_port, log_level="warning"
+    )
+    rest_server = uvicorn.Server(config)
+    rest_task = asyncio.create_task(rest_server.serve())
+    while not rest_server.started:
+        await asyncio.sleep(0.01)
+
+    async def stop():
+        rest_server.should_exit = True
+        await rest_task
+        await grpc_server.stop(None)
+
+    return f"http://127.0.0.1:{rest_port}", grpc_port, stop
+
+
+async def run_clients(client: AsyncQdrantClient, args, clients: int) -> dict:
+    latencies: List[float] = []
+    query = [random.random() for _ in range(args.dim)]
+
+    async def query_points():
+        await client.query_points(
+            collection_name=args.collection, query=query, limit=args.results, with_payload=True
+        )
+
+    async def run_client():
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            await query_points()
+            latencies.append(time.perf_counter() - started)
+
+    # Open the connections before measuring
+    await query_points()
+    started = time.perf_counter()
+    await asyncio.gather(*[run_client() for _ in range(clients)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "qps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="URL of a real Qdrant server, instead of the stand-in")
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--collection", default="bench")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Queries sent by every client")
+    parser.add_argument("--results", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--text-length", type=int, default=1000, help="Characters of the stand-in texts")
+    parser.add_argument("--delay-ms", type=float, default=1.0, help="Search time of the stand-in")
+    parser.add_argument("--pool-size", type=int, default=None)
+    parser.add_argument("--keepalive", type=float, default=30.0)
+    args = parser.parse_args()
+
+    # The request logs of httpx would dominate the measurements
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    stop = None
+    url, grpc_port = args.url, args.grpc_port
+    if url is None:
+        url, grpc_port, stop = await start_stand_in(args)
+
+    profiles = {
+        "rest": ConnectionProfile(pool_size=args.pool_size, keepalive=args.keepalive),
+        "grpc": ConnectionProfile(
+            prefer_grpc=True, grpc_port=grpc_port, pool_size=args.pool_size, keepalive=args.keepalive
+        ),
+    }
+    if stop is None:
+        profiles["rest-http2"] = ConnectionProfile(pool_size=args.pool_size, keepalive=args.keepalive, http2=True)
+    try:
+        print(f"{'clients':>8} {'transport':>11} {'qps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for clients in args.clients:
+            for name, profile in profiles.items():
+                client = AsyncQdrantClient(url=url, check_compatibility=False, **profile.client_kwargs())
+                try:
+                    result = await run_clients(client, args, clients)
+                finally:
+                    await client.close()
+                print(
+                    f"{clients:>8} {name:>11} {result['qps']:>10.1f} "
+                    f"{result['p50']:>9.2f} {result['p95']:>9.2f} {result['p99']:>9.2f}"
+                )
+    finally:
+        if stop is not None:
+            await stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Memory/latency benchmark of the embedding representations used for bulk ingestion.
+
+The `list` path is what the providers returned before: every embedding converted with `.tolist()`
+into a list of boxed Python floats. The `ndarray` path keeps the batch as one contiguous float32
+array from the provider to the connector, and converts it once when the points are built.
+Model outputs are simulated with random float32 rows, as FastEmbed yields them.
+
+    python benchmarks/bench_ndarray_ingestion.py --documents 10000 --dim 384
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from typing import Callable, List
+
+import numpy as np
+from qdrant_client import models
+
+from mcp_server_qdrant.embeddings.base import as_embedding_array
+
+
+def provider_list_path(rows: List[np.ndarray]):
+    return [row.tolist() for row in rows]
+
+
+def provider_ndarray_path(rows: List[np.ndarray]):
+    return as_embedding_array(rows)
+
+
+def points_from_lists(embeddings) -> List[models.PointStruct]:
+    return [models.PointStruct(id=uuid.uuid4().hex, vector=vector, payload={}) for vector in embeddings]
+
+
+def points_from_array(embeddings) -> List[models.PointStruct]:
+    return points_from_lists(embeddings.tolist())
+
+
+def ingest(provider_path: Callable, build_points: Callable, batches: List[List[np.ndarray]]) -> int:
+    """Embed and build the points batch by batch, like the store_batch pipeline does."""
+    count = 0
+    for batch in batches:
+        points = build_points(provider_path(batch))
+        count += len(points)
+    return count
+
+
+def traced_peak(fn: Callable) -> tuple:
+    """Return the result and the peak of the traced allocations in bytes."""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    model_output = rng.random((args.documents, args.dim), dtype=np.float32)
+    batches = [
+        list(model_output[start : start + args.batch_size])
+        for start in range(0, args.documents, args.batch_size)
+    ]
+
+    paths = {
+        "list": (provider_list_path, points_from_lists),
+        "ndarray": (provider_ndarray_path, points_from_array),
+    }
+    print(f"{args.documents} documents, {args.dim} dimensions, batches of {args.batch_size}")
+    print(f"{'path':>8} {'provider ms':>12} {'held MiB':>9} {'ingest ms':>10} {'peak MiB':>9}")
+    for name, (provider_path, build_points) in paths.items():
+        # Embeddings returned by the provider for the whole corpus, as held by queued batches
+        started = time.perf_counter()
+        embeddings = [provider_path(batch) for batch in batches]
+        provider_elapsed = time.perf_counter() - started
+        _, held = traced_peak(lambda: [provider_path(batch) for batch in batches])
+        del embeddings
+
+        # Provider output to upsert-ready points, one batch at a time
+        started = time.perf_counter()
+        ingest(provider_path, build_points, batches)
+        ingest_elapsed = time.perf_counter() - started
+        _, peak = traced_peak(lambda: ingest(provider_path, build_points, batches))
+        print(
+            f"{name:>8} {provider_elapsed * 1000:>12.1f} {held / 2**20:>9.1f} "
+            f"{ingest_elapsed * 1000:>10.1f} {peak / 2**20:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Latency/throughput benchmark of the query micro-batching against one model run per query.
+
+Every client sends queries one after another, all the clients run concurrently, like SSE clients
+calling qdrant-find at the same time. The `fastembed` mode uses the real FastEmbedProvider, the
+`synthetic` mode uses a model stand-in with a fixed cost per run and a smaller cost per query, so the
+benchmark can run without downloading a model.
+
+    python benchmarks/bench_query_batching.py --mode fastembed --clients 1 8 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from typing import Awaitable, Callable, List
+
+from mcp_server_qdrant.embeddings.batching import MicroBatcher
+
+
+class SyntheticModel:
+    """
+    Model stand-in, whose runs are serialized like a single inference session using all the cores.
+    """
+
+    def __init__(self, run_overhead: float, per_query: float, dim: int = 384):
+        self.run_overhead = run_overhead
+        self.per_query = per_query
+        self.dim = dim
+        self._lock = threading.Lock()
+
+    def query_embed(self, queries: List[str]) -> List[List[float]]:
+        with self._lock:
+            time.sleep(self.run_overhead + self.per_query * len(queries))
+        return [[float(len(query))] * self.dim for query in queries]
+
+
+def synthetic_targets(args) -> dict:
+    model = SyntheticModel(args.run_overhead_ms / 1000, args.per_query_ms / 1000)
+
+    async def embed_queries(queries: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, model.query_embed, queries)
+
+    async def per_call(query: str) -> List[float]:
+        return (await embed_queries([query]))[0]
+
+    batcher = MicroBatcher(
+        embed_queries, max_batch_size=args.batch_size, max_wait=args.window_ms / 1000
+    )
+    return {"per-call": per_call, "micro-batched": batcher.submit}
+
+
+def fastembed_targets(args) -> dict:
+    from mcp_server_qdrant.embeddings.fastembed import FastEmbedProvider
+
+    per_call = FastEmbedProvider(args.model)
+    batched = FastEmbedProvider(
+        args.model,
+        query_batch_window=args.window_ms / 1000,
+        query_batch_size=args.batch_size,
+    )
+    return {"per-call": per_call.embed_query, "micro-batched": batched.embed_query}
+
+
+async def run_clients(
+    embed_query: Callable[[str], Awaitable[List[float]]], clients: int, requests: int
+) -> dict:
+    latencies: List[float] = []
+
+    async def client(client_id: int):
+        for i in range(requests):
+            started = time.perf_counter()
+            await embed_query(f"yargıtay kararı {client_id} {i}")
+            latencies.append(time.perf_counter() - started)
+
+    # Warm up the model and the thread pool
+    await embed_query("warm up")
+    started = time.perf_counter()
+    await asyncio.gather(*[client(client_id) for client_id in range(clients)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "qps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["synthetic", "fastembed"], default="synthetic")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=50, help="Queries sent by every client")
+    parser.add_argument("--window-ms", type=float, default=3.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--run-overhead-ms", type=float, default=4.0)
+    parser.add_argument("--per-query-ms", type=float, default=0.3)
+    args = parser.parse_args()
+
+    targets = synthetic_targets(args) if args.mode == "synthetic" else fastembed_targets(args)
+
+    print(f"{'clients':>8} {'path':>14} {'qps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for clients in args.clients:
+        for name, embed_query in targets.items():
+            result = await run_clients(embed_query, clients, args.requests)
+            print(
+                f"{clients:>8} {name:>14} {result['qps']:>10.1f} "
+                f"{result['p50']:>9.2f} {result['p95']:>9.2f} {result['p99']:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
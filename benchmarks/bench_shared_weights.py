@@ -0,0 +1,104 @@
+"""
+Memory and startup benchmark of FastEmbed models loaded with private or shared weights.
+
+Starts 1, 2 and 4 worker processes loading the same model, like the workers of
+`mcp-server-qdrant --workers N`, once with the weights deserialized into every process and once with
+the weights memory-mapped from the shared copy in the cache directory. Reports the startup time of
+the workers (loading the model and embedding a first query), the time to embed a batch of queries,
+and the memory of all the workers: RSS counts the shared pages in every process, PSS splits them
+between the processes sharing them, so the PSS total is the physical memory used. Linux only.
+
+    python benchmarks/bench_shared_weights.py --model sentence-transformers/all-MiniLM-L6-v2 --workers 1 2 4
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+
+def memory(pid: int) -> Dict[str, int]:
+    """Read the RSS and PSS of a process in MiB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            key, *rest = line.split()
+            if key in ("Rss:", "Pss:"):
+                values[key.rstrip(":")] = int(rest[0]) // 1024
+    return values
+
+
+def worker(model_name: str, cache_dir: str, shared_weights: bool, batch_size: int, ready, stop):
+    started = time.perf_counter()
+    from mcp_server_qdrant.embeddings.fastembed import load_model
+
+    model = load_model(model_name, cache_dir, shared_weights)
+    list(model.query_embed(["yargıtay kararı"]))
+    startup = time.perf_counter() - started
+
+    queries = [f"tapu iptali ve tescil davası {i}" for i in range(batch_size)]
+    timings = []
+    for _ in range(5):
+        embed_started = time.perf_counter()
+        list(model.query_embed(queries))
+        timings.append(time.perf_counter() - embed_started)
+    ready.put((startup, statistics.median(timings)))
+    stop.wait()
+
+
+def run(model_name: str, cache_dir: str, shared_weights: bool, workers: int, batch_size: int) -> Tuple:
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    stop = context.Event()
+    processes = [
+        context.Process(target=worker, args=(model_name, cache_dir, shared_weights, batch_size, ready, stop))
+        for _ in range(workers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    results: List[Tuple[float, float]] = [ready.get() for _ in processes]
+    all_ready = time.perf_counter() - started
+    memories = [memory(process.pid) for process in processes]
+    stop.set()
+    for process in processes:
+        process.join()
+    return (
+        all_ready,
+        statistics.mean(startup for startup, _ in results),
+        statistics.mean(embed for _, embed in results),
+        sum(m["Rss"] for m in memories),
+        sum(m["Pss"] for m in memories),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--cache-dir", default=None, help="FastEmbed cache directory, FastEmbed's default if not set")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=32, help="Queries of the timed batches")
+    args = parser.parse_args()
+
+    # Download and export the model first, so the runs only load it
+    for shared_weights in (False, True):
+        run(args.model, args.cache_dir, shared_weights, 1, 1)
+
+    print(
+        f"{'workers':>8} {'weights':>8} {'all ready s':>12} {'startup s':>10} {'embed ms':>9} "
+        f"{'RSS MiB':>8} {'PSS MiB':>8}"
+    )
+    for workers in args.workers:
+        for shared_weights in (False, True):
+            all_ready, startup, embed, rss, pss = run(
+                args.model, args.cache_dir, shared_weights, workers, args.batch_size
+            )
+            print(
+                f"{workers:>8} {'shared' if shared_weights else 'private':>8} {all_ready:>12.2f} "
+                f"{startup:>10.2f} {embed * 1000:>9.1f} {rss:>8} {pss:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,22 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 
+import numpy as np
+import numpy.typing as npt
+from qdrant_client import models
+
+
+def as_embedding_array(vectors: npt.ArrayLike) -> np.ndarray:
+    """
+    Convert vectors into a contiguous float32 array of shape (number of vectors, vector size).
+    Arrays which already have this layout are returned without a copy.
+    """
+    array = np.ascontiguousarray(vectors, dtype=np.float32)
+    if array.ndim == 1:
+        array = array.reshape(1, -1)
+    return array
+
 
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
@@ -19,3 +35,66 @@ class EmbeddingProvider(ABC):
     def get_vector_size(self) -> int:
         """Get the size of the vector for the Qdrant collection."""
         pass
+
+    async def resolve_vector_size(self) -> int:
+        """
+        Get the size of the vector for the Qdrant collection, from the event loop. Providers loading their
+        model lazily should override it, to wait for the model instead of loading it on the loop.
+        """
+        return self.get_vector_size()
+
+    def get_vector_name(self) -> str:
+        """
+        Get the name of the vector for the Qdrant collection. Collections may hold the vectors of several models,
+        each one under its own name.
+        """
+        model_name = getattr(self, "model_name", type(self).__name__)
+        return model_name.split("/")[-1].lower()
+
+    async def embed_documents_array(self, documents: List[str]) -> np.ndarray:
+        """
+        Embed a list of documents into a contiguous float32 array of shape (len(documents), vector size).
+        Providers backed by numpy models should override it, to skip the conversion to Python floats.
+        """
+        return as_embedding_array(await self.embed_documents(documents))
+
+    async def embed_query_array(self, query: str) -> np.ndarray:
+        """
+        Embed a query into a float32 array of shape (vector size,).
+        Providers backed by numpy models should override it, to skip the conversion to Python floats.
+        """
+        return as_embedding_array(await self.embed_query(query))[0]
+
+    async def embed_queries_array(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several queries into a contiguous float32 array of shape (len(queries), vector size).
+        Providers able to embed the queries in a single model run should override it.
+        """
+        embeddings = await asyncio.gather(*(self.embed_query_array(query) for query in queries))
+        return as_embedding_array(embeddings)
+
+
+class SparseEmbeddingProvider(ABC):
+    """
+    Abstract base class for sparse embedding providers, e.g. BM25 or SPLADE, which capture exact terms
+    the dense embeddings miss.
+    """
+
+    @abstractmethod
+    async def embed_documents(self, documents: List[str]) -> List[models.SparseVector]:
+        """Embed a list of documents into sparse vectors."""
+        pass
+
+    @abstractmethod
+    async def embed_query(self, query: str) -> models.SparseVector:
+        """Embed a query into a sparse vector."""
+        pass
+
+    @abstractmethod
+    def get_vector_name(self) -> str:
+        """Get the name of the sparse vector for the Qdrant collection."""
+        pass
+
+    def requires_idf(self) -> bool:
+        """Whether Qdrant has to weight the sparse vectors with the inverse document frequency, as for BM25."""
+        return False
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+from mcp_server_qdrant.logger import get_logger
+from mcp_server_qdrant.metrics import BATCH_SIZE, current_tool
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Coalesces concurrent single-item calls into batched calls. Items submitted within `max_wait` seconds
+    of the first pending item, or until `max_batch_size` items are pending, are processed with one call of
+    `process_batch`, and every caller gets the result for its own item.
+    :param process_batch: The coroutine function processing a batch, returning one result per item.
+    :param max_batch_size: The maximum number of items in a single batch.
+    :param max_wait: The maximum number of seconds an item waits for other items to join its batch.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.003,
+    ):
+        assert max_batch_size > 0
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """
+        Submit an item to be processed in the next batch.
+        :param item: The item to process.
+        :return: The result for the item.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference, so the task is not garbage collected while running
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, asyncio.Future]]):
+        logger.debug("Processing micro-batch of %s items", len(batch))
+        BATCH_SIZE.labels(current_tool.get(), "micro_batch").observe(len(batch))
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Expected {len(batch)} results, got {len(results)}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            # The caller may have been cancelled in the meantime
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,187 @@
+import asyncio
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, as_embedding_array
+from mcp_server_qdrant.logger import get_logger
+from mcp_server_qdrant.metrics import record_cache
+
+logger = get_logger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query, so queries differing only in whitespace or unicode composition share a cache entry.
+    """
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """
+    Embedding provider wrapper caching the query embeddings of another provider.
+    The cache is a bounded LRU, whose entries expire after `ttl` seconds.
+    Documents are not cached, as they are usually embedded only once.
+    :param provider: The embedding provider to cache the queries of.
+    :param max_entries: The maximum number of cached queries.
+    :param ttl: The number of seconds a cached embedding is valid for.
+    :param max_bytes: The approximate memory limit of the cached embeddings.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        max_entries: int = 1024,
+        ttl: float = 3600.0,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.provider = provider
+        self.model_name = getattr(provider, "model_name", type(provider).__name__)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size_bytes = 0
+        self._cache: OrderedDict[Tuple[str, str], Tuple[float, np.ndarray]] = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def embed_documents(self, documents: List[str]) -> List[List[float]]:
+        """Embed a list of documents into vectors."""
+        return await self.provider.embed_documents(documents)
+
+    async def embed_documents_array(self, documents: List[str]) -> np.ndarray:
+        """Embed a list of documents into a contiguous float32 array."""
+        return await self.provider.embed_documents_array(documents)
+
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a query into a vector, reusing the cached embedding if there is one."""
+        return (await self.embed_query_array(query)).tolist()
+
+    async def embed_query_array(self, query: str) -> np.ndarray:
+        """
+        Embed a query into a float32 array, reusing the cached embedding if there is one.
+        The cached arrays are shared between the callers and are read-only.
+        """
+        key = (self.model_name, normalize_query(query))
+        embedding = self._get(query)
+        if embedding is not None:
+            return embedding
+
+        # Concurrent misses for the same query share a single model call
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.hits += 1
+            record_cache("embedding", hit=True)
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        record_cache("embedding", hit=False)
+        # The model call runs in its own task, so cancelling the caller which started it does not cancel
+        # the call for the callers waiting on it
+        task = asyncio.ensure_future(self._embed_and_cache(key, query))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finish_in_flight(key, done))
+        return await asyncio.shield(task)
+
+    async def _embed_and_cache(self, key: Tuple[str, str], query: str) -> np.ndarray:
+        embedding = np.array(await self.provider.embed_query_array(query), dtype=np.float32)
+        embedding.flags.writeable = False
+        self._put(key, embedding)
+        return embedding
+
+    def _finish_in_flight(self, key: Tuple[str, str], task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved, in case all the callers got cancelled meanwhile
+        if not task.cancelled():
+            task.exception()
+
+    async def embed_queries_array(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several queries into a contiguous float32 array. The queries missing in the cache are embedded
+        with a single call of the provider.
+        """
+        cached: List[Optional[np.ndarray]] = [self._get(query) for query in queries]
+        missing = list(dict.fromkeys(query for query, embedding in zip(queries, cached) if embedding is None))
+        computed_by_query: Dict[str, np.ndarray] = {}
+        if missing:
+            self.misses += len(missing)
+            record_cache("embedding", hit=False, count=len(missing))
+            computed = as_embedding_array(await self.provider.embed_queries_array(missing))
+            for query, embedding in zip(missing, computed):
+                embedding = np.array(embedding)
+                embedding.flags.writeable = False
+                self._put((self.model_name, normalize_query(query)), embedding)
+            computed_by_query = dict(zip(missing, computed))
+        return as_embedding_array(
+            [
+                embedding if embedding is not None else computed_by_query[query]
+                for query, embedding in zip(queries, cached)
+            ]
+        )
+
+    def get_vector_size(self) -> int:
+        """Get the size of the vector for the Qdrant collection."""
+        return self.provider.get_vector_size()
+
+    def get_vector_name(self) -> str:
+        """Get the name of the vector for the Qdrant collection."""
+        return self.provider.get_vector_name()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the statistics of the cache.
+        :return: The number of hits, misses, cached entries, the approximate size and the hit rate.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._cache),
+            "size_bytes": self._size_bytes,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def clear(self):
+        """Remove all the cached embeddings."""
+        self._cache.clear()
+        self._size_bytes = 0
+
+    def _get(self, query: str) -> Optional[np.ndarray]:
+        key = (self.model_name, normalize_query(query))
+        cached = self._cache.get(key)
+        if cached is None:
+            return None
+        expires_at, embedding = cached
+        if time.monotonic() >= expires_at:
+            self._evict(key)
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        record_cache("embedding", hit=True)
+        return embedding
+
+    def _put(self, key: Tuple[str, str], embedding: np.ndarray):
+        size = self._entry_size(key, embedding)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        if key in self._cache:
+            self._evict(key)
+        self._cache[key] = (time.monotonic() + self.ttl, embedding)
+        self._size_bytes += size
+        while len(self._cache) > self.max_entries or self._size_bytes > self.max_bytes:
+            oldest_key = next(iter(self._cache))
+            self._evict(oldest_key)
+        logger.debug("Cached query embedding. Entries: %s, Size: %s", len(self._cache), self._size_bytes)
+
+    def _evict(self, key: Tuple[str, str]):
+        _, embedding = self._cache.pop(key)
+        self._size_bytes -= self._entry_size(key, embedding)
+
+    @staticmethod
+    def _entry_size(key: Tuple[str, str], embedding: np.ndarray) -> int:
+        return embedding.nbytes + len(key[1])
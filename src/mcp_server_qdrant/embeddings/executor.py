@@ -0,0 +1,141 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from mcp_server_qdrant.logger import get_logger
+from mcp_server_qdrant.metrics import EXECUTOR_QUEUE_DEPTH, EXECUTOR_WAIT
+
+logger = get_logger(__name__)
+
+R = TypeVar("R")
+
+THREAD_MODE = "thread"
+PROCESS_MODE = "process"
+
+
+def available_cores() -> int:
+    """
+    Get the number of cores the current process is allowed to run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _timed_call(fn: Callable[..., R], args: Tuple[Any, ...]) -> Tuple[float, R]:
+    # Module-level, so it can be pickled for the process pool
+    started_at = time.monotonic()
+    return started_at, fn(*args)
+
+
+class EmbeddingExecutor:
+    """
+    Executor dedicated to the CPU-bound embedding work of a provider. At most `max_workers` tasks run at
+    once and at most `max_queue_size` tasks wait for a worker, further callers are suspended until there
+    is a free slot, so a burst of requests does not oversubscribe the cores.
+    In the process mode the tasks run in separate processes, which sidesteps the GIL. The functions and
+    their arguments must be picklable then.
+    :param max_workers: The number of workers, defaults to the number of available cores.
+    :param max_queue_size: The number of tasks allowed to wait for a worker, defaults to `max_workers`.
+    :param mode: Either "thread" or "process".
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        mode: str = THREAD_MODE,
+    ):
+        self.max_workers = max_workers or available_cores()
+        self.max_queue_size = max_queue_size if max_queue_size is not None else self.max_workers
+        self.mode = mode
+        self._executor = self._create_executor()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._queued = 0
+        self._completed = 0
+        self._started = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _create_executor(self) -> Executor:
+        if self.mode == THREAD_MODE:
+            return ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="embedding"
+            )
+        elif self.mode == PROCESS_MODE:
+            # Forking a process with running inference threads is not safe
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        raise ValueError(f"Unsupported embedding executor mode: {self.mode}")
+
+    async def run(self, fn: Callable[..., R], *args: Any) -> R:
+        """
+        Run a function in the executor, waiting for a free slot first.
+        :param fn: The function to run.
+        :param args: The positional arguments of the function.
+        :return: The result of the function.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue_size)
+        submitted_at = time.monotonic()
+        queue_depth = EXECUTOR_QUEUE_DEPTH.labels(self.mode)
+        queue_depth.inc()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            queue_depth.dec()
+            raise
+        finally:
+            self._waiting -= 1
+        try:
+            self._queued += 1
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, _timed_call, fn, args)
+            started_at, result = await future
+            self._record_wait(started_at - submitted_at)
+            return result
+        finally:
+            self._queued -= 1
+            self._completed += 1
+            queue_depth.dec()
+            self._slots.release()
+
+    def _record_wait(self, wait: float):
+        self._started += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        EXECUTOR_WAIT.labels(self.mode).observe(wait)
+        logger.debug("Embedding task waited %.2f ms for a worker", wait * 1000)
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of tasks submitted to the executor or waiting for a slot, which are not finished yet.
+        """
+        return self._waiting + self._queued
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the statistics of the executor.
+        :return: The current queue depth, the number of completed tasks, the mean and max wait time in seconds.
+        """
+        return {
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "mean_wait_seconds": self._total_wait / self._started if self._started else 0.0,
+            "max_wait_seconds": self._max_wait,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shut the workers down.
+        :param wait: Whether to wait for the running tasks to finish.
+        """
+        self._executor.shutdown(wait=wait)
@@ -1,25 +1,177 @@
-from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from typing import Optional
+
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, SparseEmbeddingProvider
+from mcp_server_qdrant.embeddings.executor import EmbeddingExecutor
 from mcp_server_qdrant.embeddings.types import EmbeddingProviderType
+from mcp_server_qdrant.resilience import Resilience, ResiliencePolicy
 from mcp_server_qdrant.settings import EmbeddingProviderSettings
 
 
-def create_embedding_provider(settings: EmbeddingProviderSettings) -> EmbeddingProvider:
+def create_embedding_provider(
+    settings: EmbeddingProviderSettings,
+    resilience: Optional[Resilience] = None,
+    executor: Optional[EmbeddingExecutor] = None,
+) -> EmbeddingProvider:
     """
-    Create an embedding provider based on the specified type.
+    Create an embedding provider based on the specified type. The provider is wrapped with retries and a
+    circuit breaker, and with a query embedding cache, unless the cache is disabled.
     :param settings: The settings for the embedding provider.
+    :param resilience: The retry and circuit breaker state of the provider, optional. If not provided, it is
+                       created from the settings.
+    :param executor: The executor running the local models, optional. If not provided, it is created from
+                     the settings.
     :return: An instance of the specified embedding provider.
     """
+    from mcp_server_qdrant.embeddings.resilient import ResilientEmbeddingProvider
+
+    provider = ResilientEmbeddingProvider(
+        _create_base_embedding_provider(settings, executor),
+        resilience or create_embedding_resilience(settings),
+    )
+    if settings.query_cache_size > 0:
+        from mcp_server_qdrant.embeddings.cached import CachedEmbeddingProvider
+
+        return CachedEmbeddingProvider(
+            provider,
+            max_entries=settings.query_cache_size,
+            ttl=settings.query_cache_ttl,
+            max_bytes=settings.query_cache_max_bytes,
+        )
+    return provider
+
+
+def create_embedding_resilience(settings: EmbeddingProviderSettings) -> Resilience:
+    """
+    Create the retry and circuit breaker state of the embedding provider.
+    :param settings: The settings for the embedding provider.
+    """
+    return Resilience(
+        "embedding",
+        ResiliencePolicy(
+            retry_attempts=settings.retry_attempts,
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_timeout=settings.circuit_reset_timeout,
+        ),
+    )
+
+
+def create_sparse_embedding_provider(
+    settings: EmbeddingProviderSettings, executor: Optional[EmbeddingExecutor] = None
+) -> Optional[SparseEmbeddingProvider]:
+    """
+    Create the sparse embedding provider used next to the dense one, if a sparse model is configured.
+    Sparse models are served by FastEmbed.
+    :param settings: The settings for the embedding provider.
+    :param executor: The executor running the model, optional. It should be the one of the dense provider,
+                     so both models share the cores. If not provided, it is created from the settings.
+    :return: The sparse embedding provider, or None if hybrid search is disabled.
+    """
+    if not settings.sparse_model_name:
+        return None
+    from mcp_server_qdrant.embeddings.fastembed import FastEmbedSparseProvider
+
+    return FastEmbedSparseProvider(
+        settings.sparse_model_name,
+        executor=executor or create_embedding_executor(settings),
+        cache_dir=settings.cache_dir,
+    )
+
+
+def get_sparse_vector_name(settings: EmbeddingProviderSettings) -> str:
+    """
+    Get the name of the sparse vector, without creating the sparse provider.
+    :param settings: The settings for the embedding provider, with a sparse model.
+    """
+    assert settings.sparse_model_name is not None
+    return f"fast-sparse-{settings.sparse_model_name.split('/')[-1].lower()}"
+
+
+def sparse_requires_idf(settings: EmbeddingProviderSettings) -> bool:
+    """
+    Whether the sparse vectors have to be weighted with the inverse document frequency, as for BM25, from
+    the description of the sparse model.
+    :param settings: The settings for the embedding provider, with a sparse model.
+    """
+    assert settings.sparse_model_name is not None
+    from fastembed import SparseTextEmbedding
+
+    for model in SparseTextEmbedding.list_supported_models():
+        if model["model"].lower() == settings.sparse_model_name.lower():
+            return bool(model["requires_idf"])
+    raise ValueError(f"Sparse model {settings.sparse_model_name} is not supported by FastEmbed")
+
+
+def get_vector_name(settings: EmbeddingProviderSettings) -> str:
+    """
+    Get the name of the vector the embeddings are stored under, without creating the provider.
+    :param settings: The settings for the embedding provider.
+    :return: The configured vector name, or the one the provider would suggest.
+    """
+    if settings.vector_name:
+        return settings.vector_name
+    model_name = settings.model_name.split("/")[-1].lower()
+    if settings.provider_type == EmbeddingProviderType.FASTEMBED:
+        return f"fast-{model_name}"
+    return model_name
+
+
+def get_vector_size(settings: EmbeddingProviderSettings) -> Optional[int]:
+    """
+    Get the size of the embeddings without loading the model, from the settings or, for FastEmbed, from the
+    description of the model.
+    :param settings: The settings for the embedding provider.
+    :return: The vector size, or None if it is only known once the model is loaded.
+    """
+    if settings.vector_size is not None:
+        return settings.vector_size
+    if settings.provider_type == EmbeddingProviderType.FASTEMBED:
+        from fastembed import TextEmbedding
+
+        for model in TextEmbedding.list_supported_models():
+            if model["model"].lower() == settings.model_name.lower():
+                return model["dim"]
+    return None
+
+
+def _create_base_embedding_provider(
+    settings: EmbeddingProviderSettings, executor: Optional[EmbeddingExecutor]
+) -> EmbeddingProvider:
     if settings.provider_type == EmbeddingProviderType.FASTEMBED:
         from mcp_server_qdrant.embeddings.fastembed import FastEmbedProvider
 
-        return FastEmbedProvider(settings.model_name)
+        return FastEmbedProvider(
+            settings.model_name,
+            query_batch_window=settings.query_batch_window_ms / 1000,
+            query_batch_size=settings.query_batch_size,
+            executor=executor or create_embedding_executor(settings),
+            cache_dir=settings.cache_dir,
+            shared_weights=settings.shared_weights,
+        )
     elif settings.provider_type == EmbeddingProviderType.SENTENCE_TRANSFORMERS:
         from mcp_server_qdrant.embeddings.sentence_transformens import SentenceTransformersProvider
 
-        return SentenceTransformersProvider(settings.model_name)
+        return SentenceTransformersProvider(
+            settings.model_name,
+            query_batch_window=settings.query_batch_window_ms / 1000,
+            query_batch_size=settings.query_batch_size,
+            executor=executor or create_embedding_executor(settings),
+            cache_dir=settings.cache_dir,
+        )
     elif settings.provider_type == EmbeddingProviderType.GEMINI_TRANSFORMER:
         from mcp_server_qdrant.embeddings.gemini_transformer import GeminiTransformerProvider
 
         return GeminiTransformerProvider(settings.model_name)
     else:
         raise ValueError(f"Unsupported embedding provider: {settings.provider_type}")
+
+
+def create_embedding_executor(settings: EmbeddingProviderSettings) -> EmbeddingExecutor:
+    """
+    Create the executor running the local embedding models, bounded to the configured number of workers.
+    :param settings: The settings for the embedding provider.
+    """
+    return EmbeddingExecutor(
+        max_workers=settings.executor_workers or None,
+        max_queue_size=settings.executor_queue_size,
+        mode=settings.executor_mode,
+    )
@@ -1,70 +1,198 @@
-import asyncio
-from typing import List
-from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple, Type
+import numpy as np
+from mcp_server_qdrant.embeddings.base import (
+    EmbeddingProvider,
+    SparseEmbeddingProvider,
+    as_embedding_array,
+)
+from mcp_server_qdrant.embeddings.batching import MicroBatcher
+from mcp_server_qdrant.embeddings.executor import EmbeddingExecutor
+from mcp_server_qdrant.embeddings.shared_weights import (
+    configure_shared_session,
+    export_shared_model,
+    is_shared_session,
+    shared_model_dir,
+)
 from mcp_server_qdrant.logger import get_logger
-from fastembed import TextEmbedding
-from fastembed.common.model_description import DenseModelDescription
-import logging
-import os
-import sys
-
-LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-
-def get_logger(name):
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        # File handler
-        log_file = os.path.join(LOG_DIR, f"{name.replace('.', '_')}.log")
-        file_handler = logging.FileHandler(log_file)
-        file_formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-        
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-        
-        logger.setLevel(logging.INFO)
-    return logger
+from fastembed import SparseTextEmbedding, TextEmbedding
+from fastembed.common.model_description import DenseModelDescription, SparseModelDescription
+from fastembed.common.utils import define_cache_dir
+from fastembed.text.text_embedding_base import TextEmbeddingBase
+from qdrant_client import models
 
 logger = get_logger(__name__)
 
+
+@lru_cache(maxsize=None)
+def load_model(model_name: str, cache_dir: Optional[str] = None, shared_weights: bool = False) -> TextEmbeddingBase:
+    """
+    Load a FastEmbed model once per process. The worker processes of the process executor load their own copy
+    on the first call.
+    :param model_name: The name of the model.
+    :param cache_dir: The directory the model is downloaded to, FastEmbed's default if not provided.
+    :param shared_weights: Whether to memory-map the weights of the model, so the processes loading it share
+                           a single copy.
+    """
+    if shared_weights:
+        return _load_shared_model(model_name, cache_dir)
+    return TextEmbedding(model_name, cache_dir=cache_dir)
+
+
+def _load_shared_model(model_name: str, cache_dir: Optional[str]) -> TextEmbeddingBase:
+    embedding_class = _embedding_class(model_name)
+    model_description = embedding_class._get_model_description(model_name)
+    model_file = model_description.model_file
+    model_dir = shared_model_dir(Path(define_cache_dir(cache_dir)), model_name)
+    if not (model_dir / model_file).exists():
+        # Downloaded and exported once for all the processes sharing the cache
+        source_dir = embedding_class.download_model(model_description, str(define_cache_dir(cache_dir)))
+        export_shared_model(source_dir, model_file, model_dir)
+
+    # The hook applying the extra session options of FastEmbed, called while loading the model
+    class SharedWeightsEmbedding(embedding_class):  # type: ignore[valid-type, misc]
+        @classmethod
+        def add_extra_session_options(cls, session_options, extra_options):
+            super().add_extra_session_options(session_options, extra_options)
+            configure_shared_session(session_options)
+
+    logger.info("Loading %s with the shared weights of %s", model_name, model_dir)
+    model = SharedWeightsEmbedding(model_name, cache_dir=cache_dir, specific_model_path=str(model_dir))
+    if not is_shared_session(model.model):
+        logger.warning(
+            "The weights of %s are not shared, the installed FastEmbed version did not apply the session options. "
+            "Every process keeps its own copy of them.",
+            model_name,
+        )
+    return model
+
+
+def _embedding_class(model_name: str) -> Type[TextEmbeddingBase]:
+    """
+    Get the FastEmbed class implementing a model, like `TextEmbedding` does.
+    """
+    for embedding_class in TextEmbedding.EMBEDDINGS_REGISTRY:
+        if any(model_name.lower() == model.model.lower() for model in embedding_class._list_supported_models()):
+            return embedding_class
+    raise ValueError(f"Model {model_name} is not supported by FastEmbed")
+
+
+def _passage_embed(
+    model_name: str, documents: List[str], cache_dir: Optional[str] = None, shared_weights: bool = False
+) -> np.ndarray:
+    model = load_model(model_name, cache_dir, shared_weights)
+    return as_embedding_array(list(model.passage_embed(documents)))
+
+
+def _query_embed(
+    model_name: str, queries: List[str], cache_dir: Optional[str] = None, shared_weights: bool = False
+) -> np.ndarray:
+    model = load_model(model_name, cache_dir, shared_weights)
+    return as_embedding_array(list(model.query_embed(queries)))
+
+
+@lru_cache(maxsize=None)
+def load_sparse_model(model_name: str, cache_dir: Optional[str] = None) -> SparseTextEmbedding:
+    """
+    Load a FastEmbed sparse model once per process.
+    """
+    return SparseTextEmbedding(model_name, cache_dir=cache_dir)
+
+
+def _sparse_passage_embed(
+    model_name: str, documents: List[str], cache_dir: Optional[str] = None
+) -> List[Tuple[List[int], List[float]]]:
+    embeddings = load_sparse_model(model_name, cache_dir).passage_embed(documents)
+    return [(embedding.indices.tolist(), embedding.values.tolist()) for embedding in embeddings]
+
+
+def _sparse_query_embed(
+    model_name: str, queries: List[str], cache_dir: Optional[str] = None
+) -> List[Tuple[List[int], List[float]]]:
+    embeddings = load_sparse_model(model_name, cache_dir).query_embed(queries)
+    return [(embedding.indices.tolist(), embedding.values.tolist()) for embedding in embeddings]
+
+
 class FastEmbedProvider(EmbeddingProvider):
     """
     FastEmbed implementation of the embedding provider.
     :param model_name: The name of the FastEmbed model to use.
+    :param query_batch_window: The number of seconds concurrent queries are collected for, to be embedded
+                               in a single model run. Queries are embedded one by one if it is 0.
+    :param query_batch_size: The maximum number of queries embedded in a single model run.
+    :param executor: The executor running the model, a thread executor sized to the available cores by default.
+    :param cache_dir: The directory the model is downloaded to, FastEmbed's default if not provided.
+    :param shared_weights: Whether to memory-map the weights of the model from the cache directory, so the
+                           processes running it share a single copy.
     """
 
-    def __init__(self, model_name: str):
+    def __init__(
+        self,
+        model_name: str,
+        query_batch_window: float = 0.0,
+        query_batch_size: int = 32,
+        executor: Optional[EmbeddingExecutor] = None,
+        cache_dir: Optional[str] = None,
+        shared_weights: bool = False,
+    ):
         self.model_name = model_name
-        self.embedding_model = TextEmbedding(model_name)
+        self.cache_dir = cache_dir
+        self.shared_weights = shared_weights
+        self.embedding_model = load_model(model_name, cache_dir, shared_weights)
+        self.executor = executor or EmbeddingExecutor()
+        self._query_batcher: Optional[MicroBatcher[str, List[float]]] = (
+            MicroBatcher(self._embed_query_batch, max_batch_size=query_batch_size, max_wait=query_batch_window)
+            if query_batch_window > 0
+            else None
+        )
 
     async def embed_documents(self, documents: List[str]) -> List[List[float]]:
         """Embed a list of documents into vectors."""
-        logger.debug(f"embed_documents called. Documents: {documents}")
-        # Run in a thread pool since FastEmbed is synchronous
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None, lambda: list(self.embedding_model.passage_embed(documents))
-        )
-        logger.debug(f"embed_documents result (first 5 values): {[emb[:5] for emb in embeddings]}")
-        return [embedding.tolist() for embedding in embeddings]
+        return (await self.embed_documents_array(documents)).tolist()
 
     async def embed_query(self, query: str) -> List[float]:
         """Embed a query into a vector."""
-        logger.debug(f"embed_query called. Query: {query}")
-        # Run in a thread pool since FastEmbed is synchronous
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None, lambda: list(self.embedding_model.query_embed([query]))
+        return (await self.embed_query_array(query)).tolist()
+
+    async def embed_documents_array(self, documents: List[str]) -> np.ndarray:
+        """Embed a list of documents into a contiguous float32 array."""
+        logger.debug("embed_documents called. Documents: %s", documents)
+        # Run in the dedicated executor since FastEmbed is synchronous
+        embeddings = await self.executor.run(
+            _passage_embed, self.model_name, documents, self.cache_dir, self.shared_weights
         )
-        result = embeddings[0].tolist()
-        logger.debug(f"embed_query result (first 5 values): {result[:5]}")
+        logger.debug("embed_documents result (first 5 values): %s", embeddings[:, :5])
+        return embeddings
+
+    async def embed_query_array(self, query: str) -> np.ndarray:
+        """Embed a query into a float32 array."""
+        logger.debug("embed_query called. Query: %s", query)
+        if self._query_batcher is not None:
+            result = np.asarray(await self._query_batcher.submit(query), dtype=np.float32)
+        else:
+            result = (await self._embed_queries([query]))[0]
+        logger.debug("embed_query result (first 5 values): %s", result[:5])
         return result
 
+    async def embed_queries_array(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries into a contiguous float32 array with a single model run."""
+        logger.debug("embed_queries called. Queries: %s", len(queries))
+        return await self._embed_queries(queries)
+
+    async def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed a batch of queries with a single model run."""
+        # Run in the dedicated executor since FastEmbed is synchronous
+        return await self.executor.run(_query_embed, self.model_name, queries, self.cache_dir, self.shared_weights)
+
+    async def _embed_query_batch(self, queries: List[str]) -> List[List[float]]:
+        """Embed a micro-batch of queries, returning one vector per query."""
+        return (await self._embed_queries(queries)).tolist()
+
+    def get_vector_name(self) -> str:
+        """Get the name of the vector for the Qdrant collection."""
+        model_name = self.model_name.split("/")[-1].lower()
+        return f"fast-{model_name}"
 
     def get_vector_size(self) -> int:
         """Get the size of the vector for the Qdrant collection."""
@@ -72,3 +200,45 @@ class FastEmbedProvider(EmbeddingProvider):
             self.embedding_model._get_model_description(self.model_name)
         )
         return model_description.dim
+
+
+class FastEmbedSparseProvider(SparseEmbeddingProvider):
+    """
+    FastEmbed implementation of the sparse embedding provider, e.g. "Qdrant/bm25" or "prithivida/Splade_PP_en_v1".
+    :param model_name: The name of the FastEmbed sparse model to use.
+    :param executor: The executor running the model, a thread executor sized to the available cores by default.
+    :param cache_dir: The directory the model is downloaded to, FastEmbed's default if not provided.
+    """
+
+    def __init__(
+        self, model_name: str, executor: Optional[EmbeddingExecutor] = None, cache_dir: Optional[str] = None
+    ):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.embedding_model = load_sparse_model(model_name, cache_dir)
+        self.executor = executor or EmbeddingExecutor()
+
+    async def embed_documents(self, documents: List[str]) -> List[models.SparseVector]:
+        """Embed a list of documents into sparse vectors."""
+        # Run in the dedicated executor since FastEmbed is synchronous
+        embeddings = await self.executor.run(_sparse_passage_embed, self.model_name, documents, self.cache_dir)
+        return [models.SparseVector(indices=indices, values=values) for indices, values in embeddings]
+
+    async def embed_query(self, query: str) -> models.SparseVector:
+        """Embed a query into a sparse vector."""
+        [(indices, values)] = await self.executor.run(
+            _sparse_query_embed, self.model_name, [query], self.cache_dir
+        )
+        return models.SparseVector(indices=indices, values=values)
+
+    def get_vector_name(self) -> str:
+        """Get the name of the sparse vector for the Qdrant collection."""
+        model_name = self.model_name.split("/")[-1].lower()
+        return f"fast-sparse-{model_name}"
+
+    def requires_idf(self) -> bool:
+        """Whether Qdrant has to weight the sparse vectors with the inverse document frequency."""
+        model_description: SparseModelDescription = (
+            self.embedding_model._get_model_description(self.model_name)
+        )
+        return bool(model_description.requires_idf)
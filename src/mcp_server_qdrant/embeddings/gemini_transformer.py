@@ -1,5 +1,6 @@
 import os
 import asyncio
+import logging
 from typing import List
 from google import genai
 from mcp_server_qdrant.embeddings.base import EmbeddingProvider
@@ -21,7 +22,7 @@ class GeminiTransformerProvider(EmbeddingProvider):
 
     async def embed_documents(self, documents: List[str]) -> List[List[float]]:
         """Embed a list of documents into vectors."""
-        logger.debug(f"embed_documents called. Documents: {documents}")
+        logger.debug("embed_documents called. Documents: %s", documents)
         loop = asyncio.get_event_loop()
         def embed():
             try:
@@ -32,7 +33,8 @@ class GeminiTransformerProvider(EmbeddingProvider):
                 raise
         try:
             embeddings = await loop.run_in_executor(None, embed)
-            logger.debug(f"embed_documents result (first 5 values): {[emb[:5] for emb in embeddings]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("embed_documents result (first 5 values): %s", [emb[:5] for emb in embeddings])
             return embeddings
         except Exception as e:
             logger.error(f"embed_documents failed: {e}")
@@ -40,7 +42,7 @@ class GeminiTransformerProvider(EmbeddingProvider):
     
     async def embed_query(self, query: str) -> List[float]:
         """Embed a query into a vector."""
-        logger.debug(f"embed_query called. Query: {query}")
+        logger.debug("embed_query called. Query: %s", query)
         loop = asyncio.get_event_loop()
         def embed():
             try:
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from typing import Callable, Generic, List, Optional, TypeVar
+
+import numpy as np
+from qdrant_client import models
+
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, SparseEmbeddingProvider
+from mcp_server_qdrant.logger import get_logger
+
+logger = get_logger(__name__)
+
+P = TypeVar("P")
+
+
+class LazyLoader(Generic[P]):
+    """
+    Creates a provider, and loads its model, on the first use or in the background once `start_loading`
+    is called.
+    :param factory: The function creating the actual provider.
+    """
+
+    kind = "embedding provider"
+
+    def __init__(self, factory: Callable[[], P]):
+        self.factory = factory
+        self._provider: Optional[P] = None
+        self._lock = threading.Lock()
+        self._loading: Optional[asyncio.Future] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the actual provider has been created."""
+        return self._provider is not None
+
+    @property
+    def provider(self) -> P:
+        """The actual provider, created synchronously on the first access."""
+        if self._provider is None:
+            # The background loading thread and the callers may race for the first access
+            with self._lock:
+                if self._provider is None:
+                    logger.info("Loading the %s", self.kind)
+                    self._provider = self.factory()
+                    logger.info("Loaded the %s", self.kind)
+        return self._provider
+
+    def start_loading(self) -> asyncio.Future:
+        """
+        Start loading the provider in a background thread, unless it is already loading or loaded.
+        A failed load is started again.
+        :return: The future resolved with the provider once it is loaded.
+        """
+        if self._loading is None or (self._loading.done() and self._loading.exception() is not None):
+            loop = asyncio.get_running_loop()
+            self._loading = loop.run_in_executor(None, lambda: self.provider)
+        return self._loading
+
+    async def wait_ready(self) -> P:
+        """
+        Wait until the provider is loaded, starting the background loading if needed.
+        :return: The actual provider.
+        """
+        if self._provider is not None:
+            return self._provider
+        # Cancelling a waiting caller should not cancel the loading for the others
+        return await asyncio.shield(self.start_loading())
+
+
+class LazyEmbeddingProvider(LazyLoader[EmbeddingProvider], EmbeddingProvider):
+    """
+    Embedding provider wrapper, which creates the actual provider, and loads its model, on the first use or
+    in the background once `start_loading` is called. Embedding calls wait until the model is loaded.
+    :param factory: The function creating the actual provider.
+    :param vector_size: The vector size of the model, if known. Allows creating collections without loading
+                        the model.
+    """
+
+    def __init__(self, factory: Callable[[], EmbeddingProvider], vector_size: Optional[int] = None):
+        super().__init__(factory)
+        self.vector_size = vector_size
+
+    async def embed_documents(self, documents: List[str]) -> List[List[float]]:
+        """Embed a list of documents into vectors."""
+        return await (await self.wait_ready()).embed_documents(documents)
+
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a query into a vector."""
+        return await (await self.wait_ready()).embed_query(query)
+
+    async def embed_documents_array(self, documents: List[str]) -> np.ndarray:
+        """Embed a list of documents into a contiguous float32 array."""
+        return await (await self.wait_ready()).embed_documents_array(documents)
+
+    async def embed_query_array(self, query: str) -> np.ndarray:
+        """Embed a query into a float32 array."""
+        return await (await self.wait_ready()).embed_query_array(query)
+
+    async def embed_queries_array(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries into a contiguous float32 array."""
+        return await (await self.wait_ready()).embed_queries_array(queries)
+
+    def get_vector_size(self) -> int:
+        """
+        Get the size of the vector for the Qdrant collection. Loads the provider synchronously if the size
+        is not known, `resolve_vector_size` should be used on the event loop.
+        """
+        if self.vector_size is not None and self._provider is None:
+            return self.vector_size
+        return self.provider.get_vector_size()
+
+    async def resolve_vector_size(self) -> int:
+        """
+        Get the size of the vector for the Qdrant collection, waiting for the background loading if the size
+        is not known.
+        """
+        if self.vector_size is not None and self._provider is None:
+            return self.vector_size
+        return (await self.wait_ready()).get_vector_size()
+
+    def get_vector_name(self) -> str:
+        """Get the name of the vector for the Qdrant collection."""
+        return self.provider.get_vector_name()
+
+
+class LazySparseEmbeddingProvider(LazyLoader[SparseEmbeddingProvider], SparseEmbeddingProvider):
+    """
+    Sparse embedding provider wrapper, loading the actual provider like `LazyEmbeddingProvider`. The name of
+    the sparse vector and whether it is weighted with IDF are known upfront, so collections can be created
+    and searched in while the model loads.
+    :param factory: The function creating the actual provider.
+    :param vector_name: The name of the sparse vector.
+    :param idf: Whether Qdrant has to weight the sparse vectors with the inverse document frequency.
+    """
+
+    kind = "sparse embedding provider"
+
+    def __init__(self, factory: Callable[[], SparseEmbeddingProvider], vector_name: str, idf: bool):
+        super().__init__(factory)
+        self.vector_name = vector_name
+        self.idf = idf
+
+    async def embed_documents(self, documents: List[str]) -> List[models.SparseVector]:
+        """Embed a list of documents into sparse vectors."""
+        return await (await self.wait_ready()).embed_documents(documents)
+
+    async def embed_query(self, query: str) -> models.SparseVector:
+        """Embed a query into a sparse vector."""
+        return await (await self.wait_ready()).embed_query(query)
+
+    def get_vector_name(self) -> str:
+        """Get the name of the sparse vector for the Qdrant collection."""
+        return self.vector_name
+
+    def requires_idf(self) -> bool:
+        """Whether Qdrant has to weight the sparse vectors with the inverse document frequency."""
+        return self.idf
@@ -0,0 +1,51 @@
+from typing import List
+
+import numpy as np
+
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from mcp_server_qdrant.resilience import Resilience
+
+
+class ResilientEmbeddingProvider(EmbeddingProvider):
+    """
+    Embedding provider wrapper retrying the transient failures of another provider, e.g. rate limiting
+    by a remote API, and failing fast while it is down. Embedding is idempotent, so every call is retried.
+    Calls are not hedged, as a remote API would charge both requests.
+    :param provider: The embedding provider to protect.
+    :param resilience: The retry and circuit breaker state of the provider.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, resilience: Resilience):
+        self.provider = provider
+        self.model_name = getattr(provider, "model_name", type(provider).__name__)
+        self.resilience = resilience
+
+    async def embed_documents(self, documents: List[str]) -> List[List[float]]:
+        """Embed a list of documents into vectors."""
+        return await self.resilience.call("embed_documents", lambda: self.provider.embed_documents(documents))
+
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a query into a vector."""
+        return await self.resilience.call("embed_query", lambda: self.provider.embed_query(query))
+
+    async def embed_documents_array(self, documents: List[str]) -> np.ndarray:
+        """Embed a list of documents into a contiguous float32 array."""
+        return await self.resilience.call(
+            "embed_documents", lambda: self.provider.embed_documents_array(documents)
+        )
+
+    async def embed_query_array(self, query: str) -> np.ndarray:
+        """Embed a query into a float32 array."""
+        return await self.resilience.call("embed_query", lambda: self.provider.embed_query_array(query))
+
+    async def embed_queries_array(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries into a contiguous float32 array."""
+        return await self.resilience.call("embed_queries", lambda: self.provider.embed_queries_array(queries))
+
+    def get_vector_size(self) -> int:
+        """Get the size of the vector for the Qdrant collection."""
+        return self.provider.get_vector_size()
+
+    def get_vector_name(self) -> str:
+        """Get the name of the vector for the Qdrant collection."""
+        return self.provider.get_vector_name()
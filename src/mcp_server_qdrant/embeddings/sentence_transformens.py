@@ -1,45 +1,98 @@
-# Her modül kendi log dosyasına yazar (logs klasörü altında)
-import asyncio
-from typing import List
-from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from functools import lru_cache
+from typing import List, Optional
+import numpy as np
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, as_embedding_array
+from mcp_server_qdrant.embeddings.batching import MicroBatcher
+from mcp_server_qdrant.embeddings.executor import EmbeddingExecutor
 from mcp_server_qdrant.logger import get_logger
 from sentence_transformers import SentenceTransformer
 
 logger = get_logger(__name__)
 
+
+@lru_cache(maxsize=None)
+def load_model(model_name: str, cache_dir: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load a SentenceTransformers model once per process. The worker processes of the process executor load
+    their own copy on the first call.
+    """
+    return SentenceTransformer(model_name, cache_folder=cache_dir)
+
+
+def _encode(model_name: str, texts: List[str], cache_dir: Optional[str] = None) -> np.ndarray:
+    return as_embedding_array(load_model(model_name, cache_dir).encode(texts, convert_to_numpy=True))
+
+
 class SentenceTransformersProvider(EmbeddingProvider):
     """
     SentenceTransformers implementation of the embedding provider.
     :param model_name: The name of the SentenceTransformers model to use.
+    :param query_batch_window: The number of seconds concurrent queries are collected for, to be embedded
+                               in a single model run. Queries are embedded one by one if it is 0.
+    :param query_batch_size: The maximum number of queries embedded in a single model run.
+    :param executor: The executor running the model, a thread executor sized to the available cores by default.
+    :param cache_dir: The directory the model is downloaded to, the default of SentenceTransformers if not
+                      provided.
     """
     
-    def __init__(self, model_name: str):
+    def __init__(
+        self,
+        model_name: str,
+        query_batch_window: float = 0.0,
+        query_batch_size: int = 32,
+        executor: Optional[EmbeddingExecutor] = None,
+        cache_dir: Optional[str] = None,
+    ):
         self.model_name = model_name
-        self.embedding_model = SentenceTransformer(model_name)
+        self.cache_dir = cache_dir
+        self.embedding_model = load_model(model_name, cache_dir)
+        self.executor = executor or EmbeddingExecutor()
         self.logger = get_logger(__name__)
+        self._query_batcher: Optional[MicroBatcher[str, List[float]]] = (
+            MicroBatcher(self._embed_query_batch, max_batch_size=query_batch_size, max_wait=query_batch_window)
+            if query_batch_window > 0
+            else None
+        )
 
     async def embed_documents(self, documents: List[str]) -> List[List[float]]:
         """Embed a list of documents into vectors."""
-        logger.debug(f"embed_documents called. Documents: {documents}")
-        # Run in a thread pool since SentenceTransformers is synchronous
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None, lambda: list(self.embedding_model.encode(documents))
-        )
-        logger.debug(f"embed_documents result (first 5 values): {[emb[:5] for emb in embeddings]}")
-        return [embedding.tolist() for embedding in embeddings]
+        return (await self.embed_documents_array(documents)).tolist()
     
     async def embed_query(self, query: str) -> List[float]:
         """Embed a query into a vector."""
-        logger.debug(f"embed_query called. Query: {query}")
-        # Run in a thread pool since SentenceTransformers is synchronous
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None, lambda: list(self.embedding_model.encode([query]))
-        )
-        result = embeddings[0].tolist()
-        logger.debug(f"embed_query result (first 5 values): {result[:5]}")
+        return (await self.embed_query_array(query)).tolist()
+
+    async def embed_documents_array(self, documents: List[str]) -> np.ndarray:
+        """Embed a list of documents into a contiguous float32 array."""
+        logger.debug("embed_documents called. Documents: %s", documents)
+        # Run in the dedicated executor since SentenceTransformers is synchronous
+        embeddings = await self.executor.run(_encode, self.model_name, documents, self.cache_dir)
+        logger.debug("embed_documents result (first 5 values): %s", embeddings[:, :5])
+        return embeddings
+
+    async def embed_query_array(self, query: str) -> np.ndarray:
+        """Embed a query into a float32 array."""
+        logger.debug("embed_query called. Query: %s", query)
+        if self._query_batcher is not None:
+            result = np.asarray(await self._query_batcher.submit(query), dtype=np.float32)
+        else:
+            result = (await self._embed_queries([query]))[0]
+        logger.debug("embed_query result (first 5 values): %s", result[:5])
         return result
+
+    async def embed_queries_array(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries into a contiguous float32 array with a single model run."""
+        logger.debug("embed_queries called. Queries: %s", len(queries))
+        return await self._embed_queries(queries)
+
+    async def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed a batch of queries with a single model run."""
+        # Run in the dedicated executor since SentenceTransformers is synchronous
+        return await self.executor.run(_encode, self.model_name, queries, self.cache_dir)
+
+    async def _embed_query_batch(self, queries: List[str]) -> List[List[float]]:
+        """Embed a micro-batch of queries, returning one vector per query."""
+        return (await self._embed_queries(queries)).tolist()
     
 
     def get_vector_size(self) -> int:
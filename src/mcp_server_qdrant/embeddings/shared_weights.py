@@ -0,0 +1,81 @@
+import os
+import shutil
+from pathlib import Path
+
+import onnxruntime as ort
+
+from mcp_server_qdrant.logger import get_logger
+
+logger = get_logger(__name__)
+
+# The files holding ONNX weights, replaced by the exported model
+ONNX_PATTERNS = ("*.onnx", "*.onnx_data", "*.onnx.data")
+
+
+def shared_model_dir(cache_dir: Path, model_name: str) -> Path:
+    """
+    Get the directory of the shared copy of a model in a cache directory.
+    """
+    return cache_dir / "shared" / model_name.replace("/", "--")
+
+
+def export_shared_model(model_dir: Path, model_file: str, target_dir: Path) -> Path:
+    """
+    Export an ONNX model, so its weights can be memory-mapped by every process loading it. The graph is
+    optimized once, fused weights included, and all the weights are written to an external data file next
+    to the model. The other files of the model, e.g. the tokenizer, are copied along.
+    Several processes may export the same model at once, the first one to finish wins.
+    :param model_dir: The directory of the model files.
+    :param model_file: The path of the ONNX file, relative to `model_dir`.
+    :param target_dir: The directory to export the model to.
+    :return: The directory of the exported model.
+    """
+    if (target_dir / model_file).exists():
+        return target_dir
+    logger.info("Exporting %s with external weights to %s", model_dir / model_file, target_dir)
+    target_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = target_dir.with_name(f"{target_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.copytree(model_dir, tmp_dir, ignore=shutil.ignore_patterns(*ONNX_PATTERNS))
+
+    target_path = tmp_dir / model_file
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    options = ort.SessionOptions()
+    # The extended level fuses the attention weights, but does not change their layout for the current CPU
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = str(target_path)
+    options.add_session_config_entry(
+        "session.optimized_model_external_initializers_file_name", f"{target_path.name}.data"
+    )
+    options.add_session_config_entry("session.optimized_model_external_initializers_min_size_in_bytes", "1024")
+    ort.InferenceSession(str(model_dir / model_file), options, providers=["CPUExecutionProvider"])
+
+    try:
+        os.rename(tmp_dir, target_dir)
+    except OSError:
+        # Exported by another process meanwhile
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not (target_dir / model_file).exists():
+            raise
+    return target_dir
+
+
+def configure_shared_session(options: ort.SessionOptions):
+    """
+    Configure an inference session to run with the memory-mapped weights of an exported model. By default,
+    the weights of the matrix multiplications are copied to a layout faster to multiply with, which keeps a
+    private copy of them in every process. Without it, the runs are slower, as the weights are packed on
+    every run.
+    """
+    options.add_session_config_entry("session.disable_prepacking", "1")
+
+
+def is_shared_session(session: ort.InferenceSession) -> bool:
+    """
+    Check whether an inference session was configured with `configure_shared_session`.
+    """
+    try:
+        return session.get_session_options().get_session_config_entry("session.disable_prepacking") == "1"
+    except RuntimeError:
+        # Not configured at all
+        return False
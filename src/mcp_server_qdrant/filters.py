@@ -0,0 +1,114 @@
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, Field, model_validator
+from qdrant_client import models
+
+
+class RangeCondition(BaseModel):
+    """
+    Bounds of a range condition. Numbers compare numeric fields, e.g. `wordCount`, strings compare dates,
+    e.g. `karar_tarihi`, given in the RFC 3339 format.
+    """
+
+    gt: Optional[Union[float, str]] = None
+    gte: Optional[Union[float, str]] = None
+    lt: Optional[Union[float, str]] = None
+    lte: Optional[Union[float, str]] = None
+
+
+class FilterCondition(BaseModel):
+    """
+    A condition on a single payload field. Exactly one of `match`, `match_any`, `range` and `is_empty`
+    has to be set.
+    """
+
+    key: str = Field(description="The payload field, e.g. 'daire', 'durum', 'karar_tarihi'")
+    match: Optional[Union[str, int, bool]] = Field(
+        default=None, description="The field equals this value"
+    )
+    match_any: Optional[Union[List[str], List[int]]] = Field(
+        default=None, description="The field equals any of these values, all strings or all integers"
+    )
+    range: Optional[RangeCondition] = Field(
+        default=None, description="The field is within these bounds"
+    )
+    is_empty: Optional[bool] = Field(
+        default=None, description="The field is missing, null or an empty list"
+    )
+
+    @model_validator(mode="after")
+    def check_single_condition(self) -> "FilterCondition":
+        conditions = [self.match, self.match_any, self.range, self.is_empty]
+        if sum(condition is not None for condition in conditions) != 1:
+            raise ValueError(
+                f"Condition on {self.key} must set exactly one of match, match_any, range and is_empty"
+            )
+        return self
+
+
+class QueryFilter(BaseModel):
+    """
+    A structured filter applied by Qdrant during the search. All the `must` conditions, at least one of
+    the `should` conditions and none of the `must_not` conditions have to hold. Conditions may be nested
+    filters.
+    """
+
+    must: List[Union[FilterCondition, "QueryFilter"]] = []
+    should: List[Union[FilterCondition, "QueryFilter"]] = []
+    must_not: List[Union[FilterCondition, "QueryFilter"]] = []
+
+
+def to_qdrant_filter(query_filter: QueryFilter) -> models.Filter:
+    """
+    Compile a structured filter into a Qdrant filter.
+    :param query_filter: The filter to compile.
+    :return: The Qdrant filter.
+    """
+    return models.Filter(
+        must=[_to_qdrant_condition(condition) for condition in query_filter.must] or None,
+        should=[_to_qdrant_condition(condition) for condition in query_filter.should] or None,
+        must_not=[_to_qdrant_condition(condition) for condition in query_filter.must_not] or None,
+    )
+
+
+def _to_qdrant_condition(condition: Union[FilterCondition, QueryFilter]) -> models.Condition:
+    if isinstance(condition, QueryFilter):
+        return to_qdrant_filter(condition)
+    if condition.match is not None:
+        return models.FieldCondition(key=condition.key, match=models.MatchValue(value=condition.match))
+    if condition.match_any is not None:
+        return models.FieldCondition(key=condition.key, match=models.MatchAny(any=condition.match_any))
+    if condition.range is not None:
+        bounds = condition.range.model_dump()
+        if any(isinstance(bound, str) for bound in bounds.values()):
+            return models.FieldCondition(key=condition.key, range=models.DatetimeRange(**bounds))
+        return models.FieldCondition(key=condition.key, range=models.Range(**bounds))
+    if condition.is_empty:
+        return models.IsEmptyCondition(is_empty=models.PayloadField(key=condition.key))
+    # Not empty
+    return models.Filter(
+        must_not=[models.IsEmptyCondition(is_empty=models.PayloadField(key=condition.key))]
+    )
+
+
+def filter_keys(qdrant_filter: models.Filter) -> List[str]:
+    """
+    Get the payload fields a Qdrant filter conditions on, without duplicates.
+    """
+    keys: List[str] = []
+    for conditions in (qdrant_filter.must, qdrant_filter.should, qdrant_filter.must_not):
+        if conditions is None:
+            continue
+        if not isinstance(conditions, list):
+            conditions = [conditions]
+        for condition in conditions:
+            if isinstance(condition, models.Filter):
+                nested_keys = filter_keys(condition)
+            elif isinstance(condition, models.FieldCondition):
+                nested_keys = [condition.key]
+            elif isinstance(condition, models.IsEmptyCondition):
+                nested_keys = [condition.is_empty.key]
+            else:
+                nested_keys = []
+            keys.extend(key for key in nested_keys if key not in keys)
+    return keys
@@ -1,29 +1,118 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import random
 import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 LOG_DIR = os.getenv("LOG_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs"))
-os.makedirs(LOG_DIR, exist_ok=True)
 
+# The attributes every record has, the others are extra fields passed by the caller
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
 
-def get_logger(name):
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        log_file = os.path.join(LOG_DIR, f"{name.replace('.', '_')}.log")
-        handler = logging.FileHandler(log_file)
-        formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+_listener: Optional[QueueListener] = None
+
+# A random number drawn once per tool call, so all the debug records of a call are either kept or dropped
+debug_sample: ContextVar[Optional[float]] = ContextVar("debug_sample", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format the records as single-line JSON documents. The fields passed in `extra` are kept.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                document[key] = value
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        return json.dumps(document, default=str, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keep only a share of the debug records, which are written for every request. The other levels are kept.
+    Within a tool call, the decision is made once for the whole call, using `debug_sample`, so a sampled call
+    keeps all of its debug records. Outside of the tool calls, every record is sampled on its own.
+    :param rate: The share of the debug records to keep, between 0 and 1.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        sample = debug_sample.get()
+        if sample is None:
+            sample = random.random()
+        return sample < self.rate
+
+
+class LazyQueueHandler(QueueHandler):
+    """
+    Queue handler leaving the formatting of the records to the listener thread. The standard handler merges the
+    message and its arguments before queuing it, on the thread which logs, i.e. the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure_logging() -> QueueListener:
+    """
+    Set up the logging pipeline once per process: the loggers only put their records on a queue, and a
+    background thread writes them to the shared sinks, a log file and stdout. Logging I/O does not block
+    the event loop this way.
+    Configured with the LOG_LEVEL, LOG_DIR, LOG_FORMAT ("json" or "text") and LOG_DEBUG_SAMPLE_RATE
+    environment variables.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        formatter: logging.Formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    else:
+        formatter = JsonFormatter()
+    os.makedirs(LOG_DIR, exist_ok=True)
+    file_handler = logging.FileHandler(os.path.join(LOG_DIR, "mcp_server_qdrant.log"), encoding="utf-8")
+    console_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, console_handler):
         handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        # Add console handler for stdout
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-        # Root logger'a da handler ekle
-        root_logger = logging.getLogger()
-        if not root_logger.handlers:
-            root_logger.addHandler(handler)
-            root_logger.addHandler(console_handler)
-        log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-        logger.setLevel(getattr(logging, log_level, logging.INFO))
-        root_logger.setLevel(getattr(logging, log_level, logging.INFO))
-    return logger
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    # Sampled before queuing, so the dropped records are never formatted
+    queue_handler.addFilter(DebugSamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))))
+    root_logger = logging.getLogger()
+    root_logger.addHandler(queue_handler)
+    log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+    root_logger.setLevel(getattr(logging, log_level, logging.INFO))
+
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    # Write the queued records before the process exits
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get the logger of a module. Its records propagate to the queue handler of the root logger.
+    """
+    configure_logging()
+    return logging.getLogger(name)
@@ -1,4 +1,8 @@
 import argparse
+import glob
+import os
+import shutil
+import tempfile
 
 
 def main():
@@ -12,13 +16,55 @@ def main():
     parser = argparse.ArgumentParser(description="mcp-server-qdrant")
     parser.add_argument(
         "--transport",
-        choices=["stdio", "sse"],
+        choices=["stdio", "sse", "streamable-http"],
         default="stdio",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WORKERS", "1")),
+        help="Number of worker processes sharing the listening socket, streamable-http only",
+    )
     args = parser.parse_args()
+    created_metrics_dir = None
+
+    if args.workers > 1:
+        if args.transport != "streamable-http":
+            # The SSE sessions live in the process which opened them
+            parser.error("several workers require the streamable-http transport")
+        # Any worker may receive any request, so none of them can keep sessions
+        os.environ["STATELESS_HTTP"] = "true"
+        # Every worker writes its metrics to this directory, so /metrics aggregates all of them. It has to be
+        # set before the workers import the metrics, and the files of a previous run are removed.
+        metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        if not metrics_dir:
+            metrics_dir = created_metrics_dir = tempfile.mkdtemp(prefix="mcp-server-qdrant-metrics-")
+        os.makedirs(metrics_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+            os.remove(path)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    if args.transport == "stdio":
+        # Import is done here to make sure environment variables are loaded
+        # only after we make the changes.
+        from mcp_server_qdrant.server import mcp
+
+        mcp.run(transport=args.transport)
+        return
 
-    # Import is done here to make sure environment variables are loaded
-    # only after we make the changes.
-    from mcp_server_qdrant.server import mcp
+    import uvicorn
 
-    mcp.run(transport=args.transport)
+    # Every worker imports the server and builds its app, uvloop is used if it is installed
+    app = "sse_app" if args.transport == "sse" else "streamable_http_app"
+    try:
+        uvicorn.run(
+            f"mcp_server_qdrant.server:{app}",
+            factory=True,
+            host=os.environ.get("HOST", "0.0.0.0"),
+            port=int(os.environ.get("PORT", "80")),
+            workers=args.workers,
+            loop="auto",
+        )
+    finally:
+        if created_metrics_dir is not None:
+            shutil.rmtree(created_metrics_dir, ignore_errors=True)
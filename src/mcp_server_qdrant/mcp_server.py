@@ -1,17 +1,57 @@
+import contextlib
 import json
 import os
-from typing import Any, List
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
 from mcp_server_qdrant.logger import get_logger
 
 from mcp.server.fastmcp import Context, FastMCP
+from mcp.types import AnyFunction, Icon, ToolAnnotations
+from prometheus_client import CONTENT_TYPE_LATEST
+from pydantic import ValidationError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
-from mcp_server_qdrant.embeddings.factory import create_embedding_provider
-from mcp_server_qdrant.qdrant import Entry, Metadata, QdrantConnector
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, SparseEmbeddingProvider
+from mcp_server_qdrant.embeddings.factory import (
+    create_embedding_executor,
+    create_embedding_provider,
+    create_embedding_resilience,
+    create_sparse_embedding_provider,
+    get_sparse_vector_name,
+    get_vector_name,
+    get_vector_size,
+    sparse_requires_idf,
+)
+from mcp_server_qdrant.embeddings.lazy import LazyEmbeddingProvider, LazySparseEmbeddingProvider
+from mcp_server_qdrant.filters import QueryFilter, to_qdrant_filter
+from mcp_server_qdrant.metrics import (
+    BATCH_SIZE,
+    FORMAT_DURATION,
+    current_tool,
+    instrument_tool,
+    latest,
+    mark_process_dead,
+)
+from mcp_server_qdrant.qdrant import (
+    CollectionProfile,
+    ConnectionProfile,
+    Entry,
+    Metadata,
+    PayloadProjection,
+    QdrantConnector,
+    StoreResult,
+    decode_cursor,
+    encode_cursor,
+)
+from mcp_server_qdrant.resilience import Resilience, ResiliencePolicy
+from mcp_server_qdrant.result_cache import ResultCache
 from mcp_server_qdrant.settings import (
     EmbeddingProviderSettings,
     QdrantSettings,
     ToolSettings,
 )
+from mcp_server_qdrant.tracing import set_attributes, span
 
 logger = get_logger(__name__)
 
@@ -40,6 +80,8 @@ class QdrantMCPServer(FastMCP):
             "host": host,
             "port": port,
         })
+        # Without sessions, any worker can answer any request of the streamable HTTP transport
+        settings.setdefault("stateless_http", os.environ.get("STATELESS_HTTP", "false").lower() == "true")
         
 
 
@@ -47,18 +89,291 @@ class QdrantMCPServer(FastMCP):
         self.qdrant_settings = qdrant_settings
         self.embedding_provider_settings = embedding_provider_settings
 
-        self.embedding_provider = create_embedding_provider(embedding_provider_settings)
+        self.embedding_resilience = create_embedding_resilience(embedding_provider_settings)
+        self.qdrant_resilience = Resilience(
+            "qdrant",
+            ResiliencePolicy(
+                retry_attempts=qdrant_settings.retry_attempts,
+                retry_base_delay=qdrant_settings.retry_base_delay,
+                retry_max_delay=qdrant_settings.retry_max_delay,
+                hedge=qdrant_settings.hedge,
+                hedge_delay=qdrant_settings.hedge_delay,
+                failure_threshold=qdrant_settings.circuit_failure_threshold,
+                reset_timeout=qdrant_settings.circuit_reset_timeout,
+            ),
+        )
+        # The dense and the sparse models share one executor, bounding the embedding threads of the server
+        self.embedding_executor = create_embedding_executor(embedding_provider_settings)
+        self.embedding_provider: EmbeddingProvider
+        if qdrant_settings.server_inference or embedding_provider_settings.background_loading:
+            # With server inference Qdrant embeds the documents, and the local model is loaded only if it
+            # turns out it cannot. Otherwise, the model is loaded in the background once the server runs.
+            self.embedding_provider = LazyEmbeddingProvider(
+                lambda: create_embedding_provider(
+                    embedding_provider_settings,
+                    resilience=self.embedding_resilience,
+                    executor=self.embedding_executor,
+                ),
+                vector_size=get_vector_size(embedding_provider_settings),
+            )
+        else:
+            self.embedding_provider = create_embedding_provider(
+                embedding_provider_settings,
+                resilience=self.embedding_resilience,
+                executor=self.embedding_executor,
+            )
+        self.sparse_embedding_provider: Optional[SparseEmbeddingProvider]
+        if embedding_provider_settings.sparse_model_name and embedding_provider_settings.background_loading:
+            # The sparse model is always run locally, and loaded in the background like the dense one
+            def load_sparse_embedding_provider() -> SparseEmbeddingProvider:
+                provider = create_sparse_embedding_provider(
+                    embedding_provider_settings, executor=self.embedding_executor
+                )
+                assert provider is not None
+                return provider
+
+            self.sparse_embedding_provider = LazySparseEmbeddingProvider(
+                load_sparse_embedding_provider,
+                vector_name=get_sparse_vector_name(embedding_provider_settings),
+                idf=sparse_requires_idf(embedding_provider_settings),
+            )
+        else:
+            self.sparse_embedding_provider = create_sparse_embedding_provider(
+                embedding_provider_settings, executor=self.embedding_executor
+            )
         self.qdrant_connector = QdrantConnector(
             qdrant_settings.location,
             qdrant_settings.api_key,
             qdrant_settings.collection_name,
             self.embedding_provider,
             qdrant_settings.local_path,
+            collection_cache_ttl=qdrant_settings.collection_cache_ttl,
+            server_inference_model=(
+                embedding_provider_settings.model_name
+                if qdrant_settings.server_inference
+                else None
+            ),
+            vector_name=get_vector_name(embedding_provider_settings),
+            collection_profile=CollectionProfile(
+                quantization=qdrant_settings.quantization,
+                quantization_always_ram=qdrant_settings.quantization_always_ram,
+                product_compression=qdrant_settings.product_compression,
+                on_disk=qdrant_settings.on_disk,
+                hnsw_m=qdrant_settings.hnsw_m,
+                hnsw_ef_construct=qdrant_settings.hnsw_ef_construct,
+                hnsw_on_disk=qdrant_settings.hnsw_on_disk,
+                indexing_threshold=qdrant_settings.indexing_threshold,
+                default_segment_number=qdrant_settings.default_segment_number,
+                search_hnsw_ef=qdrant_settings.search_hnsw_ef,
+                search_exact=qdrant_settings.search_exact,
+                search_rescore=qdrant_settings.search_rescore,
+                search_oversampling=qdrant_settings.search_oversampling,
+            ),
+            payload_projection=self.payload_projection(qdrant_settings.payload_include),
+            payload_indexes=qdrant_settings.payload_indexes,
+            sparse_embedding_provider=self.sparse_embedding_provider,
+            hybrid_fusion=qdrant_settings.hybrid_fusion,
+            hybrid_prefetch_limit=qdrant_settings.hybrid_prefetch_limit,
+            connection_profile=ConnectionProfile(
+                timeout=qdrant_settings.timeout,
+                prefer_grpc=qdrant_settings.prefer_grpc,
+                grpc_port=qdrant_settings.grpc_port,
+                http2=qdrant_settings.http2,
+                pool_size=qdrant_settings.pool_size,
+                keepalive=qdrant_settings.keepalive,
+                search_timeout=qdrant_settings.search_timeout,
+                write_timeout=qdrant_settings.write_timeout,
+            ),
+            resilience=self.qdrant_resilience,
+            result_cache=(
+                ResultCache(qdrant_settings.result_cache_size, qdrant_settings.result_cache_ttl)
+                if qdrant_settings.result_cache_size > 0
+                else None
+            ),
+        )
+        self.find_projection = self.payload_projection(qdrant_settings.find_payload_include)
+        self.find_by_metadata_projection = self.payload_projection(
+            qdrant_settings.find_by_metadata_payload_include
         )
 
         super().__init__(name=name, instructions=instructions, **settings)
 
         self.setup_tools()
+        self.setup_routes()
+
+    def start_model_loading(self):
+        """
+        Start loading the embedding models in the background, if they are loaded lazily and needed.
+        """
+        if isinstance(self.embedding_provider, LazyEmbeddingProvider) and not self.qdrant_settings.server_inference:
+            self.embedding_provider.start_loading()
+        if isinstance(self.sparse_embedding_provider, LazySparseEmbeddingProvider):
+            self.sparse_embedding_provider.start_loading()
+
+    def is_ready(self) -> bool:
+        """
+        Whether the server can handle requests without waiting for the embedding models to load.
+        """
+        if isinstance(self.sparse_embedding_provider, LazySparseEmbeddingProvider):
+            if not self.sparse_embedding_provider.is_loaded:
+                return False
+        if self.qdrant_settings.server_inference:
+            return True
+        if isinstance(self.embedding_provider, LazyEmbeddingProvider):
+            return self.embedding_provider.is_loaded
+        return True
+
+    async def run_stdio_async(self) -> None:
+        self.start_model_loading()
+        await super().run_stdio_async()
+
+    async def run_sse_async(self, mount_path: str | None = None) -> None:
+        self.start_model_loading()
+        await super().run_sse_async(mount_path)
+
+    async def run_streamable_http_async(self) -> None:
+        self.start_model_loading()
+        await super().run_streamable_http_async()
+
+    def http_app(self, transport: Literal["sse", "streamable-http"]) -> Starlette:
+        """
+        Build the ASGI app of an HTTP transport, for an ASGI server running it, e.g. in several worker
+        processes. The embedding model starts loading when the app starts.
+        :param transport: The transport, "sse" or "streamable-http".
+        """
+        app = self.sse_app() if transport == "sse" else self.streamable_http_app()
+        transport_lifespan = app.router.lifespan_context
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            self.start_model_loading()
+            try:
+                async with transport_lifespan(app):
+                    yield
+            finally:
+                mark_process_dead()
+
+        app.router.lifespan_context = lifespan
+        return app
+
+    def setup_routes(self):
+        """
+        Register the HTTP routes, served along with the HTTP transports, used by the liveness and readiness probes
+        and by the administrators.
+        """
+
+        async def health(request: Request) -> Response:
+            return JSONResponse({"status": "ok"})
+
+        async def ready(request: Request) -> Response:
+            if self.is_ready():
+                return JSONResponse({"status": "ready"})
+            return JSONResponse({"status": "loading"}, status_code=503)
+
+        async def payload_indexes(request: Request) -> Response:
+            # Report of the filters on unindexed fields, POST creates the configured indexes
+            report: Dict[str, Any] = {
+                "configured": self.qdrant_settings.payload_indexes,
+                "unindexed_filters": self.qdrant_connector.unindexed_filters(),
+            }
+            if request.method == "POST":
+                collection_name = request.query_params.get("collection_name") or self.qdrant_settings.collection_name
+                if not collection_name:
+                    return JSONResponse({"error": "collection_name is required"}, status_code=400)
+                if (
+                    collection_name != self.qdrant_settings.collection_name
+                    and not self.qdrant_settings.admin_write_any_collection
+                ):
+                    error = f"Indexes can only be created in the collection {self.qdrant_settings.collection_name}"
+                    return JSONResponse({"error": error}, status_code=403)
+                try:
+                    report["created"] = await self.qdrant_connector.ensure_payload_indexes(collection_name)
+                except ValueError as e:
+                    return JSONResponse({"error": str(e)}, status_code=404)
+            return JSONResponse(report)
+
+        async def result_cache(request: Request) -> Response:
+            stats = self.qdrant_connector.result_cache_stats()
+            if stats is None:
+                return JSONResponse({"enabled": False})
+            return JSONResponse({"enabled": True, **stats})
+
+        async def resilience(request: Request) -> Response:
+            return JSONResponse(
+                {
+                    "qdrant": self.qdrant_resilience.stats(),
+                    "embedding": self.embedding_resilience.stats(),
+                }
+            )
+
+        async def metrics(request: Request) -> Response:
+            return Response(latest(), media_type=CONTENT_TYPE_LATEST)
+
+        self.custom_route("/health", methods=["GET"])(health)
+        self.custom_route("/ready", methods=["GET"])(ready)
+        # Creating indexes writes to the collections, on a route without authentication, so it has to be enabled
+        admin_writes = self.qdrant_settings.admin_write_enabled and not self.qdrant_settings.read_only
+        index_methods = ["GET", "POST"] if admin_writes else ["GET"]
+        self.custom_route("/admin/payload-indexes", methods=index_methods)(payload_indexes)
+        self.custom_route("/admin/result-cache", methods=["GET"])(result_cache)
+        self.custom_route("/admin/resilience", methods=["GET"])(resilience)
+        self.custom_route("/metrics", methods=["GET"])(metrics)
+
+    def add_tool(
+        self,
+        fn: AnyFunction,
+        name: str | None = None,
+        title: str | None = None,
+        description: str | None = None,
+        annotations: ToolAnnotations | None = None,
+        icons: list[Icon] | None = None,
+        meta: dict[str, Any] | None = None,
+        structured_output: bool | None = None,
+    ) -> None:
+        """
+        Register a tool, measuring its latency and counting its errors.
+        """
+        name = name or fn.__name__
+        super().add_tool(
+            instrument_tool(name, fn, self.qdrant_settings.collection_name),
+            name=name,
+            title=title,
+            description=description,
+            annotations=annotations,
+            icons=icons,
+            meta=meta,
+            structured_output=structured_output,
+        )
+
+    def payload_projection(self, include: List[str] | None) -> PayloadProjection:
+        """
+        Build the payload projection of a tool, including the given fields, or the default ones.
+        """
+        if include is None:
+            include = self.qdrant_settings.payload_include
+        return PayloadProjection(
+            include=include,
+            exclude=self.qdrant_settings.payload_exclude,
+            max_text_length=self.qdrant_settings.max_text_length,
+        )
+
+    def format_batch_results(self, queries: List[str], results: List[List[dict]]) -> List[str]:
+        """
+        Format the results of several queries, one message per query holding all of its results.
+        """
+        if self.qdrant_settings.output_format == "json":
+            return [
+                json.dumps({"query": query, "results": entries})
+                for query, entries in zip(queries, results)
+            ]
+        messages = []
+        for query, entries in zip(queries, results):
+            if not entries:
+                messages.append(f"No information found for the query '{query}'")
+                continue
+            formatted_results = "\n\n".join(self.format_search_result(entry) for entry in entries)
+            messages.append(f"Results for the query '{query}':\n{formatted_results}")
+        return messages
 
     def format_search_result(self, result: dict) -> str:
         """
@@ -86,6 +401,9 @@ class QdrantMCPServer(FastMCP):
             
         if result.get("id"):
             formatted_parts.append(f"ID: {result['id']}")
+
+        if result.get("collection_name"):
+            formatted_parts.append(f"Collection: {result['collection_name']}")
             
         return "\n".join(formatted_parts) if formatted_parts else "No content available"
 
@@ -96,6 +414,25 @@ class QdrantMCPServer(FastMCP):
         entry_metadata = json.dumps(entry.metadata) if entry.metadata else ""
         return f"<entry><content>{entry.content}</content><metadata>{entry_metadata}</metadata></entry>"
 
+    def make_entry(self, information: str, metadata: Metadata | None) -> Entry:
+        """
+        Build an entry from the information and the metadata passed to a store tool.
+        """
+        return Entry(
+            content=information,
+            source_id=metadata.get("source_id") if metadata else None,
+            url=metadata.get("url") if metadata else None,
+            title=metadata.get("title") if metadata else None,
+            docAuthor=metadata.get("docAuthor") if metadata else None,
+            description=metadata.get("description") if metadata else None,
+            docSource=metadata.get("docSource") if metadata else None,
+            published=metadata.get("published") if metadata else None,
+            wordCount=metadata.get("wordCount") if metadata else None,
+            tokenCountEstimate=metadata.get("tokenCountEstimate") if metadata else None,
+            text=metadata.get("text") if metadata else None,
+            metadata=metadata,
+        )
+
     def setup_tools(self):
         """
         Register the tools in the server.
@@ -106,24 +443,11 @@ class QdrantMCPServer(FastMCP):
             collection_name: str,
             metadata: Metadata = None,  # type: ignore
         ) -> str:
-            logger.debug(f"store tool called. information: {information}, collection_name: {collection_name}, metadata: {metadata}")
+            logger.debug("store tool called. information: %s, collection_name: %s, metadata: %s", information, collection_name, metadata)
             await ctx.debug(f"Storing information {information} in Qdrant")
-            entry = Entry(
-                content=information,
-                source_id=metadata.get("source_id") if metadata else None,
-                url=metadata.get("url") if metadata else None,
-                title=metadata.get("title") if metadata else None,
-                docAuthor=metadata.get("docAuthor") if metadata else None,
-                description=metadata.get("description") if metadata else None,
-                docSource=metadata.get("docSource") if metadata else None,
-                published=metadata.get("published") if metadata else None,
-                wordCount=metadata.get("wordCount") if metadata else None,
-                tokenCountEstimate=metadata.get("tokenCountEstimate") if metadata else None,
-                text=metadata.get("text") if metadata else None,
-                metadata=metadata,
-            )
+            entry = self.make_entry(information, metadata)
             await self.qdrant_connector.store(entry, collection_name=collection_name)
-            logger.debug(f"store tool completed. information: {information}, collection_name: {collection_name}")
+            logger.debug("store tool completed. information: %s, collection_name: %s", information, collection_name)
             if collection_name:
                 return f"Remembered: {information} in collection {collection_name}"
             return f"Remembered: {information}"
@@ -134,11 +458,63 @@ class QdrantMCPServer(FastMCP):
             metadata: Metadata = None,  # type: ignore
         ) -> str:
             assert self.qdrant_settings.collection_name is not None
-            logger.debug(f"store_with_default_collection called. information: {information}, metadata: {metadata}")
+            logger.debug("store_with_default_collection called. information: %s, metadata: %s", information, metadata)
             return await store(
                 ctx, information, self.qdrant_settings.collection_name, metadata
             )
 
+        async def store_batch(
+            ctx: Context,
+            entries: List[Dict[str, Any]],
+            collection_name: str,
+        ) -> List[str]:
+            logger.debug("store_batch tool called. entries: %s, collection_name: %s", len(entries), collection_name)
+            await ctx.debug(f"Storing {len(entries)} entries in Qdrant")
+            # An invalid item fails on its own, the valid ones are stored
+            results_by_index: Dict[int, StoreResult] = {}
+            batch: List[Entry] = []
+            positions: List[int] = []
+            for index, item in enumerate(entries):
+                try:
+                    batch.append(self.make_entry(item.get("information", ""), item.get("metadata")))
+                    positions.append(index)
+                except ValidationError as e:
+                    errors = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                    results_by_index[index] = StoreResult(index=index, success=False, error=errors)
+                except (AttributeError, TypeError) as e:
+                    results_by_index[index] = StoreResult(index=index, success=False, error=f"invalid entry: {e}")
+            BATCH_SIZE.labels(current_tool.get(), "entries").observe(len(batch))
+            set_attributes({"mcp.batch_size": len(batch)})
+            if batch:
+                stored_results = await self.qdrant_connector.store_batch(
+                    batch,
+                    collection_name=collection_name,
+                    batch_size=self.qdrant_settings.store_batch_size,
+                )
+                for result in stored_results:
+                    position = positions[result.index]
+                    results_by_index[position] = result.model_copy(update={"index": position})
+            results = [results_by_index[index] for index in range(len(entries))]
+            stored = sum(result.success for result in results)
+            logger.debug("store_batch tool completed. stored: %s/%s, collection_name: %s", stored, len(results), collection_name)
+            summary = f"Remembered {stored} of {len(results)} entries"
+            if collection_name:
+                summary += f" in collection {collection_name}"
+            return [summary] + [
+                f"{result.index}: stored with ID {result.id}"
+                if result.success
+                else f"{result.index}: failed: {result.error}"
+                for result in results
+            ]
+
+        async def store_batch_with_default_collection(
+            ctx: Context,
+            entries: List[Dict[str, Any]],
+        ) -> List[str]:
+            assert self.qdrant_settings.collection_name is not None
+            logger.debug("store_batch_with_default_collection called. entries: %s", len(entries))
+            return await store_batch(ctx, entries, self.qdrant_settings.collection_name)
+
         async def sanitize_input(value):
             from collections.abc import Awaitable
             if isinstance(value, Awaitable):
@@ -148,83 +524,177 @@ class QdrantMCPServer(FastMCP):
         async def find(
             ctx: Context,
             query: str,
-            collection_name: str,
+            collection_name: str | None = None,
+            query_filter: QueryFilter | None = None,
+            collection_names: List[str] | None = None,
         ) -> List[str]:
             
-            logger.debug(f"find tool called. query type: {type(query)}")
+            logger.debug("find tool called. query type: %s", type(query))
             query = await sanitize_input(query)
-            logger.debug(f"find tool called. query type2: {type(query)}")
-            logger.debug(f"find tool called. query: {query}, collection_name: {collection_name}")
+            logger.debug("find tool called. query type2: %s", type(query))
+            logger.debug("find tool called. query: %s, collection_name: %s, collection_names: %s", query, collection_name, collection_names)
             await ctx.debug(f"Finding results for query {query}")
             if collection_name:
                 await ctx.debug(
                     f"Overriding the collection name with {collection_name}"
                 )
-            entries = await self.qdrant_connector.search(
-                query,
-                collection_name=collection_name,
-                limit=self.qdrant_settings.search_limit,
+            failed_collections: List[str] = []
+            if collection_names:
+                # Search all the collections at once
+                entries, failed_collections = await self.qdrant_connector.search_collections(
+                    query,
+                    collection_names,
+                    limit=self.qdrant_settings.search_limit,
+                    projection=self.find_projection,
+                    query_filter=to_qdrant_filter(query_filter) if query_filter else None,
+                    timeout=self.qdrant_settings.fanout_timeout,
+                )
+            elif collection_name:
+                entries = await self.qdrant_connector.search(
+                    query,
+                    collection_name=collection_name,
+                    limit=self.qdrant_settings.search_limit,
+                    projection=self.find_projection,
+                    query_filter=to_qdrant_filter(query_filter) if query_filter else None,
+                )
+            else:
+                return ["Either collection_name or collection_names is required"]
+            failure_note = (
+                [f"Collections without results in time: {', '.join(failed_collections)}"]
+                if failed_collections
+                else []
             )
+            set_attributes({"mcp.limit": self.qdrant_settings.search_limit, "mcp.hits": len(entries)})
             if not entries:
-                logger.debug(f"find tool: No result found. query: {query}")
-                return [f"No information found for the query '{query}'"]
-            logger.debug(f"find tool: {len(entries)} results found. query: {query}")
-            # Format results based on output format setting
-            if self.qdrant_settings.output_format == "json":
-                # Return as JSON strings for backward compatibility
-                return [json.dumps(entry) for entry in entries]
-            else:
-                # Return as formatted strings (default)
-                formatted_results = [self.format_search_result(entry) for entry in entries]
-                return formatted_results
+                logger.debug("find tool: No result found. query: %s", query)
+                return [f"No information found for the query '{query}'"] + failure_note
+            logger.debug("find tool: %s results found. query: %s", len(entries), query)
+            with (
+                span("format_results", {"mcp.hits": len(entries)}),
+                FORMAT_DURATION.labels(current_tool.get()).time(),
+            ):
+                # Format results based on output format setting
+                if self.qdrant_settings.output_format == "json":
+                    # Return as JSON strings for backward compatibility
+                    return [json.dumps(entry) for entry in entries] + failure_note
+                else:
+                    # Return as formatted strings (default)
+                    formatted_results = [self.format_search_result(entry) for entry in entries]
+                    return formatted_results + failure_note
 
         async def find_with_default_collection(
             ctx: Context,
             query: str,
+            query_filter: QueryFilter | None = None,
+        ) -> List[str]:
+            assert self.qdrant_settings.collection_name is not None
+            logger.debug("find_with_default_collection called. query: %s", query)
+            return await find(ctx, query, self.qdrant_settings.collection_name, query_filter)
+
+        async def find_batch(
+            ctx: Context,
+            queries: List[str],
+            collection_name: str,
+            query_filter: QueryFilter | None = None,
+        ) -> List[str]:
+            logger.debug("find_batch tool called. queries: %s, collection_name: %s", len(queries), collection_name)
+            queries = [await sanitize_input(query) for query in queries]
+            BATCH_SIZE.labels(current_tool.get(), "queries").observe(len(queries))
+            set_attributes({"mcp.batch_size": len(queries)})
+            await ctx.debug(f"Finding results for {len(queries)} queries")
+            results = await self.qdrant_connector.search_batch(
+                queries,
+                collection_name=collection_name,
+                limit=self.qdrant_settings.search_limit,
+                projection=self.find_projection,
+                query_filter=to_qdrant_filter(query_filter) if query_filter else None,
+            )
+            hits = sum(len(entries) for entries in results)
+            set_attributes({"mcp.hits": hits})
+            with span("format_results", {"mcp.hits": hits}), FORMAT_DURATION.labels(current_tool.get()).time():
+                return self.format_batch_results(queries, results)
+
+        async def find_batch_with_default_collection(
+            ctx: Context,
+            queries: List[str],
+            query_filter: QueryFilter | None = None,
         ) -> List[str]:
             assert self.qdrant_settings.collection_name is not None
-            logger.debug(f"find_with_default_collection called. query: {query}")
-            return await find(ctx, query, self.qdrant_settings.collection_name)
+            return await find_batch(ctx, queries, self.qdrant_settings.collection_name, query_filter)
 
         async def find_by_metadata(
             ctx: Context,
-            metadata_key: str,
-            metadata_value: str,
             collection_name: str,
+            metadata_key: str | None = None,
+            metadata_value: str | None = None,
+            cursor: str | None = None,
+            query_filter: QueryFilter | None = None,
         ) -> List[str]:
-            logger.debug(f"find_by_metadata tool called. key: {metadata_key}, value: {metadata_value}, collection_name: {collection_name}")
+            logger.debug("find_by_metadata tool called. key: %s, value: %s, collection_name: %s, cursor: %s", metadata_key, metadata_value, collection_name, cursor)
             await ctx.debug(f"Finding results by metadata {metadata_key}={metadata_value}")
             if collection_name:
                 await ctx.debug(
                     f"Using collection: {collection_name}"
                 )
-            entries = await self.qdrant_connector.search_by_metadata(
+            if not metadata_key and query_filter is None:
+                return ["Either metadata_key and metadata_value, or query_filter is required"]
+            # The cursor is only valid for the query it was returned for
+            filter_scope = query_filter.model_dump(exclude_defaults=True) if query_filter else None
+            scope = (collection_name, metadata_key, metadata_value, filter_scope)
+            entries, next_offset = await self.qdrant_connector.search_by_metadata_page(
                 metadata_key,
                 metadata_value,
                 collection_name=collection_name,
                 limit=self.qdrant_settings.search_limit,
+                offset=decode_cursor(cursor, *scope) if cursor else None,
+                projection=self.find_by_metadata_projection,
+                query_filter=to_qdrant_filter(query_filter) if query_filter else None,
             )
+            set_attributes({"mcp.limit": self.qdrant_settings.search_limit, "mcp.hits": len(entries)})
             if not entries:
-                logger.debug(f"find_by_metadata tool: No result found. key: {metadata_key}, value: {metadata_value}")
+                logger.debug("find_by_metadata tool: No result found. key: %s, value: %s", metadata_key, metadata_value)
+                if not metadata_key:
+                    return ["No information found for the filter"]
                 return [f"No information found for metadata {metadata_key}='{metadata_value}'"]
-            logger.debug(f"find_by_metadata tool: {len(entries)} results found. key: {metadata_key}, value: {metadata_value}")
-            # Format results based on output format setting
-            if self.qdrant_settings.output_format == "json":
-                # Return as JSON strings for backward compatibility
-                return [json.dumps(entry) for entry in entries]
-            else:
-                # Return as formatted strings (default)
-                formatted_results = [self.format_search_result(entry) for entry in entries]
-                return formatted_results
+            logger.debug("find_by_metadata tool: %s results found. key: %s, value: %s", len(entries), metadata_key, metadata_value)
+            next_cursor = encode_cursor(next_offset, *scope) if next_offset is not None else None
+            with (
+                span("format_results", {"mcp.hits": len(entries)}),
+                FORMAT_DURATION.labels(current_tool.get()).time(),
+            ):
+                # Format results based on output format setting
+                if self.qdrant_settings.output_format == "json":
+                    # Return as JSON strings for backward compatibility
+                    results = [json.dumps(entry) for entry in entries]
+                    if next_cursor:
+                        results.append(json.dumps({"next_cursor": next_cursor}))
+                    return results
+                else:
+                    # Return as formatted strings (default)
+                    formatted_results = [self.format_search_result(entry) for entry in entries]
+                    if next_cursor:
+                        formatted_results.append(
+                            f"More results available, pass cursor '{next_cursor}' to get the next page"
+                        )
+                    return formatted_results
 
         async def find_by_metadata_with_default_collection(
             ctx: Context,
-            metadata_key: str,
-            metadata_value: str,
+            metadata_key: str | None = None,
+            metadata_value: str | None = None,
+            cursor: str | None = None,
+            query_filter: QueryFilter | None = None,
         ) -> List[str]:
             assert self.qdrant_settings.collection_name is not None
-            logger.debug(f"find_by_metadata_with_default_collection called. key: {metadata_key}, value: {metadata_value}")
-            return await find_by_metadata(ctx, metadata_key, metadata_value, self.qdrant_settings.collection_name)
+            logger.debug("find_by_metadata_with_default_collection called. key: %s, value: %s", metadata_key, metadata_value)
+            return await find_by_metadata(
+                ctx,
+                self.qdrant_settings.collection_name,
+                metadata_key,
+                metadata_value,
+                cursor,
+                query_filter,
+            )
 
         # Register the tools depending on the configuration
 
@@ -234,6 +704,11 @@ class QdrantMCPServer(FastMCP):
                 name="qdrant-find",
                 description=self.tool_settings.tool_find_description,
             )
+            self.add_tool(
+                find_batch_with_default_collection,
+                name="qdrant-find-batch",
+                description=self.tool_settings.tool_find_batch_description,
+            )
             self.add_tool(
                 find_by_metadata_with_default_collection,
                 name="qdrant-find-by-metadata",
@@ -245,6 +720,11 @@ class QdrantMCPServer(FastMCP):
                 name="qdrant-find",
                 description=self.tool_settings.tool_find_description,
             )
+            self.add_tool(
+                find_batch,
+                name="qdrant-find-batch",
+                description=self.tool_settings.tool_find_batch_description,
+            )
             self.add_tool(
                 find_by_metadata,
                 name="qdrant-find-by-metadata",
@@ -260,9 +740,19 @@ class QdrantMCPServer(FastMCP):
                     name="qdrant-store",
                     description=self.tool_settings.tool_store_description,
                 )
+                self.add_tool(
+                    store_batch_with_default_collection,
+                    name="qdrant-store-batch",
+                    description=self.tool_settings.tool_store_batch_description,
+                )
             else:
                 self.add_tool(
                     store,
                     name="qdrant-store",
                     description=self.tool_settings.tool_store_description,
                 )
+                self.add_tool(
+                    store_batch,
+                    name="qdrant-store-batch",
+                    description=self.tool_settings.tool_store_batch_description,
+                )
@@ -0,0 +1,154 @@
+import functools
+import inspect
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+from mcp_server_qdrant.logger import debug_sample
+from mcp_server_qdrant.tracing import span
+
+T = TypeVar("T")
+
+# The metrics of the server, kept apart from the default registry of the process. With several worker
+# processes, PROMETHEUS_MULTIPROC_DIR is set and every worker writes its values to files in that directory.
+REGISTRY = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+# The tool being handled, so the stages deeper in the call can be labeled with it
+current_tool: ContextVar[str] = ContextVar("current_tool", default="none")
+
+TOOL_DURATION = Histogram(
+    "mcp_tool_duration_seconds",
+    "End-to-end latency of the tool calls.",
+    ["tool", "collection"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+EMBED_DURATION = Histogram(
+    "mcp_embed_duration_seconds",
+    "Time spent embedding the queries and documents, including the cache lookups.",
+    ["tool", "kind"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+QDRANT_DURATION = Histogram(
+    "mcp_qdrant_duration_seconds",
+    "Time spent in the Qdrant requests, including the retries.",
+    ["tool", "collection", "operation"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+FORMAT_DURATION = Histogram(
+    "mcp_format_duration_seconds",
+    "Time spent formatting the results of the tools.",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+BATCH_SIZE = Histogram(
+    "mcp_batch_size",
+    "Number of items in the batches, e.g. the queries of qdrant-find-batch or the micro-batched queries.",
+    ["tool", "kind"],
+    buckets=SIZE_BUCKETS,
+    registry=REGISTRY,
+)
+CACHE_REQUESTS = Counter(
+    "mcp_cache_requests_total",
+    "Lookups in the caches, by their result.",
+    ["tool", "cache", "result"],
+    registry=REGISTRY,
+)
+ERRORS = Counter(
+    "mcp_errors_total",
+    "Tool calls failed with an exception.",
+    ["tool", "collection", "error"],
+    registry=REGISTRY,
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "mcp_embedding_executor_queue_depth",
+    "Embedding tasks submitted to the executor or waiting for a slot, which are not finished yet.",
+    ["mode"],
+    registry=REGISTRY,
+    # Summed over the running workers
+    multiprocess_mode="livesum",
+)
+EXECUTOR_WAIT = Histogram(
+    "mcp_embedding_executor_wait_seconds",
+    "Time the embedding tasks waited for a worker of the executor.",
+    ["mode"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+RESILIENCE_EVENTS = Counter(
+    "mcp_resilience_events_total",
+    "Calls, failures, retries, hedges and circuit breaker decisions of the backend calls.",
+    ["backend", "operation", "event"],
+    registry=REGISTRY,
+)
+
+
+def latest() -> bytes:
+    """
+    Render the metrics in the Prometheus text format. With several worker processes, the values of all the
+    workers are aggregated, whichever worker answers the scrape.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead():
+    """Drop the live gauges of the current worker process, when it exits."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def record_cache(cache: str, hit: bool, count: int = 1):
+    """Count lookups in a cache."""
+    CACHE_REQUESTS.labels(current_tool.get(), cache, "hit" if hit else "miss").inc(count)
+
+
+def instrument_tool(
+    tool: str, fn: Callable[..., Awaitable[T]], default_collection: Optional[str] = None
+) -> Callable[..., Awaitable[T]]:
+    """
+    Wrap a tool function, to measure its latency, count its errors and trace it in a root span. Whether the
+    debug records of the call are sampled is decided once for the call. The signature of the function is kept,
+    so the tool arguments are still derived from it.
+    :param tool: The name of the tool.
+    :param fn: The tool function.
+    :param default_collection: The collection of the tools, which do not take a collection name.
+    """
+
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        arguments = signature.bind_partial(*args, **kwargs).arguments
+        collection = arguments.get("collection_name") or default_collection or ""
+        if arguments.get("collection_names"):
+            # Searches in several collections are not split by collection, to bound the number of series
+            collection = "*"
+        token = current_tool.set(tool)
+        sample_token = debug_sample.set(random.random())
+        started = time.perf_counter()
+        try:
+            with span(tool, {"mcp.tool.name": tool, "db.collection.name": collection}):
+                return await fn(*args, **kwargs)
+        except Exception as e:
+            ERRORS.labels(tool, collection, type(e).__name__).inc()
+            raise
+        finally:
+            TOOL_DURATION.labels(tool, collection).observe(time.perf_counter() - started)
+            debug_sample.reset(sample_token)
+            current_tool.reset(token)
+
+    return wrapper
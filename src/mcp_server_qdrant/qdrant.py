@@ -1,15 +1,30 @@
+import asyncio
+import base64
+import fnmatch
+import heapq
+import json
+import logging
+import time
 import uuid
-import os
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Mapping, Optional, Tuple, TypeVar
+import httpx
 from pydantic import BaseModel
 from qdrant_client import AsyncQdrantClient, models
-from mcp_server_qdrant.embeddings.base import EmbeddingProvider
+from qdrant_client.http.exceptions import UnexpectedResponse
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, SparseEmbeddingProvider
+from mcp_server_qdrant.filters import filter_keys
 from mcp_server_qdrant.logger import get_logger
+from mcp_server_qdrant.metrics import EMBED_DURATION, QDRANT_DURATION, current_tool
+from mcp_server_qdrant.tracing import span
+from mcp_server_qdrant.resilience import Resilience
+from mcp_server_qdrant.result_cache import ResultCache
 
 logger = get_logger(__name__)
 
 Metadata = Dict[str, Any]
 
+T = TypeVar("T")
+
 
 class Entry(BaseModel):
     """
@@ -30,6 +45,338 @@ class Entry(BaseModel):
     metadata: Optional[Metadata] = None
 
 
+class StoreResult(BaseModel):
+    """
+    The outcome of storing a single entry as a part of a batch.
+    """
+
+    index: int
+    id: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+
+
+class CollectionInfo(BaseModel):
+    """
+    Cached metadata of a Qdrant collection.
+    """
+
+    exists: bool
+    vector_size: Optional[int] = None
+    distance: Optional[models.Distance] = None
+    vector_names: List[str] = []
+    vector_sizes: Dict[str, int] = {}
+    indexed_fields: Dict[str, str] = {}
+    sparse_vector_names: List[str] = []
+
+
+class CollectionProfile(BaseModel):
+    """
+    Storage, indexing and search tuning of the collections. Applied when the connector creates a
+    collection, except the search parameters, which are used by every query.
+    """
+
+    quantization: Literal["none", "scalar", "binary", "product"] = "none"
+    quantization_always_ram: bool = True
+    product_compression: Literal["x4", "x8", "x16", "x32", "x64"] = "x16"
+    on_disk: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    hnsw_on_disk: Optional[bool] = None
+    indexing_threshold: Optional[int] = None
+    default_segment_number: Optional[int] = None
+    search_hnsw_ef: Optional[int] = None
+    search_exact: bool = False
+    search_rescore: Optional[bool] = None
+    search_oversampling: Optional[float] = None
+
+    def vector_params(self, size: int) -> models.VectorParams:
+        """Get the parameters of the vector of a new collection."""
+        return models.VectorParams(
+            size=size,
+            distance=models.Distance.COSINE,
+            on_disk=self.on_disk or None,
+        )
+
+    def hnsw_config(self) -> Optional[models.HnswConfigDiff]:
+        """Get the HNSW index parameters of a new collection, None keeps the server defaults."""
+        if self.hnsw_m is None and self.hnsw_ef_construct is None and self.hnsw_on_disk is None:
+            return None
+        return models.HnswConfigDiff(
+            m=self.hnsw_m,
+            ef_construct=self.hnsw_ef_construct,
+            on_disk=self.hnsw_on_disk,
+        )
+
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        """Get the quantization of a new collection, None disables it."""
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
+            )
+        if self.quantization == "product":
+            return models.ProductQuantization(
+                product=models.ProductQuantizationConfig(
+                    compression=models.CompressionRatio(self.product_compression),
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        return None
+
+    def optimizers_config(self) -> Optional[models.OptimizersConfigDiff]:
+        """Get the optimizer thresholds of a new collection, None keeps the server defaults."""
+        if self.indexing_threshold is None and self.default_segment_number is None:
+            return None
+        return models.OptimizersConfigDiff(
+            indexing_threshold=self.indexing_threshold,
+            default_segment_number=self.default_segment_number,
+        )
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        """Get the parameters of the queries, None keeps the server defaults."""
+        quantization = None
+        if self.search_rescore is not None or self.search_oversampling is not None:
+            quantization = models.QuantizationSearchParams(
+                rescore=self.search_rescore,
+                oversampling=self.search_oversampling,
+            )
+        if self.search_hnsw_ef is None and not self.search_exact and quantization is None:
+            return None
+        return models.SearchParams(
+            hnsw_ef=self.search_hnsw_ef,
+            exact=self.search_exact,
+            quantization=quantization,
+        )
+
+
+class ConnectionProfile(BaseModel):
+    """
+    Transport and connection tuning of the Qdrant client. Unset fields keep the defaults of the client.
+    :param timeout: The default timeout of the requests, in seconds.
+    :param prefer_grpc: Whether to talk to Qdrant over gRPC instead of REST.
+    :param grpc_port: The gRPC port of the Qdrant server.
+    :param http2: Whether the REST requests use HTTP/2. Requires the `h2` package.
+    :param pool_size: The maximum number of REST connections, or the number of gRPC channels.
+    :param keepalive: The number of seconds idle REST connections are kept open, or the interval of the
+                      gRPC keepalive pings.
+    :param search_timeout: The timeout of the searches, in seconds, overriding the default timeout.
+    :param write_timeout: The timeout of the upserts, in seconds, overriding the default timeout.
+    """
+
+    timeout: int = 30
+    prefer_grpc: bool = False
+    grpc_port: int = 6334
+    http2: bool = False
+    pool_size: Optional[int] = None
+    keepalive: Optional[float] = None
+    search_timeout: Optional[int] = None
+    write_timeout: Optional[int] = None
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        """Get the arguments of the Qdrant client."""
+        kwargs: Dict[str, Any] = {
+            "timeout": self.timeout,
+            "prefer_grpc": self.prefer_grpc,
+            "grpc_port": self.grpc_port,
+            "http2": self.http2,
+        }
+        if self.prefer_grpc:
+            kwargs["pool_size"] = self.pool_size
+            if self.keepalive is not None:
+                kwargs["grpc_options"] = {"grpc.keepalive_time_ms": int(self.keepalive * 1000)}
+        elif self.keepalive is not None:
+            # The client disables keep-alive for localhost, unless the limits are given explicitly
+            kwargs["limits"] = httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size or 20,
+                keepalive_expiry=self.keepalive,
+            )
+        else:
+            kwargs["pool_size"] = self.pool_size
+        return kwargs
+
+
+RESULT_PAYLOAD_FIELDS = ["id", "karar_no", "karar_tarihi", "daire", "esas_no", "durum", "imported_at", "text"]
+
+
+class PayloadProjection(BaseModel):
+    """
+    Selection of the payload fields returned by the searches, so Qdrant does not send whole payloads of
+    which only a few fields are used.
+    :param include: The fields to return. None returns the fields of the search results, an empty list
+                    returns all of them.
+    :param exclude: The fields not to return.
+    :param max_text_length: The maximum number of characters of the returned text, longer texts are cut
+                            to a snippet. None returns the whole text.
+    """
+
+    include: Optional[List[str]] = None
+    exclude: List[str] = []
+    max_text_length: Optional[int] = None
+
+    def with_payload(self) -> models.WithPayloadInterface:
+        """Get the payload selector of the Qdrant requests."""
+        include = RESULT_PAYLOAD_FIELDS if self.include is None else self.include
+        if include:
+            return [field for field in include if field not in self.exclude]
+        if self.exclude:
+            return models.PayloadSelectorExclude(exclude=self.exclude)
+        return True
+
+
+def encode_cursor(offset: models.ExtendedPointId, *scope: Any) -> str:
+    """
+    Encode the offset of the next page into an opaque cursor. The cursor is bound to the scope it was
+    created for, e.g. the filter of the query, so it cannot be reused with another query.
+    """
+    data = json.dumps({"offset": offset, "scope": list(scope)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *scope: Any) -> models.ExtendedPointId:
+    """
+    Decode the offset of the next page from a cursor created by `encode_cursor` with the same scope.
+    :raises ValueError: If the cursor is malformed or it was created for another scope.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset, cursor_scope = data["offset"], data["scope"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if cursor_scope != list(scope):
+        raise ValueError("The cursor was created for another query")
+    return offset
+
+
+def is_glob_pattern(name: str) -> bool:
+    """
+    Check whether a collection name is a glob pattern matching several collections.
+    """
+    return any(char in name for char in "*?[")
+
+
+def make_snippet(text: str, max_length: int, query: Optional[str] = None) -> str:
+    """
+    Cut a text to at most `max_length` characters, plus an ellipsis on each cut side. The snippet is
+    centered on the first word of the query found in the text, or starts at the beginning of the text.
+    """
+    if len(text) <= max_length:
+        return text
+    start = 0
+    if query:
+        lowered = text.lower()
+        positions = [lowered.find(word) for word in query.lower().split() if len(word) > 2]
+        positions = [position for position in positions if position >= 0]
+        if positions:
+            start = max(0, min(min(positions) - max_length // 3, len(text) - max_length))
+            # Do not cut words at the start of the snippet
+            if start > 0:
+                space = text.find(" ", start, min(positions))
+                start = space + 1 if space >= 0 else start
+    end = start + max_length
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        end = space if space > start else end
+    snippet = text[start:end].strip()
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+def is_not_found_error(error: Exception) -> bool:
+    """
+    Check whether an exception raised by the Qdrant client means that the collection does not exist.
+    """
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code == 404
+    # Local mode raises plain ValueErrors for missing collections
+    return isinstance(error, ValueError) and "not found" in str(error).lower()
+
+
+def hit_count(result: Any) -> Optional[int]:
+    """
+    Count the points returned by a query, a batch of queries or a scroll, None for the other requests.
+    """
+    # Duck typed, as `models.QueryResponse` is not the class of the query responses
+    if isinstance(getattr(result, "points", None), list):
+        return len(result.points)
+    if isinstance(result, list) and result and all(hasattr(response, "points") for response in result):
+        return sum(len(response.points) for response in result)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], list):
+        # The points and the next page offset of a scroll
+        return len(result[0])
+    return None
+
+
+def named_vector(vector: Any, vector_name: Optional[str]) -> Any:
+    """
+    Wrap a vector for a point of a collection, which has either a single unnamed vector or named vectors.
+    """
+    return {vector_name: vector} if vector_name is not None else vector
+
+
+def contains_document(vector: Any) -> bool:
+    """
+    Check whether the vector of a point, or one of its named vectors, is left for Qdrant to embed.
+    """
+    if isinstance(vector, dict):
+        return any(isinstance(named, models.Document) for named in vector.values())
+    return isinstance(vector, models.Document)
+
+
+def is_inference_unsupported_error(error: Exception) -> bool:
+    """
+    Check whether an exception raised by the Qdrant client means that the server cannot embed documents.
+    """
+    if not isinstance(error, UnexpectedResponse):
+        return False
+    if error.status_code == 501:
+        return True
+    content = error.content.decode(errors="ignore").lower()
+    return error.status_code in (400, 422) and ("inference" in content or "document" in content)
+
+
+class QueryVectors:
+    """
+    The vectors of a query, embedded on the first use and shared by the searches in several collections.
+    :param connector: The connector embedding the query.
+    :param query: The query to embed.
+    """
+
+    def __init__(self, connector: "QdrantConnector", query: str):
+        self.connector = connector
+        self.query = query
+        self._dense: Optional[asyncio.Future] = None
+        self._sparse: Optional[asyncio.Future] = None
+
+    async def dense(self) -> Any:
+        """Get the dense query vector, a `models.Document` if Qdrant embeds it."""
+        if self.connector._server_inference_model is not None:
+            # Nothing to embed locally
+            return await self.connector._query_vector(self.query)
+        if self._dense is None:
+            self._dense = asyncio.ensure_future(self.connector._query_vector(self.query))
+        # Cancelling one of the searches should not cancel the embedding for the others
+        return await asyncio.shield(self._dense)
+
+    async def sparse(self) -> models.SparseVector:
+        """Get the sparse query vector."""
+        sparse_embedding_provider = self.connector._sparse_embedding_provider
+        assert sparse_embedding_provider is not None
+        if self._sparse is None:
+            self._sparse = asyncio.ensure_future(self._embed_sparse(sparse_embedding_provider))
+        return await asyncio.shield(self._sparse)
+
+    async def _embed_sparse(self, sparse_embedding_provider: SparseEmbeddingProvider) -> models.SparseVector:
+        with span("embed_sparse_query"), EMBED_DURATION.labels(current_tool.get(), "sparse_query").time():
+            return await sparse_embedding_provider.embed_query(self.query)
+
+
 class QdrantConnector:
     """
     Encapsulates the connection to a Qdrant server and all the methods to interact with it.
@@ -39,6 +386,28 @@ class QdrantConnector:
                             the collection name to be provided.
     :param embedding_provider: The embedding provider to use.
     :param qdrant_local_path: The path to the storage directory for the Qdrant client, if local mode is used.
+    :param collection_cache_ttl: The number of seconds the metadata of a collection is cached for.
+    :param server_inference_model: The name of the model Qdrant should embed the documents and queries with.
+                                   If not provided, or if the server does not support inference, the embedding
+                                   provider is used.
+    :param vector_name: The name of the vector new collections are created with. If not provided, the name
+                        suggested by the embedding provider is used.
+    :param collection_profile: The storage, indexing and search tuning of the collections.
+    :param payload_projection: The payload fields returned by the searches, unless a search asks for others.
+    :param payload_indexes: The payload fields to index, mapped to their schema type, e.g. "keyword", "integer"
+                            or "datetime". The indexes are created along with the collections.
+    :param sparse_embedding_provider: The sparse embedding provider to use next to the dense one, optional.
+                                      If provided, new collections get a sparse vector as well, and searches
+                                      in them fuse the dense and sparse results.
+    :param hybrid_fusion: How the dense and sparse results are fused, "rrf" (reciprocal rank fusion) or
+                          "dbsf" (distribution-based score fusion).
+    :param hybrid_prefetch_limit: The number of candidates of each of the dense and sparse searches. If not
+                                  provided, four times the limit of the search.
+    :param connection_profile: The transport and the connection tuning of the Qdrant client.
+    :param resilience: The retry, hedging and circuit breaker state of the Qdrant calls, optional. If not
+                       provided, the default policy is used.
+    :param result_cache: The cache of the search results, optional. The cached results of a collection are
+                         dropped whenever this connector writes to it.
     """
 
     def __init__(
@@ -48,21 +417,59 @@ class QdrantConnector:
         collection_name: Optional[str],
         embedding_provider: EmbeddingProvider,
         qdrant_local_path: Optional[str] = None,
+        collection_cache_ttl: float = 60.0,
+        server_inference_model: Optional[str] = None,
+        vector_name: Optional[str] = None,
+        collection_profile: Optional[CollectionProfile] = None,
+        payload_projection: Optional[PayloadProjection] = None,
+        payload_indexes: Optional[Mapping[str, str]] = None,
+        sparse_embedding_provider: Optional[SparseEmbeddingProvider] = None,
+        hybrid_fusion: Literal["rrf", "dbsf"] = "rrf",
+        hybrid_prefetch_limit: Optional[int] = None,
+        connection_profile: Optional[ConnectionProfile] = None,
+        resilience: Optional[Resilience] = None,
+        result_cache: Optional[ResultCache] = None,
     ):
         self._qdrant_url = qdrant_url.rstrip("/") if qdrant_url else None
         self._qdrant_api_key = qdrant_api_key
         self._default_collection_name = collection_name
         self._embedding_provider = embedding_provider
+        self._vector_name = vector_name
+        self._collection_profile = collection_profile or CollectionProfile()
+        self._search_params = self._collection_profile.search_params()
+        self._payload_projection = payload_projection or PayloadProjection()
+        self._payload_indexes = {
+            field: models.PayloadSchemaType(schema) for field, schema in (payload_indexes or {}).items()
+        }
+        self._unindexed_filters: Dict[Tuple[str, str], int] = {}
+        self._sparse_embedding_provider = sparse_embedding_provider
+        self._hybrid_fusion = models.Fusion(hybrid_fusion)
+        self._hybrid_prefetch_limit = hybrid_prefetch_limit
+        self._result_cache = result_cache
+        self._connection_profile = connection_profile or ConnectionProfile()
+        self._search_timeout = self._connection_profile.search_timeout
+        self._resilience = resilience or Resilience("qdrant")
+        self._write_timeout = self._connection_profile.write_timeout
+        if server_inference_model and (qdrant_local_path or qdrant_url == ":memory:"):
+            logger.warning("Server inference is not available in local mode, embedding locally")
+            server_inference_model = None
+        self._server_inference_model = server_inference_model
         self._client = AsyncQdrantClient(
-            location=qdrant_url, api_key=qdrant_api_key, path=qdrant_local_path, timeout=int(os.getenv("QDRANT_TIMEOUT", "30"))
+            location=qdrant_url,
+            api_key=qdrant_api_key,
+            path=qdrant_local_path,
+            cloud_inference=server_inference_model is not None,
+            **self._connection_profile.client_kwargs(),
         )
+        self._collection_cache_ttl = collection_cache_ttl
+        self._collection_cache: Dict[str, Tuple[float, CollectionInfo]] = {}
 
     async def get_collection_names(self) -> list[str]:
         """
         Get the names of all collections in the Qdrant server.
         :return: A list of collection names.
         """
-        response = await self._client.get_collections()
+        response = await self._call_qdrant("get_collections", None, self._client.get_collections)
         return [collection.name for collection in response.collections]
 
     async def store(self, entry: Entry, *, collection_name: Optional[str] = None):
@@ -72,18 +479,271 @@ class QdrantConnector:
         :param collection_name: The name of the collection to store the information in, optional. If not provided,
                                 the default collection is used.
         """
-        logger.debug(f"store called. Entry: {entry}, Collection: {collection_name}")
+        logger.debug("store called. Entry: %s, Collection: %s", entry, collection_name)
+        collection_name = collection_name or self._default_collection_name
+        assert collection_name is not None
+        collection_info = await self._ensure_collection_exists(collection_name)
+        vector_name = self._resolve_vector_name(collection_name, collection_info)
+        sparse_vector_name = self._resolve_sparse_vector_name(collection_name, collection_info)
+
+        payload = self._entry_payload(entry)
+        point_id = uuid.uuid4().hex
+
+        async def upsert():
+            # Embed the document, unless Qdrant does it
+            vectors = await self._point_vectors([entry.content], vector_name, sparse_vector_name)
+            points = [models.PointStruct(id=point_id, vector=vectors[0], payload=payload)]
+            # The point ID is fixed, so repeating the upsert is safe
+            await self._call_qdrant(
+                "upsert",
+                collection_name,
+                lambda: self._client.upsert(
+                    collection_name=collection_name, points=points, timeout=self._write_timeout
+                ),
+                attributes={"qdrant.batch_size": len(points)},
+            )
+
+        try:
+            await self._with_inference_fallback(upsert)
+        except Exception as e:
+            if is_not_found_error(e):
+                self.invalidate_collection_info(collection_name)
+            raise
+        self.invalidate_results(collection_name)
+        logger.debug("store completed. Collection: %s, Payload: %s", collection_name, payload)
+
+    async def store_batch(
+        self,
+        entries: List[Entry],
+        *,
+        collection_name: Optional[str] = None,
+        batch_size: int = 64,
+    ) -> List[StoreResult]:
+        """
+        Store many entries in the Qdrant collection. Entries are embedded in batches of `batch_size` and every
+        batch is upserted with a single request. The next batch is embedded while the previous one is uploaded.
+        :param entries: The entries to store in the Qdrant collection.
+        :param collection_name: The name of the collection to store the information in, optional. If not provided,
+                                the default collection is used.
+        :param batch_size: The number of entries to embed and upsert at once.
+        :return: One result per entry, in the same order as the entries.
+        """
+        logger.debug("store_batch called. Entries: %s, Collection: %s", len(entries), collection_name)
         collection_name = collection_name or self._default_collection_name
         assert collection_name is not None
-        await self._ensure_collection_exists(collection_name)
+        assert batch_size > 0
+        collection_info = await self._ensure_collection_exists(collection_name)
+        vector_name = self._resolve_vector_name(collection_name, collection_info)
+        sparse_vector_name = self._resolve_sparse_vector_name(collection_name, collection_info)
+
+        results: List[StoreResult] = [
+            StoreResult(index=index, success=False) for index in range(len(entries))
+        ]
+        valid_indices = []
+        for index, entry in enumerate(entries):
+            if entry.content:
+                valid_indices.append(index)
+            else:
+                results[index].error = "Empty content"
+
+        pending_upsert: Optional[asyncio.Task] = None
+        for start in range(0, len(valid_indices), batch_size):
+            batch_indices = valid_indices[start : start + batch_size]
+            batch_entries = [entries[index] for index in batch_indices]
+            try:
+                vectors = await self._point_vectors(
+                    [entry.content for entry in batch_entries], vector_name, sparse_vector_name
+                )
+            except Exception as e:
+                logger.error(f"store_batch embedding failed: {e}")
+                for index in batch_indices:
+                    results[index].error = f"Embedding failed: {e}"
+                continue
+
+            # Wait for the previous batch before starting the next upload, so at most one
+            # batch is uploading while the following one is being embedded
+            if pending_upsert is not None:
+                await pending_upsert
+            pending_upsert = asyncio.create_task(
+                self._upsert_batch(
+                    collection_name,
+                    vector_name,
+                    sparse_vector_name,
+                    batch_indices,
+                    batch_entries,
+                    vectors,
+                    results,
+                )
+            )
+
+        if pending_upsert is not None:
+            await pending_upsert
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "store_batch completed. Collection: %s, Stored: %s/%s",
+                collection_name,
+                sum(result.success for result in results),
+                len(entries),
+            )
+        return results
+
+    async def _upsert_batch(
+        self,
+        collection_name: str,
+        vector_name: Optional[str],
+        sparse_vector_name: Optional[str],
+        indices: List[int],
+        entries: List[Entry],
+        vectors: List[Any],
+        results: List[StoreResult],
+    ):
+        """
+        Upsert a batch of points and record the outcome for each of the entries it contains.
+        """
+        points = [
+            models.PointStruct(
+                id=uuid.uuid4().hex,
+                vector=vector,
+                payload=self._entry_payload(entry),
+            )
+            for entry, vector in zip(entries, vectors)
+        ]
+
+        async def upsert():
+            if self._server_inference_model is None and contains_document(vectors[0]):
+                # Server inference got disabled after the vectors of this batch were prepared
+                local_vectors = await self._point_vectors(
+                    [entry.content for entry in entries], vector_name, sparse_vector_name
+                )
+                for point, vector in zip(points, local_vectors):
+                    point.vector = vector
+            await self._call_qdrant(
+                "upsert",
+                collection_name,
+                lambda: self._client.upsert(
+                    collection_name=collection_name, points=points, timeout=self._write_timeout
+                ),
+                attributes={"qdrant.batch_size": len(points)},
+            )
+
+        try:
+            await self._with_inference_fallback(upsert)
+        except Exception as e:
+            logger.error(f"store_batch upsert failed: {e}")
+            if is_not_found_error(e):
+                self.invalidate_collection_info(collection_name)
+            for index in indices:
+                results[index].error = f"Upsert failed: {e}"
+            return
+        self.invalidate_results(collection_name)
+        for index, point in zip(indices, points):
+            results[index].id = str(point.id)
+            results[index].success = True
+
+    async def _point_vectors(
+        self, documents: List[str], vector_name: Optional[str], sparse_vector_name: Optional[str]
+    ) -> List[Any]:
+        """
+        Embed documents into the vectors of their points, the dense one and, in hybrid collections, the
+        sparse one.
+        """
+        vectors = await self._document_vectors(documents)
+        if sparse_vector_name is None:
+            return [named_vector(vector, vector_name) for vector in vectors]
+        assert self._sparse_embedding_provider is not None
+        with (
+            span("embed_sparse_documents", {"embedding.batch_size": len(documents)}),
+            EMBED_DURATION.labels(current_tool.get(), "sparse_documents").time(),
+        ):
+            sparse_vectors = await self._sparse_embedding_provider.embed_documents(documents)
+        return [
+            {vector_name or "": vector, sparse_vector_name: sparse_vector}
+            for vector, sparse_vector in zip(vectors, sparse_vectors)
+        ]
+
+    async def _document_vectors(self, documents: List[str]) -> List[Any]:
+        """
+        Get the vectors to upsert for the documents. These are `models.Document` objects if Qdrant embeds
+        them, or the embeddings computed by the embedding provider otherwise.
+        """
+        if self._server_inference_model is not None:
+            return [
+                models.Document(text=document, model=self._server_inference_model)
+                for document in documents
+            ]
+        with (
+            span("embed_documents", {"embedding.batch_size": len(documents)}) as current_span,
+            EMBED_DURATION.labels(current_tool.get(), "documents").time(),
+        ):
+            embeddings = await self._embedding_provider.embed_documents_array(documents)
+            current_span.set_attribute("embedding.dimension", embeddings.shape[-1])
+        logger.debug("document embeddings shape: %s", embeddings.shape)
+        # A single conversion of the whole batch, the client serializes lists anyway
+        return embeddings.tolist()
 
-        # Embed the document
-        # ToDo: instead of embedding text explicitly, use `models.Document`,
-        # it should unlock usage of server-side inference.
-        embeddings = await self._embedding_provider.embed_documents([entry.content])
-        logger.debug(f"store embedding result (first 5 values): {embeddings[0][:5] if embeddings else None}")
+    async def _query_vector(self, query: str) -> Any:
+        """
+        Get the query to search with. This is a `models.Document` object if Qdrant embeds it, or the
+        embedding computed by the embedding provider otherwise.
+        """
+        if self._server_inference_model is not None:
+            return models.Document(text=query, model=self._server_inference_model)
+        with span("embed_query") as current_span, EMBED_DURATION.labels(current_tool.get(), "query").time():
+            embedding = await self._embedding_provider.embed_query_array(query)
+            current_span.set_attribute("embedding.dimension", embedding.shape[-1])
+            return embedding
+
+    async def _call_qdrant(
+        self,
+        operation: str,
+        collection_name: Optional[str],
+        request: Callable[[], Awaitable[T]],
+        *,
+        idempotent: bool = True,
+        hedge: bool = False,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> T:
+        """
+        Call Qdrant through the resilience layer, measuring the time of the call including the retries,
+        and tracing it in a span along with the number of points returned.
+        :param attributes: Further attributes of the span, e.g. the limit of a query.
+        """
+        span_attributes = {
+            "db.system": "qdrant",
+            "db.operation.name": operation,
+            "db.collection.name": collection_name,
+            **(attributes or {}),
+        }
+        with (
+            span(operation, span_attributes) as current_span,
+            QDRANT_DURATION.labels(current_tool.get(), collection_name or "", operation).time(),
+        ):
+            result = await self._resilience.call(operation, request, idempotent=idempotent, hedge=hedge)
+            hits = hit_count(result)
+            if hits is not None:
+                current_span.set_attribute("qdrant.hits", hits)
+            return result
 
-        payload = {
+    async def _with_inference_fallback(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a request, which embeds its inputs with `_document_vectors` or `_query_vector`. If Qdrant
+        cannot embed them, server inference gets disabled and the request is repeated with local embeddings.
+        """
+        try:
+            return await request()
+        except Exception as e:
+            if self._server_inference_model is None or not is_inference_unsupported_error(e):
+                raise
+            logger.warning(f"Server inference is not supported, falling back to local embeddings: {e}")
+            self._server_inference_model = None
+            return await request()
+
+    def _entry_payload(self, entry: Entry) -> Dict[str, Any]:
+        """
+        Build the payload stored along with the vector of an entry.
+        """
+        return {
             "source_id": entry.source_id,
             "url": entry.url,
             "title": entry.title,
@@ -95,20 +755,15 @@ class QdrantConnector:
             "tokenCountEstimate": entry.tokenCountEstimate,
             "text": entry.text,
         }
-        await self._client.upsert(
-            collection_name=collection_name,
-            points=[
-                models.PointStruct(
-                    id=uuid.uuid4().hex,
-                    #vector={vector_name: embeddings[0]},
-                    payload=payload,
-                )
-            ],
-        )
-        logger.debug(f"store completed. Collection: {collection_name}, Payload: {payload}")
 
     async def search(
-        self, query: str, *, collection_name: Optional[str] = None, limit: int = 10
+        self,
+        query: str,
+        *,
+        collection_name: Optional[str] = None,
+        limit: int = 10,
+        projection: Optional[PayloadProjection] = None,
+        query_filter: Optional[models.Filter] = None,
     ) -> list[Dict[str, Any]]:
         """
         Find points in the Qdrant collection. If there are no entries found, an empty list is returned.
@@ -116,45 +771,322 @@ class QdrantConnector:
         :param collection_name: The name of the collection to search in, optional. If not provided,
                                 the default collection is used.
         :param limit: The maximum number of entries to return.
+        :param projection: The payload fields to return, optional. If not provided, the projection of the
+                           connector is used.
+        :param query_filter: The filter the entries have to match, optional. Qdrant applies it during the
+                             search.
         :return: A list of entries found.
         """
-        logger.debug(f"search called. Query: {query}, Collection: {collection_name}, Limit: {limit}")
+        logger.debug("search called. Query: %s, Collection: %s, Limit: %s", query, collection_name, limit)
         collection_name = collection_name or self._default_collection_name
-        collection_exists = await self._client.collection_exists(collection_name)
-        if not collection_exists:
-            logger.debug(f"search: Collection not found: {collection_name}")
+        assert collection_name is not None
+        scored_results = await self._search_scored(
+            QueryVectors(self, query),
+            collection_name,
+            limit=limit,
+            projection=projection or self._payload_projection,
+            query_filter=query_filter,
+        )
+        return [result for _, result in scored_results]
+
+    async def search_batch(
+        self,
+        queries: List[str],
+        *,
+        collection_name: Optional[str] = None,
+        limit: int = 10,
+        projection: Optional[PayloadProjection] = None,
+        query_filter: Optional[models.Filter] = None,
+    ) -> List[list[Dict[str, Any]]]:
+        """
+        Find points for several queries at once. The queries are embedded with a single call of the embedding
+        provider and searched with a single request.
+        :param queries: The queries to use for the search.
+        :param collection_name: The name of the collection to search in, optional. If not provided,
+                                the default collection is used.
+        :param limit: The maximum number of entries to return for each query.
+        :param projection: The payload fields to return, optional. If not provided, the projection of the
+                           connector is used.
+        :param query_filter: The filter the entries have to match, optional.
+        :return: The entries found for each of the queries, in the same order as the queries.
+        """
+        logger.debug("search_batch called. Queries: %s, Collection: %s, Limit: %s", len(queries), collection_name, limit)
+        collection_name = collection_name or self._default_collection_name
+        assert collection_name is not None
+        if not queries:
             return []
+        collection_info = await self.get_collection_info(collection_name)
+        if not collection_info.exists:
+            logger.debug("search_batch: Collection not found: %s", collection_name)
+            return [[] for _ in queries]
 
-        # Embed the query
-        query_vector = await self._embedding_provider.embed_query(query)
-        logger.debug(f"query_vector type: {type(query_vector)}")
-        logger.debug(f"query_vector value: {query_vector}")
-        logger.debug(f"search embedding result (first 5 values): {query_vector[:5] if query_vector else None}")
+        vector_name = self._resolve_vector_name(collection_name, collection_info)
+        sparse_vector_name = self._resolve_sparse_vector_name(collection_name, collection_info)
+        projection = projection or self._payload_projection
+        if query_filter is not None:
+            self._check_filter_indexed(collection_name, collection_info, filter_keys(query_filter))
 
-        # Search in Qdrant
-        search_results = await self._client.query_points(
-            collection_name=collection_name,
-            query=query_vector,
-            limit=limit,
+        async def query_batch_points():
+            # Embed the queries, unless Qdrant does it
+            if self._server_inference_model is not None:
+                query_vectors: List[Any] = [await self._query_vector(query) for query in queries]
+            else:
+                with (
+                    span("embed_queries", {"embedding.batch_size": len(queries)}) as current_span,
+                    EMBED_DURATION.labels(current_tool.get(), "queries").time(),
+                ):
+                    embeddings = await self._embedding_provider.embed_queries_array(queries)
+                    current_span.set_attribute("embedding.dimension", embeddings.shape[-1])
+                query_vectors = list(embeddings)
+            if sparse_vector_name is not None:
+                assert self._sparse_embedding_provider is not None
+                with (
+                    span("embed_sparse_queries", {"embedding.batch_size": len(queries)}),
+                    EMBED_DURATION.labels(current_tool.get(), "sparse_queries").time(),
+                ):
+                    sparse_query_vectors = await asyncio.gather(
+                        *(self._sparse_embedding_provider.embed_query(query) for query in queries)
+                    )
+                requests = [
+                    models.QueryRequest(
+                        prefetch=self._hybrid_prefetch(
+                            query_vector, sparse_query_vector, vector_name, sparse_vector_name, limit, query_filter
+                        ),
+                        query=models.FusionQuery(fusion=self._hybrid_fusion),
+                        limit=limit,
+                        with_payload=projection.with_payload(),
+                    )
+                    for query_vector, sparse_query_vector in zip(query_vectors, sparse_query_vectors)
+                ]
+            else:
+                requests = [
+                    models.QueryRequest(
+                        query=query_vector,
+                        using=vector_name,
+                        limit=limit,
+                        params=self._search_params,
+                        filter=query_filter,
+                        with_payload=projection.with_payload(),
+                    )
+                    for query_vector in query_vectors
+                ]
+            return await self._call_qdrant(
+                "query_batch_points",
+                collection_name,
+                lambda: self._client.query_batch_points(
+                    collection_name=collection_name, requests=requests, timeout=self._search_timeout
+                ),
+                hedge=True,
+                attributes={"qdrant.batch_size": len(requests), "qdrant.limit": limit},
+            )
+
+        try:
+            responses = await self._with_inference_fallback(query_batch_points)
+        except Exception as e:
+            if not is_not_found_error(e):
+                raise
+            logger.debug("search_batch: Collection not found: %s", collection_name)
+            self.invalidate_collection_info(collection_name)
+            return [[] for _ in queries]
+
+        return [
+            [self._search_result(point.payload or {}, projection, query) for point in response.points]
+            for query, response in zip(queries, responses)
+        ]
+
+    async def search_collections(
+        self,
+        query: str,
+        collection_names: List[str],
+        *,
+        limit: int = 10,
+        projection: Optional[PayloadProjection] = None,
+        query_filter: Optional[models.Filter] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[list[Dict[str, Any]], List[str]]:
+        """
+        Find points in several collections at once. The query is embedded once, the collections are searched
+        concurrently and the results are merged by their score. Every result holds the name of its collection.
+        :param query: The query to use for the search.
+        :param collection_names: The names of the collections to search in, or glob patterns of them,
+                                 e.g. "kararlar_*".
+        :param limit: The maximum number of entries to return in total.
+        :param projection: The payload fields to return, optional. If not provided, the projection of the
+                           connector is used.
+        :param query_filter: The filter the entries have to match, optional.
+        :param timeout: The number of seconds to wait for each collection, optional. The results of the
+                        collections, which do not answer in time, are left out.
+        :return: The best entries of all the collections, and the names of the collections which failed or
+                 timed out.
+        """
+        logger.debug("search_collections called. Query: %s, Collections: %s, Limit: %s", query, collection_names, limit)
+        collection_names = await self._expand_collection_names(collection_names)
+        query_vectors = QueryVectors(self, query)
+        projection = projection or self._payload_projection
+
+        async def search_collection(collection_name: str) -> List[Tuple[float, Dict[str, Any]]]:
+            scored_results = await asyncio.wait_for(
+                self._search_scored(
+                    query_vectors,
+                    collection_name,
+                    limit=limit,
+                    projection=projection,
+                    query_filter=query_filter,
+                ),
+                timeout,
+            )
+            for _, result in scored_results:
+                result["collection_name"] = collection_name
+            return scored_results
+
+        responses = await asyncio.gather(
+            *(search_collection(collection_name) for collection_name in collection_names),
+            return_exceptions=True,
+        )
+        scored_results = []
+        failed_collections = []
+        for collection_name, response in zip(collection_names, responses):
+            if isinstance(response, BaseException):
+                if isinstance(response, asyncio.TimeoutError):
+                    logger.warning(f"search_collections: Collection {collection_name} timed out")
+                else:
+                    logger.error(f"search_collections: Collection {collection_name} failed: {response!r}")
+                failed_collections.append(collection_name)
+                continue
+            scored_results.extend(response)
+
+        best_results = heapq.nlargest(limit, scored_results, key=lambda scored_result: scored_result[0])
+        return [result for _, result in best_results], failed_collections
+
+    async def _expand_collection_names(self, collection_names: List[str]) -> List[str]:
+        """
+        Replace the glob patterns among the collection names with the names of the matching collections.
+        """
+        if not any(is_glob_pattern(name) for name in collection_names):
+            return list(dict.fromkeys(collection_names))
+        existing_names = await self.get_collection_names()
+        expanded_names = []
+        for name in collection_names:
+            if is_glob_pattern(name):
+                expanded_names.extend(sorted(fnmatch.filter(existing_names, name)))
+            else:
+                expanded_names.append(name)
+        return list(dict.fromkeys(expanded_names))
+
+    async def _search_scored(
+        self,
+        query_vectors: "QueryVectors",
+        collection_name: str,
+        *,
+        limit: int,
+        projection: PayloadProjection,
+        query_filter: Optional[models.Filter],
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find points in a single collection, reusing the cached results if there are any.
+        :return: The entries found along with their scores.
+        """
+        if self._result_cache is None:
+            return await self._query_scored(
+                query_vectors, collection_name, limit=limit, projection=projection, query_filter=query_filter
+            )
+        key = (
+            "search",
+            query_vectors.query,
+            limit,
+            projection.model_dump_json(),
+            query_filter.model_dump_json() if query_filter is not None else None,
         )
+        scored_results = await self._result_cache.get_or_compute(
+            collection_name,
+            key,
+            lambda: self._query_scored(
+                query_vectors, collection_name, limit=limit, projection=projection, query_filter=query_filter
+            ),
+        )
+        # The cached results are shared, so every caller gets its own copies
+        return [(score, dict(result)) for score, result in scored_results]
+
+    async def _query_scored(
+        self,
+        query_vectors: "QueryVectors",
+        collection_name: str,
+        *,
+        limit: int,
+        projection: PayloadProjection,
+        query_filter: Optional[models.Filter],
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Query the points of a single collection in Qdrant.
+        """
+        collection_info = await self.get_collection_info(collection_name)
+        if not collection_info.exists:
+            logger.debug("search: Collection not found: %s", collection_name)
+            return []
+
+        vector_name = self._resolve_vector_name(collection_name, collection_info)
+        sparse_vector_name = self._resolve_sparse_vector_name(collection_name, collection_info)
+        if query_filter is not None:
+            self._check_filter_indexed(collection_name, collection_info, filter_keys(query_filter))
+
+        async def query_points():
+            # Embed the query, unless Qdrant does it
+            query_vector = await query_vectors.dense()
+            logger.debug("query_vector type: %s", type(query_vector))
+            if sparse_vector_name is not None:
+                return await self._hybrid_query_points(
+                    collection_name,
+                    query_vector,
+                    await query_vectors.sparse(),
+                    vector_name,
+                    sparse_vector_name,
+                    limit=limit,
+                    query_filter=query_filter,
+                    projection=projection,
+                )
+            return await self._call_qdrant(
+                "query_points",
+                collection_name,
+                lambda: self._client.query_points(
+                    collection_name=collection_name,
+                    query=query_vector,
+                    using=vector_name,
+                    limit=limit,
+                    search_params=self._search_params,
+                    query_filter=query_filter,
+                    with_payload=projection.with_payload(),
+                    timeout=self._search_timeout,
+                ),
+                hedge=True,
+                attributes={"qdrant.limit": limit},
+            )
 
-        logger.debug(f"search results: {len(search_results.points)} found.")
+        # Search in Qdrant
+        try:
+            search_results = await self._with_inference_fallback(query_points)
+        except Exception as e:
+            if not is_not_found_error(e):
+                raise
+            # The collection was removed after it got cached
+            logger.debug("search: Collection not found: %s", collection_name)
+            self.invalidate_collection_info(collection_name)
+            return []
+
+        logger.debug("search results: %s found.", len(search_results.points))
         return [
-            {
-                "id": result.payload.get("id"),
-                "karar_no": result.payload.get("karar_no"),
-                "karar_tarihi": result.payload.get("karar_tarihi"),
-                "mahkeme": result.payload.get("daire"),
-                "esas_no": result.payload.get("esas_no"),
-                "durum": result.payload.get("durum"),
-                "imported_at": result.payload.get("imported_at"),
-                "text": result.payload.get("text")
-            }
+            (result.score, self._search_result(result.payload or {}, projection, query_vectors.query))
             for result in search_results.points
         ]
 
     async def search_by_metadata(
-        self, metadata_key: str, metadata_value: str, *, collection_name: Optional[str] = None, limit: int = 10
+        self,
+        metadata_key: Optional[str],
+        metadata_value: Optional[str],
+        *,
+        collection_name: Optional[str] = None,
+        limit: int = 10,
+        projection: Optional[PayloadProjection] = None,
+        query_filter: Optional[models.Filter] = None,
     ) -> list[Dict[str, Any]]:
         """
         Find points in the Qdrant collection by metadata key-value pair. If there are no entries found, an empty list is returned.
@@ -163,64 +1095,498 @@ class QdrantConnector:
         :param collection_name: The name of the collection to search in, optional. If not provided,
                                the default collection is used.
         :param limit: The maximum number of entries to return.
+        :param projection: The payload fields to return, optional. If not provided, the projection of the
+                           connector is used.
+        :param query_filter: The filter the entries have to match in addition, optional.
         :return: A list of entries found.
         """
-        logger.debug(f"search_by_metadata called. Key: {metadata_key}, Value: {metadata_value}, Collection: {collection_name}, Limit: {limit}")
+        results, _ = await self.search_by_metadata_page(
+            metadata_key,
+            metadata_value,
+            collection_name=collection_name,
+            limit=limit,
+            projection=projection,
+            query_filter=query_filter,
+        )
+        return results
+
+    async def search_by_metadata_page(
+        self,
+        metadata_key: Optional[str],
+        metadata_value: Optional[str],
+        *,
+        collection_name: Optional[str] = None,
+        limit: int = 10,
+        offset: Optional[models.ExtendedPointId] = None,
+        projection: Optional[PayloadProjection] = None,
+        query_filter: Optional[models.Filter] = None,
+    ) -> Tuple[list[Dict[str, Any]], Optional[models.ExtendedPointId]]:
+        """
+        Find a page of the points in the Qdrant collection matching a metadata key-value pair and a filter.
+        :param metadata_key: The metadata key to search for, optional if a filter is given.
+        :param metadata_value: The metadata value to match.
+        :param collection_name: The name of the collection to search in, optional. If not provided,
+                               the default collection is used.
+        :param limit: The maximum number of entries in the page.
+        :param offset: The offset of the page returned along with the previous page, optional. If not provided,
+                       the first page is returned.
+        :param projection: The payload fields to return, optional. If not provided, the projection of the
+                           connector is used.
+        :param query_filter: The filter the entries have to match in addition, optional.
+        :return: The entries of the page and the offset of the next page, None if it is the last page.
+        """
+        logger.debug("search_by_metadata called. Key: %s, Value: %s, Collection: %s, Limit: %s, Offset: %s", metadata_key, metadata_value, collection_name, limit, offset)
         collection_name = collection_name or self._default_collection_name
-        collection_exists = await self._client.collection_exists(collection_name)
-        if not collection_exists:
-            logger.debug(f"search_by_metadata: Collection not found: {collection_name}")
-            return []
+        assert collection_name is not None
+        projection = projection or self._payload_projection
+        if self._result_cache is None:
+            return await self._scroll_by_metadata(
+                metadata_key, metadata_value, collection_name, limit, offset, projection, query_filter
+            )
+        key = (
+            "search_by_metadata",
+            metadata_key,
+            metadata_value,
+            limit,
+            json.dumps(offset),
+            projection.model_dump_json(),
+            query_filter.model_dump_json() if query_filter is not None else None,
+        )
+        results, next_offset = await self._result_cache.get_or_compute(
+            collection_name,
+            key,
+            lambda: self._scroll_by_metadata(
+                metadata_key, metadata_value, collection_name, limit, offset, projection, query_filter
+            ),
+        )
+        # The cached results are shared, so every caller gets its own copies
+        return [dict(result) for result in results], next_offset
+
+    async def _scroll_by_metadata(
+        self,
+        metadata_key: Optional[str],
+        metadata_value: Optional[str],
+        collection_name: str,
+        limit: int,
+        offset: Optional[models.ExtendedPointId],
+        projection: PayloadProjection,
+        query_filter: Optional[models.Filter],
+    ) -> Tuple[list[Dict[str, Any]], Optional[models.ExtendedPointId]]:
+        """
+        Scroll a page of the points in the Qdrant collection matching a metadata key-value pair and a filter.
+        """
+        collection_info = await self.get_collection_info(collection_name)
+        if not collection_info.exists:
+            logger.debug("search_by_metadata: Collection not found: %s", collection_name)
+            return [], None
+
 
         # Create filter condition for metadata search
-        filter_condition = models.Filter(
-            must=[
+        conditions: List[models.Condition] = []
+        if metadata_key:
+            if metadata_value is None:
+                raise ValueError("A metadata value is required along with the metadata key")
+            conditions.append(
                 models.FieldCondition(
                     key=metadata_key,
                     match=models.MatchValue(value=metadata_value)
                 )
-            ]
-        )
+            )
+        if query_filter is not None:
+            conditions.append(query_filter)
+        if not conditions:
+            raise ValueError("Either a metadata key or a filter is required")
+        filter_condition = models.Filter(must=conditions)
+        self._check_filter_indexed(collection_name, collection_info, filter_keys(filter_condition))
 
         # Search in Qdrant with filter
-        search_results = await self._client.scroll(
-            collection_name=collection_name,
-            scroll_filter=filter_condition,
-            limit=limit,
-            with_payload=True,
-            with_vectors=False,
+        try:
+            points, next_offset = await self._call_qdrant(
+                "scroll",
+                collection_name,
+                lambda: self._client.scroll(
+                    collection_name=collection_name,
+                    scroll_filter=filter_condition,
+                    limit=limit,
+                    offset=offset,
+                    with_payload=projection.with_payload(),
+                    with_vectors=False,
+                    timeout=self._search_timeout,
+                ),
+                hedge=True,
+                attributes={"qdrant.limit": limit},
+            )
+        except Exception as e:
+            if not is_not_found_error(e):
+                raise
+            logger.debug("search_by_metadata: Collection not found: %s", collection_name)
+            self.invalidate_collection_info(collection_name)
+            return [], None
+
+        logger.debug("search_by_metadata results: %s found.", len(points))
+        results = [self._search_result(point.payload or {}, projection) for point in points]
+        return results, next_offset
+
+    async def iter_by_metadata(
+        self,
+        metadata_key: Optional[str],
+        metadata_value: Optional[str],
+        *,
+        collection_name: Optional[str] = None,
+        page_size: int = 256,
+        projection: Optional[PayloadProjection] = None,
+        query_filter: Optional[models.Filter] = None,
+    ) -> AsyncIterator[list[Dict[str, Any]]]:
+        """
+        Stream all the points in the Qdrant collection matching a metadata key-value pair, page by page.
+        The next page is requested only once the previous one is consumed, so large exports are not
+        buffered in memory.
+        :param metadata_key: The metadata key to search for, optional if a filter is given.
+        :param metadata_value: The metadata value to match.
+        :param collection_name: The name of the collection to search in, optional. If not provided,
+                               the default collection is used.
+        :param page_size: The number of entries requested at once.
+        :param projection: The payload fields to return, optional. If not provided, the projection of the
+                           connector is used.
+        :param query_filter: The filter the entries have to match in addition, optional.
+        :return: An async iterator over the non-empty pages of entries.
+        """
+        collection_name = collection_name or self._default_collection_name
+        assert collection_name is not None
+        projection = projection or self._payload_projection
+        offset = None
+        while True:
+            # Exports bypass the result cache, so they do not evict the results of the interactive searches
+            results, offset = await self._scroll_by_metadata(
+                metadata_key, metadata_value, collection_name, page_size, offset, projection, query_filter
+            )
+            if results:
+                yield results
+            if offset is None:
+                return
+
+    async def _hybrid_query_points(
+        self,
+        collection_name: str,
+        query_vector: Any,
+        sparse_query_vector: models.SparseVector,
+        vector_name: Optional[str],
+        sparse_vector_name: str,
+        *,
+        limit: int,
+        query_filter: Optional[models.Filter],
+        projection: PayloadProjection,
+    ) -> models.QueryResponse:
+        """
+        Search with both the dense and the sparse vector and fuse the results, in a single request.
+        """
+        prefetch = self._hybrid_prefetch(
+            query_vector, sparse_query_vector, vector_name, sparse_vector_name, limit, query_filter
+        )
+        return await self._call_qdrant(
+            "query_points",
+            collection_name,
+            lambda: self._client.query_points(
+                collection_name=collection_name,
+                prefetch=prefetch,
+                query=models.FusionQuery(fusion=self._hybrid_fusion),
+                limit=limit,
+                with_payload=projection.with_payload(),
+                timeout=self._search_timeout,
+            ),
+            hedge=True,
+            attributes={"qdrant.limit": limit, "qdrant.fusion": self._hybrid_fusion},
         )
 
-        logger.debug(f"search_by_metadata results: {len(search_results[0])} found.")
+    def _hybrid_prefetch(
+        self,
+        query_vector: Any,
+        sparse_query_vector: models.SparseVector,
+        vector_name: Optional[str],
+        sparse_vector_name: str,
+        limit: int,
+        query_filter: Optional[models.Filter],
+    ) -> List[models.Prefetch]:
+        """
+        Build the dense and the sparse searches of a hybrid query, whose results are fused.
+        """
+        prefetch_limit = self._hybrid_prefetch_limit or limit * 4
         return [
-            {
-                "id": result.payload.get("id"),
-                "karar_no": result.payload.get("karar_no"),
-                "karar_tarihi": result.payload.get("karar_tarihi"),
-                "mahkeme": result.payload.get("daire"),
-                "esas_no": result.payload.get("esas_no"),
-                "durum": result.payload.get("durum"),
-                "imported_at": result.payload.get("imported_at"),
-                "text": result.payload.get("text")
-            }
-            for result in search_results[0]
+            models.Prefetch(
+                query=query_vector,
+                using=vector_name,
+                limit=prefetch_limit,
+                filter=query_filter,
+                params=self._search_params,
+            ),
+            models.Prefetch(
+                query=sparse_query_vector,
+                using=sparse_vector_name,
+                limit=prefetch_limit,
+                filter=query_filter,
+            ),
         ]
 
-    async def _ensure_collection_exists(self, collection_name: str):
+    @staticmethod
+    def _search_result(
+        payload: Dict[str, Any], projection: PayloadProjection, query: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a search result from the payload of a point. The fields of the projection, which are not
+        a part of the usual results, are returned as they are.
+        """
+        result = {
+            "id": payload.get("id"),
+            "karar_no": payload.get("karar_no"),
+            "karar_tarihi": payload.get("karar_tarihi"),
+            "mahkeme": payload.get("daire"),
+            "esas_no": payload.get("esas_no"),
+            "durum": payload.get("durum"),
+            "imported_at": payload.get("imported_at"),
+            "text": payload.get("text"),
+        }
+        for key, value in payload.items():
+            if key not in RESULT_PAYLOAD_FIELDS:
+                result[key] = value
+        if projection.max_text_length is not None and isinstance(result["text"], str):
+            result["text"] = make_snippet(result["text"], projection.max_text_length, query)
+        return result
+
+    async def _ensure_collection_exists(self, collection_name: str) -> CollectionInfo:
         """
         Ensure that the collection exists, creating it if necessary.
         :param collection_name: The name of the collection to ensure exists.
+        :return: The metadata of the collection.
         """
-        collection_exists = await self._client.collection_exists(collection_name)
-        if not collection_exists:
+        collection_info = await self.get_collection_info(collection_name)
+        if not collection_info.exists:
             # Create the collection with the appropriate vector size
-            vector_size = self._embedding_provider.get_vector_size()
+            vector_size = await self._embedding_provider.resolve_vector_size()
 
             # Use the vector name as defined in the embedding provider
-            await self._client.create_collection(
-                collection_name=collection_name,
-                vectors_config=models.VectorParams(
-                        size=vector_size,
-                        distance=models.Distance.COSINE,
+            vector_name = self._get_vector_name()
+            profile = self._collection_profile
+            sparse_vectors_config = None
+            if self._sparse_embedding_provider is not None:
+                sparse_vectors_config = {
+                    self._sparse_embedding_provider.get_vector_name(): models.SparseVectorParams(
+                        modifier=models.Modifier.IDF if self._sparse_embedding_provider.requires_idf() else None
                     )
+                }
+            # A repeated creation would fail if the first one got through, so it is not retried
+            await self._call_qdrant(
+                "create_collection",
+                collection_name,
+                lambda: self._client.create_collection(
+                    collection_name=collection_name,
+                    vectors_config={vector_name: profile.vector_params(vector_size)},
+                    sparse_vectors_config=sparse_vectors_config,
+                    hnsw_config=profile.hnsw_config(),
+                    optimizers_config=profile.optimizers_config(),
+                    quantization_config=profile.quantization_config(),
+                ),
+                idempotent=False,
+            )
+            self.invalidate_collection_info(collection_name)
+            self.invalidate_results(collection_name)
+            if self._payload_indexes:
+                await self.ensure_payload_indexes(collection_name)
+            collection_info = await self.get_collection_info(collection_name)
+        return collection_info
+
+    async def get_collection_info(self, collection_name: str, *, refresh: bool = False) -> CollectionInfo:
+        """
+        Get the metadata of a collection. The metadata is cached for `collection_cache_ttl` seconds, so the
+        search path does not need an additional request to check whether the collection exists.
+        :param collection_name: The name of the collection.
+        :param refresh: Whether to skip the cache and fetch the metadata from Qdrant.
+        :return: The metadata of the collection.
+        """
+        cached = self._collection_cache.get(collection_name)
+        if cached is not None and not refresh:
+            expires_at, collection_info = cached
+            if time.monotonic() < expires_at:
+                return collection_info
+
+        collection_info = await self._fetch_collection_info(collection_name)
+        self._collection_cache[collection_name] = (
+            time.monotonic() + self._collection_cache_ttl,
+            collection_info,
+        )
+        return collection_info
+
+    def invalidate_collection_info(self, collection_name: str):
+        """
+        Drop the cached metadata of a collection, so it is fetched again on the next access.
+        :param collection_name: The name of the collection.
+        """
+        self._collection_cache.pop(collection_name, None)
+
+    def invalidate_results(self, collection_name: str):
+        """
+        Drop the cached search results of a collection, e.g. after it was written to.
+        :param collection_name: The name of the collection.
+        """
+        if self._result_cache is not None:
+            self._result_cache.invalidate(collection_name)
+
+    def result_cache_stats(self) -> Optional[Dict[str, float]]:
+        """
+        Get the statistics of the result cache.
+        :return: The statistics, None if the results are not cached.
+        """
+        return self._result_cache.stats() if self._result_cache is not None else None
+
+    async def _fetch_collection_info(self, collection_name: str) -> CollectionInfo:
+        """
+        Fetch the existence and the vectors configuration of a collection from Qdrant.
+        """
+        if not await self._call_qdrant(
+            "collection_exists", collection_name, lambda: self._client.collection_exists(collection_name)
+        ):
+            return CollectionInfo(exists=False)
+        try:
+            response = await self._call_qdrant(
+                "get_collection", collection_name, lambda: self._client.get_collection(collection_name)
+            )
+        except Exception as e:
+            if not is_not_found_error(e):
+                raise
+            return CollectionInfo(exists=False)
+
+        indexed_fields = {
+            field: str(getattr(schema.data_type, "value", schema.data_type))
+            for field, schema in (response.payload_schema or {}).items()
+        }
+        sparse_vector_names = list((response.config.params.sparse_vectors or {}).keys())
+        vectors = response.config.params.vectors
+        if isinstance(vectors, models.VectorParams):
+            return CollectionInfo(
+                exists=True,
+                vector_size=vectors.size,
+                distance=vectors.distance,
+                indexed_fields=indexed_fields,
+                sparse_vector_names=sparse_vector_names,
+            )
+        vectors = vectors or {}
+        first = next(iter(vectors.values()), None)
+        return CollectionInfo(
+            exists=True,
+            vector_size=first.size if first else None,
+            distance=first.distance if first else None,
+            vector_names=list(vectors.keys()),
+            vector_sizes={name: params.size for name, params in vectors.items()},
+            indexed_fields=indexed_fields,
+            sparse_vector_names=sparse_vector_names,
+        )
+
+    async def ensure_payload_indexes(
+        self,
+        collection_name: Optional[str] = None,
+        fields: Optional[Dict[str, models.PayloadSchemaType]] = None,
+    ) -> List[str]:
+        """
+        Create the payload indexes missing in a collection.
+        :param collection_name: The name of the collection, optional. If not provided, the default collection
+                                is used.
+        :param fields: The fields to index mapped to their schema type, optional. If not provided, the
+                       configured payload indexes are created.
+        :return: The names of the fields indexed by this call.
+        """
+        collection_name = collection_name or self._default_collection_name
+        assert collection_name is not None
+        fields = self._payload_indexes if fields is None else fields
+        collection_info = await self.get_collection_info(collection_name, refresh=True)
+        if not collection_info.exists:
+            raise ValueError(f"Collection {collection_name} does not exist")
+
+        created = []
+        for field, schema in fields.items():
+            if field in collection_info.indexed_fields:
+                continue
+            logger.info(f"Creating {schema} payload index on {field} in collection {collection_name}")
+            await self._call_qdrant(
+                "create_payload_index",
+                collection_name,
+                lambda: self._client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field,
+                    field_schema=schema,
+                ),
             )
+            created.append(field)
+        if created:
+            self.invalidate_collection_info(collection_name)
+        return created
+
+    def _check_filter_indexed(self, collection_name: str, collection_info: CollectionInfo, keys: List[str]):
+        """
+        Record the filtered queries on fields without a payload index, which scan the whole collection.
+        """
+        for key in keys:
+            if key in collection_info.indexed_fields:
+                continue
+            count = self._unindexed_filters.get((collection_name, key), 0)
+            if count == 0:
+                logger.warning(
+                    f"Filtering collection {collection_name} on {key}, which has no payload index. "
+                    f"Configure QDRANT_PAYLOAD_INDEXES to index it"
+                )
+            self._unindexed_filters[(collection_name, key)] = count + 1
+
+    def unindexed_filters(self) -> List[Dict[str, Any]]:
+        """
+        Get the report of the filtered queries run on fields without a payload index.
+        :return: The collection, the field and the number of such queries, the most frequent first.
+        """
+        report = [
+            {"collection_name": collection_name, "field": field, "count": count}
+            for (collection_name, field), count in self._unindexed_filters.items()
+        ]
+        return sorted(report, key=lambda item: item["count"], reverse=True)
+
+    def _get_vector_name(self) -> str:
+        """
+        Get the name of the vector new collections are created with, unless configured, the one suggested
+        by the embedding provider.
+        """
+        if self._vector_name is not None:
+            return self._vector_name
+        return self._embedding_provider.get_vector_name()
+
+    def _resolve_sparse_vector_name(self, collection_name: str, collection_info: CollectionInfo) -> Optional[str]:
+        """
+        Find the sparse vector of the collection holding the embeddings of the sparse embedding provider.
+        :return: The name of the sparse vector, or None if the collection is not searched with sparse vectors.
+        """
+        if self._sparse_embedding_provider is None:
+            return None
+        sparse_vector_name = self._sparse_embedding_provider.get_vector_name()
+        if sparse_vector_name in collection_info.sparse_vector_names:
+            return sparse_vector_name
+        logger.debug("Collection %s has no sparse vector named %s, using dense only", collection_name, sparse_vector_name)
+        return None
+
+    def _resolve_vector_name(self, collection_name: str, collection_info: CollectionInfo) -> Optional[str]:
+        """
+        Find the vector of the collection holding the embeddings of the embedding provider. A collection may
+        hold several named vectors, e.g. one per embedding model.
+        :return: The name of the vector, or None if the collection has a single unnamed vector.
+        """
+        if not collection_info.vector_names:
+            return None
+        vector_name = self._get_vector_name()
+        if vector_name in collection_info.vector_names:
+            return vector_name
+        if len(collection_info.vector_names) == 1:
+            logger.debug(
+                "Collection %s has no vector named %s, using %s",
+                collection_name,
+                vector_name,
+                collection_info.vector_names[0],
+            )
+            return collection_info.vector_names[0]
+        raise ValueError(
+            f"Collection {collection_name} has no vector named {vector_name}. "
+            f"Available vectors: {', '.join(collection_info.vector_names)}"
+        )
@@ -0,0 +1,247 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+import grpc
+import httpx
+from pydantic import BaseModel
+from qdrant_client.http.exceptions import ResponseHandlingException
+
+from mcp_server_qdrant.logger import get_logger
+from mcp_server_qdrant.metrics import RESILIENCE_EVENTS
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+TRANSIENT_GRPC_CODES = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend, which failed repeatedly and is given time to recover."""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether an error is likely to go away when the call is repeated, like timeouts, dropped
+    connections, rate limiting and unavailable servers.
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError, ResponseHandlingException)):
+        return True
+    if isinstance(error, grpc.RpcError) and callable(getattr(error, "code", None)):
+        return error.code() in TRANSIENT_GRPC_CODES
+    # Qdrant responses carry a status_code, Gemini errors a code
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    return isinstance(status, int) and status in TRANSIENT_STATUS_CODES
+
+
+class ResiliencePolicy(BaseModel):
+    """
+    Retry, hedging and circuit breaker settings of the calls to a backend.
+    :param retry_attempts: The number of attempts of the idempotent calls failing with transient errors.
+    :param retry_base_delay: The delay before the first retry in seconds, doubled for every further retry.
+    :param retry_max_delay: The maximum delay between the retries in seconds.
+    :param hedge: Whether the reads are sent again, if the first request did not answer in time.
+    :param hedge_delay: The number of seconds to wait before hedging. If not provided, the 95th percentile
+                        latency of the operation is used, once it is known.
+    :param failure_threshold: The number of consecutive transient failures opening the circuit.
+    :param reset_timeout: The number of seconds the circuit stays open before a trial call is let through.
+    """
+
+    retry_attempts: int = 3
+    retry_base_delay: float = 0.1
+    retry_max_delay: float = 2.0
+    hedge: bool = False
+    hedge_delay: Optional[float] = None
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker failing fast once a backend failed `failure_threshold` times in a row. After
+    `reset_timeout` seconds a single trial call is let through, which closes the circuit if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may be made now. In the half-open state only the trial call is allowed."""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self):
+        """Let another trial call through, as the current one was abandoned without an outcome."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = "closed"
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """
+        Record a transient failure.
+        :return: Whether the failure opened the circuit.
+        """
+        self._failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+            return True
+        return False
+
+
+class Resilience:
+    """
+    Resilience layer of the calls to a backend: jittered exponential retries of the idempotent calls,
+    hedged reads and a circuit breaker. Every decision is counted per operation.
+    :param name: The name of the backend, used in the logs and the errors.
+    :param policy: The retry, hedging and circuit breaker settings.
+    """
+
+    def __init__(self, name: str, policy: Optional[ResiliencePolicy] = None):
+        self.name = name
+        self.policy = policy or ResiliencePolicy()
+        self.breaker = CircuitBreaker(self.policy.failure_threshold, self.policy.reset_timeout)
+        self.counters: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=256))
+
+    async def call(
+        self,
+        operation: str,
+        request: Callable[[], Awaitable[T]],
+        *,
+        idempotent: bool = True,
+        hedge: bool = False,
+    ) -> T:
+        """
+        Call the backend.
+        :param operation: The name of the operation, e.g. "query_points".
+        :param request: The coroutine function making the request. It is called once per attempt.
+        :param idempotent: Whether the request may be repeated after a transient failure.
+        :param hedge: Whether the request is a read, which may be sent again if it does not answer in time.
+        :return: The result of the request.
+        :raises CircuitOpenError: If the backend failed repeatedly and is not called.
+        """
+        attempts = max(1, self.policy.retry_attempts) if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            if not self.breaker.allow():
+                self._count(operation, "rejected")
+                raise CircuitOpenError(f"{self.name} is unavailable, the circuit is open")
+            self._count(operation, "calls")
+            started = time.monotonic()
+            try:
+                if hedge and self.policy.hedge:
+                    result = await self._hedged(operation, request)
+                else:
+                    result = await request()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_transient_error(e):
+                    # The backend answered, e.g. with a not found error
+                    self.breaker.record_success()
+                    raise
+                self._count(operation, "failures")
+                if self.breaker.record_failure():
+                    self._count(operation, "circuit_opened")
+                    logger.warning(f"{self.name} circuit opened after {operation} failed: {e!r}")
+                if attempt == attempts or self.breaker.state != "closed":
+                    raise
+                delay = self._backoff(attempt)
+                logger.info(f"{self.name} {operation} failed: {e!r}, retrying in {delay:.2f}s")
+                self._count(operation, "retries")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            self._latencies[operation].append(time.monotonic() - started)
+            return result
+        raise AssertionError("unreachable")
+
+    async def _hedged(self, operation: str, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Send the request, and send it again if the first one does not answer within the hedge delay.
+        The first successful answer wins and the other request is cancelled.
+        """
+        delay = self.hedge_delay(operation)
+        if delay is None:
+            return await request()
+        tasks = {asyncio.ensure_future(request())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return done.pop().result()
+            self._count(operation, "hedges")
+            hedge_task = asyncio.ensure_future(request())
+            tasks.add(hedge_task)
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            self._count(operation, "hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _count(self, operation: str, event: str):
+        self.counters[(operation, event)] += 1
+        RESILIENCE_EVENTS.labels(self.name, operation, event).inc()
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        """
+        Get the number of seconds to wait before hedging an operation, None until enough of its latencies
+        are known.
+        """
+        if self.policy.hedge_delay is not None:
+            return self.policy.hedge_delay
+        latencies = self._latencies[operation]
+        if len(latencies) < 20:
+            return None
+        return sorted(latencies)[int(len(latencies) * 0.95) - 1]
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter, so the clients of a recovering backend do not retry in lockstep
+        delay = min(self.policy.retry_max_delay, self.policy.retry_base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, delay)
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Get the state of the circuit and the number of calls, failures, retries, hedges, hedges which
+        answered first, circuit openings and rejected calls of every operation.
+        """
+        operations: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for (operation, event), count in self.counters.items():
+            operations[operation][event] = count
+        return {"circuit": self.breaker.state, "operations": dict(operations)}
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from mcp_server_qdrant.logger import get_logger
+from mcp_server_qdrant.metrics import record_cache
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+CacheKey = Tuple[str, Hashable]
+
+
+class ResultCache:
+    """
+    Cache of the search results of the collections. The cache is a bounded LRU, whose entries expire after
+    `ttl` seconds, and the entries of a collection are dropped whenever the collection is written to.
+    Concurrent misses for the same key share a single call to Qdrant.
+    :param max_entries: The maximum number of cached results.
+    :param ttl: The number of seconds a cached result is valid for.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._cache: OrderedDict[CacheKey, Tuple[float, Any]] = OrderedDict()
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        # Bumped on every write, so results computed before a write are not cached after it
+        self._generations: Dict[str, int] = {}
+
+    async def get_or_compute(
+        self, collection_name: str, key: Hashable, compute: Callable[[], Awaitable[T]]
+    ) -> T:
+        """
+        Get the cached result for a key, computing it on a miss.
+        :param collection_name: The name of the collection the result comes from.
+        :param key: The key of the result within the collection, e.g. the query and its parameters.
+        :param compute: The coroutine function computing the result.
+        :return: The result, shared with the other callers. It must not be modified.
+        """
+        cache_key = (collection_name, key)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            expires_at, result = cached
+            if time.monotonic() < expires_at:
+                self._cache.move_to_end(cache_key)
+                self.hits += 1
+                record_cache("result", hit=True)
+                return result
+            del self._cache[cache_key]
+
+        # Concurrent misses for the same key share a single call
+        task = self._in_flight.get(cache_key)
+        if task is not None:
+            self.hits += 1
+            record_cache("result", hit=True)
+        else:
+            self.misses += 1
+            record_cache("result", hit=False)
+            generation = self._generations.get(collection_name, 0)
+            # The call runs in its own task, so cancelling the caller which started it, e.g. on a timeout,
+            # does not cancel it for the other callers
+            task = asyncio.ensure_future(self._compute_and_cache(cache_key, generation, compute))
+            self._in_flight[cache_key] = task
+            task.add_done_callback(lambda done: self._finish_in_flight(cache_key, done))
+        return await self._wait(task)
+
+    async def _compute_and_cache(self, cache_key: CacheKey, generation: int, compute: Callable[[], Awaitable[T]]) -> T:
+        result = await compute()
+        collection_name = cache_key[0]
+        if self.max_entries > 0 and generation == self._generations.get(collection_name, 0):
+            self._cache[cache_key] = (time.monotonic() + self.ttl, result)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    async def _wait(self, task: asyncio.Future) -> Any:
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if not task.done():
+                self._waiters[task] -= 1
+                # Nobody waits for the result anymore
+                if self._waiters[task] == 0:
+                    task.cancel()
+
+    def _finish_in_flight(self, cache_key: CacheKey, task: asyncio.Future):
+        if self._in_flight.get(cache_key) is task:
+            del self._in_flight[cache_key]
+        self._waiters.pop(task, None)
+        # Mark the exception as retrieved, in case all the callers got cancelled meanwhile
+        if not task.cancelled():
+            task.exception()
+
+    def invalidate(self, collection_name: str):
+        """
+        Drop the cached results of a collection, e.g. after it was written to.
+        :param collection_name: The name of the collection.
+        """
+        self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+        stale_keys = [key for key in self._cache if key[0] == collection_name]
+        for key in stale_keys:
+            del self._cache[key]
+        if stale_keys:
+            self.invalidations += 1
+            logger.debug("Dropped %s cached results of collection %s", len(stale_keys), collection_name)
+
+    def clear(self):
+        """Remove all the cached results."""
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the statistics of the cache.
+        :return: The number of hits, misses, cached entries, invalidations and the hit rate.
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._cache),
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
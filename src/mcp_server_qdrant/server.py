@@ -3,10 +3,24 @@ from mcp_server_qdrant.settings import (
     EmbeddingProviderSettings,
     QdrantSettings,
     ToolSettings,
+    TracingSettings,
 )
+from mcp_server_qdrant.tracing import setup_tracing
+
+setup_tracing(TracingSettings())
 
 mcp = QdrantMCPServer(
     tool_settings=ToolSettings(),
     qdrant_settings=QdrantSettings(),
     embedding_provider_settings=EmbeddingProviderSettings(),
 )
+
+
+def sse_app():
+    """Build the ASGI app of the SSE transport, used by the ASGI server of `main`."""
+    return mcp.http_app("sse")
+
+
+def streamable_http_app():
+    """Build the ASGI app of the streamable HTTP transport, used by the ASGI server of `main`."""
+    return mcp.http_app("streamable-http")
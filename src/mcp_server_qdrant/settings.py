@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -8,17 +8,29 @@ from mcp_server_qdrant.embeddings.types import EmbeddingProviderType
 DEFAULT_TOOL_STORE_DESCRIPTION = (
     "Keep the memory for later use, when you are asked to remember something."
 )
+DEFAULT_TOOL_STORE_BATCH_DESCRIPTION = (
+    "Keep many memories for later use at once. Each entry has an 'information' field and an optional "
+    "'metadata' object. Reports for every entry whether it was stored."
+)
 DEFAULT_TOOL_FIND_DESCRIPTION = (
     "Look up memories in Qdrant. Use this tool when you need to: \n"
     " - Find memories by their content \n"
     " - Access memories for further analysis \n"
-    " - Get some personal information about the user"
+    " - Get some personal information about the user \n"
+    "Pass 'query_filter' to restrict the results by their fields, e.g. a date range on 'karar_tarihi', "
+    "instead of filtering the results yourself."
+)
+DEFAULT_TOOL_FIND_BATCH_DESCRIPTION = (
+    "Look up memories in Qdrant for several queries at once. Use this tool instead of calling the find "
+    "tool several times in a row. Returns one message with the results of every query."
 )
 DEFAULT_TOOL_FIND_BY_METADATA_DESCRIPTION = (
     "Find specific vectors in Qdrant by metadata key-value pairs. Use this tool when you need to: \n"
     " - Filter results by specific metadata fields like 'mahkeme', 'durum', 'karar_no', etc. \n"
     " - Find all documents that have a specific metadata value \n"
-    " - Search for documents by their properties rather than content"
+    " - Search for documents by their properties rather than content \n"
+    "Pass 'query_filter' for ranges, several accepted values or combined must/should/must_not conditions. \n"
+    "If there are more results, the last line holds a cursor. Pass it back to get the next page."
 )
 
 
@@ -31,10 +43,18 @@ class ToolSettings(BaseSettings):
         default=DEFAULT_TOOL_STORE_DESCRIPTION,
         validation_alias="TOOL_STORE_DESCRIPTION",
     )
+    tool_store_batch_description: str = Field(
+        default=DEFAULT_TOOL_STORE_BATCH_DESCRIPTION,
+        validation_alias="TOOL_STORE_BATCH_DESCRIPTION",
+    )
     tool_find_description: str = Field(
         default=DEFAULT_TOOL_FIND_DESCRIPTION,
         validation_alias="TOOL_FIND_DESCRIPTION",
     )
+    tool_find_batch_description: str = Field(
+        default=DEFAULT_TOOL_FIND_BATCH_DESCRIPTION,
+        validation_alias="TOOL_FIND_BATCH_DESCRIPTION",
+    )
     tool_find_by_metadata_description: str = Field(
         default=DEFAULT_TOOL_FIND_BY_METADATA_DESCRIPTION,
         validation_alias="TOOL_FIND_BY_METADATA_DESCRIPTION",
@@ -54,6 +74,74 @@ class EmbeddingProviderSettings(BaseSettings):
         default="sentence-transformers/all-MiniLM-L6-v2",
         validation_alias="EMBEDDING_MODEL",
     )
+    vector_size: Optional[int] = Field(
+        default=None,
+        validation_alias="EMBEDDING_VECTOR_SIZE",
+    )
+    vector_name: Optional[str] = Field(
+        default=None,
+        validation_alias="EMBEDDING_VECTOR_NAME",
+    )
+    sparse_model_name: Optional[str] = Field(
+        default=None,
+        validation_alias="EMBEDDING_SPARSE_MODEL",
+    )
+    background_loading: bool = Field(
+        default=True,
+        validation_alias="EMBEDDING_BACKGROUND_LOADING",
+    )
+    cache_dir: Optional[str] = Field(
+        default=None,
+        validation_alias="EMBEDDING_CACHE_DIR",
+    )
+    shared_weights: bool = Field(
+        default=False,
+        validation_alias="EMBEDDING_SHARED_WEIGHTS",
+    )
+    query_cache_size: int = Field(
+        default=1024,
+        validation_alias="EMBEDDING_QUERY_CACHE_SIZE",
+    )
+    query_cache_ttl: float = Field(
+        default=3600.0,
+        validation_alias="EMBEDDING_QUERY_CACHE_TTL",
+    )
+    query_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        validation_alias="EMBEDDING_QUERY_CACHE_MAX_BYTES",
+    )
+    query_batch_window_ms: float = Field(
+        default=0.0,
+        validation_alias="EMBEDDING_QUERY_BATCH_WINDOW_MS",
+    )
+    query_batch_size: int = Field(
+        default=32,
+        validation_alias="EMBEDDING_QUERY_BATCH_SIZE",
+    )
+    executor_mode: Literal["thread", "process"] = Field(
+        default="thread",
+        validation_alias="EMBEDDING_EXECUTOR",
+    )
+    executor_workers: int = Field(
+        default=0,
+        validation_alias="EMBEDDING_EXECUTOR_WORKERS",
+    )
+    executor_queue_size: Optional[int] = Field(
+        default=None,
+        validation_alias="EMBEDDING_EXECUTOR_QUEUE_SIZE",
+    )
+    retry_attempts: int = Field(
+        default=3,
+        validation_alias="EMBEDDING_RETRY_ATTEMPTS",
+    )
+    circuit_failure_threshold: int = Field(
+        default=5,
+        validation_alias="EMBEDDING_CIRCUIT_FAILURE_THRESHOLD",
+    )
+    circuit_reset_timeout: float = Field(
+        default=30.0,
+        validation_alias="EMBEDDING_CIRCUIT_RESET_TIMEOUT",
+    )
 
 
 class QdrantSettings(BaseSettings):
@@ -70,6 +158,97 @@ class QdrantSettings(BaseSettings):
         default=None, validation_alias="QDRANT_LOCAL_PATH"
     )
     search_limit: int = Field(default=10, validation_alias="QDRANT_SEARCH_LIMIT")
+    store_batch_size: int = Field(default=64, validation_alias="QDRANT_STORE_BATCH_SIZE")
     read_only: bool = Field(default=False, validation_alias="QDRANT_READ_ONLY")
+    admin_write_enabled: bool = Field(default=False, validation_alias="ADMIN_WRITE_ENABLED")
+    admin_write_any_collection: bool = Field(default=False, validation_alias="ADMIN_WRITE_ANY_COLLECTION")
+    server_inference: bool = Field(
+        default=False, validation_alias="QDRANT_SERVER_INFERENCE"
+    )
     timeout: int = Field(default=30, validation_alias="QDRANT_TIMEOUT")
+    prefer_grpc: bool = Field(default=False, validation_alias="QDRANT_PREFER_GRPC")
+    grpc_port: int = Field(default=6334, validation_alias="QDRANT_GRPC_PORT")
+    http2: bool = Field(default=False, validation_alias="QDRANT_HTTP2")
+    pool_size: Optional[int] = Field(default=None, validation_alias="QDRANT_POOL_SIZE")
+    keepalive: Optional[float] = Field(default=None, validation_alias="QDRANT_KEEPALIVE")
+    search_timeout: Optional[int] = Field(default=None, validation_alias="QDRANT_SEARCH_TIMEOUT")
+    write_timeout: Optional[int] = Field(default=None, validation_alias="QDRANT_WRITE_TIMEOUT")
+    retry_attempts: int = Field(default=3, validation_alias="QDRANT_RETRY_ATTEMPTS")
+    retry_base_delay: float = Field(default=0.1, validation_alias="QDRANT_RETRY_BASE_DELAY")
+    retry_max_delay: float = Field(default=2.0, validation_alias="QDRANT_RETRY_MAX_DELAY")
+    hedge: bool = Field(default=False, validation_alias="QDRANT_HEDGE")
+    hedge_delay: Optional[float] = Field(default=None, validation_alias="QDRANT_HEDGE_DELAY")
+    circuit_failure_threshold: int = Field(
+        default=5, validation_alias="QDRANT_CIRCUIT_FAILURE_THRESHOLD"
+    )
+    circuit_reset_timeout: float = Field(
+        default=30.0, validation_alias="QDRANT_CIRCUIT_RESET_TIMEOUT"
+    )
+    quantization: Literal["none", "scalar", "binary", "product"] = Field(
+        default="none", validation_alias="QDRANT_QUANTIZATION"
+    )
+    quantization_always_ram: bool = Field(
+        default=True, validation_alias="QDRANT_QUANTIZATION_ALWAYS_RAM"
+    )
+    product_compression: Literal["x4", "x8", "x16", "x32", "x64"] = Field(
+        default="x16", validation_alias="QDRANT_PRODUCT_COMPRESSION"
+    )
+    on_disk: bool = Field(default=False, validation_alias="QDRANT_VECTORS_ON_DISK")
+    hnsw_m: Optional[int] = Field(default=None, validation_alias="QDRANT_HNSW_M")
+    hnsw_ef_construct: Optional[int] = Field(
+        default=None, validation_alias="QDRANT_HNSW_EF_CONSTRUCT"
+    )
+    hnsw_on_disk: Optional[bool] = Field(default=None, validation_alias="QDRANT_HNSW_ON_DISK")
+    indexing_threshold: Optional[int] = Field(
+        default=None, validation_alias="QDRANT_INDEXING_THRESHOLD"
+    )
+    default_segment_number: Optional[int] = Field(
+        default=None, validation_alias="QDRANT_DEFAULT_SEGMENT_NUMBER"
+    )
+    search_hnsw_ef: Optional[int] = Field(default=None, validation_alias="QDRANT_SEARCH_HNSW_EF")
+    search_exact: bool = Field(default=False, validation_alias="QDRANT_SEARCH_EXACT")
+    search_rescore: Optional[bool] = Field(default=None, validation_alias="QDRANT_SEARCH_RESCORE")
+    search_oversampling: Optional[float] = Field(
+        default=None, validation_alias="QDRANT_SEARCH_OVERSAMPLING"
+    )
+    collection_cache_ttl: float = Field(
+        default=60.0, validation_alias="QDRANT_COLLECTION_CACHE_TTL"
+    )
+    result_cache_size: int = Field(default=0, validation_alias="QDRANT_RESULT_CACHE_SIZE")
+    result_cache_ttl: float = Field(default=30.0, validation_alias="QDRANT_RESULT_CACHE_TTL")
+    payload_include: Optional[List[str]] = Field(
+        default=None, validation_alias="QDRANT_PAYLOAD_INCLUDE"
+    )
+    payload_exclude: List[str] = Field(default=[], validation_alias="QDRANT_PAYLOAD_EXCLUDE")
+    find_payload_include: Optional[List[str]] = Field(
+        default=None, validation_alias="QDRANT_FIND_PAYLOAD_INCLUDE"
+    )
+    find_by_metadata_payload_include: Optional[List[str]] = Field(
+        default=None, validation_alias="QDRANT_FIND_BY_METADATA_PAYLOAD_INCLUDE"
+    )
+    max_text_length: Optional[int] = Field(
+        default=None, validation_alias="QDRANT_MAX_TEXT_LENGTH"
+    )
+    fanout_timeout: Optional[float] = Field(
+        default=10.0, validation_alias="QDRANT_FANOUT_TIMEOUT"
+    )
+    hybrid_fusion: Literal["rrf", "dbsf"] = Field(
+        default="rrf", validation_alias="QDRANT_HYBRID_FUSION"
+    )
+    hybrid_prefetch_limit: Optional[int] = Field(
+        default=None, validation_alias="QDRANT_HYBRID_PREFETCH_LIMIT"
+    )
+    payload_indexes: Dict[
+        str, Literal["keyword", "integer", "float", "bool", "geo", "datetime", "text", "uuid"]
+    ] = Field(default={}, validation_alias="QDRANT_PAYLOAD_INDEXES")
     output_format: str = Field(default="formatted", validation_alias="QDRANT_OUTPUT_FORMAT")
+
+
+class TracingSettings(BaseSettings):
+    """
+    Configuration for the optional OpenTelemetry tracing.
+    """
+
+    exporter: Literal["none", "file", "otlp"] = Field(default="none", validation_alias="TRACING_EXPORTER")
+    file_path: str = Field(default="traces.jsonl", validation_alias="TRACING_FILE")
+    service_name: str = Field(default="mcp-server-qdrant", validation_alias="OTEL_SERVICE_NAME")
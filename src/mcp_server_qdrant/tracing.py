@@ -0,0 +1,110 @@
+import atexit
+import contextlib
+import os
+from typing import Any, Dict, Iterator, Optional
+
+from mcp_server_qdrant.logger import get_logger
+from mcp_server_qdrant.settings import TracingSettings
+
+logger = get_logger(__name__)
+
+# The tracer and the provider of the server, None unless tracing is set up. OpenTelemetry is an optional
+# dependency, so nothing is imported from it until then.
+_tracer: Optional[Any] = None
+_provider: Optional[Any] = None
+
+
+class NoopSpan:
+    """Span returned while tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+def setup_tracing(settings: TracingSettings) -> bool:
+    """
+    Start exporting the spans of the server, if an exporter is configured.
+    :param settings: The tracing settings.
+    :return: Whether tracing got enabled.
+    """
+    global _tracer, _provider
+    if settings.exporter == "none":
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+            SpanExporter,
+        )
+    except ImportError:
+        logger.warning(
+            "Tracing is disabled, the OpenTelemetry SDK is not installed. "
+            "Install it with: pip install 'mcp-server-qdrant[tracing]'"
+        )
+        return False
+
+    exporter: SpanExporter
+    if settings.exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        # The endpoint defaults to OTEL_EXPORTER_OTLP_TRACES_ENDPOINT or OTEL_EXPORTER_OTLP_ENDPOINT
+        exporter = OTLPSpanExporter()
+    else:
+        # One JSON document per line, readable without a collector
+        trace_file = open(settings.file_path, "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(
+            out=trace_file, formatter=lambda span: span.to_json(indent=None) + os.linesep
+        )
+
+    shutdown_tracing()
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.service_name}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    _tracer = _provider.get_tracer("mcp_server_qdrant")
+    atexit.unregister(shutdown_tracing)
+    atexit.register(shutdown_tracing)
+    logger.info("Exporting traces with the %s exporter", settings.exporter)
+    return True
+
+
+def shutdown_tracing():
+    """Export the pending spans and disable tracing."""
+    global _tracer, _provider
+    if _provider is not None:
+        _provider.shutdown()
+    _tracer = None
+    _provider = None
+
+
+@contextlib.contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    Record a span, a child of the current one. The attributes being None are left out.
+    :param name: The name of the span.
+    :param attributes: The attributes of the span.
+    :return: The span, to set further attributes on.
+    """
+    if _tracer is None:
+        yield NOOP_SPAN
+        return
+    attributes = {key: value for key, value in (attributes or {}).items() if value is not None}
+    with _tracer.start_as_current_span(name, attributes=attributes) as current_span:
+        yield current_span
+
+
+def set_attributes(attributes: Dict[str, Any]):
+    """
+    Set attributes on the current span, e.g. the root span of a tool call.
+    """
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    current_span = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            current_span.set_attribute(key, value)
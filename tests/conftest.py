@@ -0,0 +1,75 @@
+import asyncio
+import hashlib
+from typing import List
+
+import pytest
+from qdrant_client import models
+
+from mcp_server_qdrant.embeddings.base import EmbeddingProvider, SparseEmbeddingProvider
+
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic embedding provider for tests, which does not need to download a model.
+    Every word is hashed into one of the dimensions, so texts sharing words are similar.
+    """
+
+    def __init__(self, vector_size: int = 32, delay: float = 0.0):
+        self.model_name = "test-hash-embedding"
+        self.vector_size = vector_size
+        self.delay = delay
+        self.document_calls: List[List[str]] = []
+        self.query_calls: List[str] = []
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.vector_size
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode()).digest()
+            vector[digest[0] % self.vector_size] += 1.0
+        # Avoid zero vectors, which cannot be normalized for cosine distance
+        vector[-1] += 0.01
+        return vector
+
+    async def embed_documents(self, documents: List[str]) -> List[List[float]]:
+        self.document_calls.append(list(documents))
+        await asyncio.sleep(self.delay)
+        return [self._embed(document) for document in documents]
+
+    async def embed_query(self, query: str) -> List[float]:
+        self.query_calls.append(query)
+        await asyncio.sleep(self.delay)
+        return self._embed(query)
+
+    def get_vector_size(self) -> int:
+        return self.vector_size
+
+
+class HashSparseEmbeddingProvider(SparseEmbeddingProvider):
+    """
+    Deterministic sparse embedding provider for tests, counting the hashed words of the texts, like BM25.
+    """
+
+    def _embed(self, text: str) -> models.SparseVector:
+        counts: dict[int, float] = {}
+        for word in text.lower().split():
+            index = int.from_bytes(hashlib.md5(word.encode()).digest()[:4], "little")
+            counts[index] = counts.get(index, 0.0) + 1.0
+        return models.SparseVector(indices=list(counts.keys()), values=list(counts.values()))
+
+    async def embed_documents(self, documents: List[str]) -> List[models.SparseVector]:
+        return [self._embed(document) for document in documents]
+
+    async def embed_query(self, query: str) -> models.SparseVector:
+        return self._embed(query)
+
+    def get_vector_name(self) -> str:
+        return "test-hash-sparse"
+
+    def requires_idf(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def hash_embedding_provider():
+    """Fixture to provide an embedding provider that works offline."""
+    return HashEmbeddingProvider()
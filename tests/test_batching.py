@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from mcp_server_qdrant.embeddings.batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+class TestMicroBatcher:
+    """Tests for the micro-batching scheduler."""
+
+    async def test_concurrent_items_share_batch(self):
+        """Test that items submitted together are processed in one batch, in order."""
+        batches = []
+
+        async def process_batch(items):
+            batches.append(items)
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(process_batch, max_batch_size=32, max_wait=0.01)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(5)])
+
+        assert results == [0, 2, 4, 6, 8]
+        assert batches == [[0, 1, 2, 3, 4]]
+
+    async def test_max_batch_size(self):
+        """Test that a full batch is processed without waiting for the window."""
+        batches = []
+
+        async def process_batch(items):
+            batches.append(items)
+            return items
+
+        batcher = MicroBatcher(process_batch, max_batch_size=2, max_wait=10)
+        results = await asyncio.wait_for(
+            asyncio.gather(*[batcher.submit(i) for i in range(4)]), timeout=1
+        )
+
+        assert results == [0, 1, 2, 3]
+        assert batches == [[0, 1], [2, 3]]
+
+    async def test_errors_are_propagated(self):
+        """Test that every caller of a failing batch gets the exception."""
+
+        async def process_batch(items):
+            raise RuntimeError("model crashed")
+
+        batcher = MicroBatcher(process_batch, max_wait=0.001)
+        results = await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from mcp_server_qdrant.embeddings.cached import CachedEmbeddingProvider
+from tests.conftest import HashEmbeddingProvider
+
+
+@pytest.mark.asyncio
+class TestCachedEmbeddingProvider:
+    """Tests for the query embedding cache."""
+
+    async def test_repeated_query_hits_cache(self, hash_embedding_provider):
+        """Test that a repeated query, differing only in whitespace, does not reach the model."""
+        provider = CachedEmbeddingProvider(hash_embedding_provider)
+
+        first = await provider.embed_query("karar  tarihi ")
+        second = await provider.embed_query("karar tarihi")
+
+        assert first == second
+        assert hash_embedding_provider.query_calls == ["karar  tarihi "]
+        assert provider.stats()["hits"] == 1
+        assert provider.stats()["misses"] == 1
+
+    async def test_batch_embeds_only_missing_queries(self, hash_embedding_provider):
+        """Test that a batch of queries embeds only the queries missing in the cache, once each."""
+        provider = CachedEmbeddingProvider(hash_embedding_provider)
+        await provider.embed_query("a")
+
+        embeddings = await provider.embed_queries_array(["a", "b", "b", "c"])
+
+        assert embeddings.shape == (4, 32)
+        assert (embeddings[1] == embeddings[2]).all()
+        assert (embeddings[0] == await provider.embed_query_array("a")).all()
+        assert hash_embedding_provider.query_calls == ["a", "b", "c"]
+
+    async def test_lru_eviction(self, hash_embedding_provider):
+        """Test that the least recently used query is evicted first."""
+        provider = CachedEmbeddingProvider(hash_embedding_provider, max_entries=2)
+
+        await provider.embed_query("a")
+        await provider.embed_query("b")
+        await provider.embed_query("a")
+        await provider.embed_query("c")
+        await provider.embed_query("a")
+        await provider.embed_query("b")
+
+        assert hash_embedding_provider.query_calls == ["a", "b", "c", "b"]
+        assert provider.stats()["entries"] == 2
+
+    async def test_memory_limit(self, hash_embedding_provider):
+        """Test that the cache does not grow beyond its memory limit."""
+        provider = CachedEmbeddingProvider(hash_embedding_provider, max_bytes=300)
+
+        for query in ["a", "b", "c", "d"]:
+            await provider.embed_query(query)
+
+        assert provider.stats()["size_bytes"] <= 300
+        assert provider.stats()["entries"] == 2
+
+    async def test_ttl_expiry(self, hash_embedding_provider):
+        """Test that expired embeddings are computed again."""
+        provider = CachedEmbeddingProvider(hash_embedding_provider, ttl=0)
+
+        await provider.embed_query("query")
+        await provider.embed_query("query")
+
+        assert hash_embedding_provider.query_calls == ["query", "query"]
+
+    async def test_concurrent_misses_share_call(self, hash_embedding_provider):
+        """Test that concurrent identical queries reach the model once."""
+        provider = CachedEmbeddingProvider(hash_embedding_provider)
+
+        results = await asyncio.gather(*[provider.embed_query("same") for _ in range(5)])
+
+        assert all(result == results[0] for result in results)
+        assert hash_embedding_provider.query_calls == ["same"]
+
+    async def test_cancelled_first_caller_does_not_block_waiters(self):
+        """Test that cancelling the caller which started the model call still resolves the waiting callers."""
+        model = HashEmbeddingProvider(delay=0.05)
+        provider = CachedEmbeddingProvider(model)
+
+        first = asyncio.create_task(provider.embed_query("same"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(provider.embed_query("same"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await asyncio.wait_for(second, timeout=1) == await provider.embed_query("same")
+        assert first.cancelled()
+        assert model.query_calls == ["same"]
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mcp_server_qdrant.embeddings.executor import EmbeddingExecutor
+from mcp_server_qdrant.metrics import REGISTRY
+
+
+@pytest.mark.asyncio
+class TestEmbeddingExecutor:
+    """Tests for the bounded embedding executor."""
+
+    async def test_concurrency_is_bounded(self):
+        """Test that no more tasks than workers run at once and callers beyond the queue wait."""
+        executor = EmbeddingExecutor(max_workers=2, max_queue_size=1)
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def work():
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        labels = {"mode": "thread"}
+        waits_before = REGISTRY.get_sample_value("mcp_embedding_executor_wait_seconds_count", labels) or 0
+        tasks = [asyncio.ensure_future(executor.run(work)) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        assert executor.queue_depth == 6
+        assert REGISTRY.get_sample_value("mcp_embedding_executor_queue_depth", labels) == 6
+        await asyncio.gather(*tasks)
+
+        assert max_running == 2
+        stats = executor.stats()
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 6
+        assert stats["max_wait_seconds"] > 0.01
+        assert REGISTRY.get_sample_value("mcp_embedding_executor_queue_depth", labels) == 0
+        assert REGISTRY.get_sample_value("mcp_embedding_executor_wait_seconds_count", labels) == waits_before + 6
+        executor.shutdown()
+
+    async def test_exceptions_release_slots(self):
+        """Test that a failing task does not leak its slot."""
+        executor = EmbeddingExecutor(max_workers=1, max_queue_size=0)
+
+        def fail():
+            raise RuntimeError("inference failed")
+
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await executor.run(fail)
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        executor.shutdown()
+
+    async def test_process_mode(self):
+        """Test that picklable functions run in worker processes."""
+        executor = EmbeddingExecutor(max_workers=1, mode="process")
+
+        assert await executor.run(sum, [1, 2, 3]) == 6
+        executor.shutdown()
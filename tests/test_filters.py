@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+from pydantic import ValidationError
+from qdrant_client import models
+
+from mcp_server_qdrant.filters import (
+    FilterCondition,
+    QueryFilter,
+    filter_keys,
+    to_qdrant_filter,
+)
+from mcp_server_qdrant.qdrant import Entry, QdrantConnector
+
+
+def test_filter_compiles_to_qdrant_filter():
+    """Test that every kind of condition compiles into the matching Qdrant condition."""
+    query_filter = QueryFilter(
+        must=[
+            FilterCondition(key="daire", match_any=["3. Hukuk Dairesi", "4. Hukuk Dairesi"]),
+            FilterCondition(key="karar_tarihi", range={"gte": "2020-01-01T00:00:00Z"}),
+        ],
+        should=[FilterCondition(key="wordCount", range={"lt": 1000})],
+        must_not=[
+            FilterCondition(key="durum", is_empty=True),
+            QueryFilter(must=[FilterCondition(key="esas_no", match="2020/1")]),
+        ],
+    )
+
+    qdrant_filter = to_qdrant_filter(query_filter)
+
+    assert qdrant_filter.must[0].match == models.MatchAny(any=["3. Hukuk Dairesi", "4. Hukuk Dairesi"])
+    assert isinstance(qdrant_filter.must[1].range, models.DatetimeRange)
+    assert qdrant_filter.should[0].range == models.Range(lt=1000)
+    assert qdrant_filter.must_not[0] == models.IsEmptyCondition(is_empty=models.PayloadField(key="durum"))
+    assert qdrant_filter.must_not[1].must[0].match == models.MatchValue(value="2020/1")
+    assert filter_keys(qdrant_filter) == ["daire", "karar_tarihi", "wordCount", "durum", "esas_no"]
+
+
+def test_condition_requires_exactly_one_operator():
+    """Test that a condition with no or several operators is rejected."""
+    with pytest.raises(ValidationError):
+        FilterCondition(key="durum")
+    with pytest.raises(ValidationError):
+        FilterCondition(key="durum", match="KESİNLEŞTİ", is_empty=False)
+
+
+@pytest.mark.asyncio
+async def test_search_applies_filter(hash_embedding_provider):
+    """Test that the filter is applied by Qdrant in both the vector and the metadata search."""
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=hash_embedding_provider,
+    )
+    await connector.store_batch(
+        [Entry(content=f"decision {i}", text=f"decision {i}", wordCount=i * 100) for i in range(6)]
+    )
+    query_filter = to_qdrant_filter(
+        QueryFilter(
+            must=[FilterCondition(key="wordCount", range={"gte": 200, "lte": 400})],
+            must_not=[FilterCondition(key="text", match="decision 3")],
+        )
+    )
+
+    results = await connector.search("decision", query_filter=query_filter)
+    assert sorted(result["text"] for result in results) == ["decision 2", "decision 4"]
+
+    results = await connector.search_by_metadata(None, None, query_filter=query_filter)
+    assert sorted(result["text"] for result in results) == ["decision 2", "decision 4"]
@@ -0,0 +1,52 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from mcp_server_qdrant.logger import DebugSamplingFilter, JsonFormatter
+from mcp_server_qdrant.metrics import instrument_tool
+
+
+def make_record(level: int, message: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("mcp_server_qdrant.test", level, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_merges_the_arguments_and_keeps_the_extra_fields():
+    """Test that a record is formatted as one JSON document, with the fields passed in `extra`."""
+    line = JsonFormatter().format(make_record(logging.INFO, "%s results found", 3, collection="kararlar"))
+
+    document = json.loads(line)
+    assert "\n" not in line
+    assert document["level"] == "INFO"
+    assert document["logger"] == "mcp_server_qdrant.test"
+    assert document["message"] == "3 results found"
+    assert document["collection"] == "kararlar"
+
+
+def test_debug_sampling_filter_only_samples_debug_records():
+    """Test that the debug records are sampled, while the other levels are always kept."""
+    drop_all = DebugSamplingFilter(0.0)
+    assert not drop_all.filter(make_record(logging.DEBUG, "query"))
+    assert drop_all.filter(make_record(logging.INFO, "loaded"))
+    assert DebugSamplingFilter(1.0).filter(make_record(logging.DEBUG, "query"))
+
+
+@pytest.mark.asyncio
+async def test_debug_records_are_sampled_once_per_tool_call():
+    """Test that a tool call keeps either all or none of its debug records."""
+    sampling = DebugSamplingFilter(0.5)
+
+    async def tool() -> list:
+        kept = []
+        for i in range(20):
+            kept.append(sampling.filter(make_record(logging.DEBUG, "step %s", i)))
+            await asyncio.sleep(0)
+        return kept
+
+    calls = await asyncio.gather(*(instrument_tool("qdrant-find", tool)() for _ in range(50)))
+
+    assert all(len(set(kept)) == 1 for kept in calls)
+    assert {kept[0] for kept in calls} == {True, False}
@@ -0,0 +1,272 @@
+import os
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+from starlette.testclient import TestClient
+
+from mcp_server_qdrant import mcp_server
+from mcp_server_qdrant.embeddings.lazy import (
+    LazyEmbeddingProvider,
+    LazySparseEmbeddingProvider,
+)
+from mcp_server_qdrant.mcp_server import QdrantMCPServer
+from mcp_server_qdrant.settings import (
+    EmbeddingProviderSettings,
+    QdrantSettings,
+    ToolSettings,
+)
+from tests.conftest import HashEmbeddingProvider, HashSparseEmbeddingProvider
+
+
+@pytest.fixture
+def server():
+    """Fixture to provide a server using in-memory Qdrant and an offline embedding provider."""
+    with patch.dict(os.environ, {"QDRANT_URL": ":memory:", "COLLECTION_NAME": "test_collection"}):
+        return QdrantMCPServer(
+            tool_settings=ToolSettings(),
+            qdrant_settings=QdrantSettings(),
+            embedding_provider_settings=EmbeddingProviderSettings(),
+        )
+
+
+@pytest.mark.asyncio
+async def test_model_loads_in_background(server, monkeypatch):
+    """Test that the model is not loaded on construction, and the readiness endpoint reflects the loading."""
+    monkeypatch.setattr(
+        mcp_server, "create_embedding_provider", lambda settings, **kwargs: HashEmbeddingProvider()
+    )
+    # The size of the hash embeddings, not of the configured model
+    monkeypatch.setattr(mcp_server, "get_vector_size", lambda settings: HashEmbeddingProvider().vector_size)
+    assert isinstance(server.embedding_provider, LazyEmbeddingProvider)
+
+    client = TestClient(server.sse_app())
+    assert client.get("/health").status_code == 200
+    assert client.get("/ready").status_code == 503
+
+    server.start_model_loading()
+    await server.embedding_provider.wait_ready()
+
+    assert server.is_ready()
+    assert client.get("/ready").json() == {"status": "ready"}
+
+
+@pytest.mark.asyncio
+async def test_sparse_model_loads_in_background(monkeypatch):
+    """
+    Test that the sparse model is not loaded on construction, the readiness endpoint waits for it, and it
+    runs in the executor of the dense model.
+    """
+    executors = []
+
+    def create_provider(provider_class):
+        def create(settings, executor=None, **kwargs):
+            executors.append(executor)
+            return provider_class()
+
+        return create
+
+    monkeypatch.setattr(mcp_server, "create_embedding_provider", create_provider(HashEmbeddingProvider))
+    monkeypatch.setattr(mcp_server, "create_sparse_embedding_provider", create_provider(HashSparseEmbeddingProvider))
+    with patch.dict(os.environ, {"QDRANT_URL": ":memory:", "EMBEDDING_SPARSE_MODEL": "Qdrant/bm25"}):
+        server = QdrantMCPServer(
+            tool_settings=ToolSettings(),
+            qdrant_settings=QdrantSettings(),
+            embedding_provider_settings=EmbeddingProviderSettings(),
+        )
+    assert isinstance(server.sparse_embedding_provider, LazySparseEmbeddingProvider)
+    assert not server.sparse_embedding_provider.is_loaded
+    assert server.sparse_embedding_provider.get_vector_name() == "fast-sparse-bm25"
+    assert server.sparse_embedding_provider.requires_idf()
+
+    server.start_model_loading()
+    await server.embedding_provider.wait_ready()
+    await server.sparse_embedding_provider.wait_ready()
+
+    assert server.is_ready()
+    assert executors == [server.embedding_executor, server.embedding_executor]
+
+
+def test_payload_indexes_admin_route(server):
+    """Test that the admin route reports the configuration, and does not create indexes unless enabled."""
+    client = TestClient(server.sse_app())
+    assert client.get("/admin/payload-indexes").json() == {"configured": {}, "unindexed_filters": []}
+    assert client.post("/admin/payload-indexes").status_code == 405
+
+
+@pytest.mark.parametrize(
+    "environment, status_code",
+    [
+        # Enabled, but the default collection does not exist
+        ({"ADMIN_WRITE_ENABLED": "true"}, 404),
+        ({"ADMIN_WRITE_ENABLED": "true", "QDRANT_READ_ONLY": "true"}, 405),
+    ],
+)
+def test_payload_indexes_creation_is_opt_in(environment, status_code):
+    """Test that indexes are created only with admin writes enabled and outside of the read-only mode."""
+    with patch.dict(os.environ, {"QDRANT_URL": ":memory:", "COLLECTION_NAME": "test_collection", **environment}):
+        server = QdrantMCPServer(
+            tool_settings=ToolSettings(),
+            qdrant_settings=QdrantSettings(),
+            embedding_provider_settings=EmbeddingProviderSettings(),
+        )
+    client = TestClient(server.sse_app())
+    assert client.get("/admin/payload-indexes").status_code == 200
+    assert client.post("/admin/payload-indexes").status_code == status_code
+
+
+def test_payload_indexes_are_created_only_in_the_configured_collection():
+    """Test that the admin route does not index other collections, unless allowed."""
+    environment = {"QDRANT_URL": ":memory:", "COLLECTION_NAME": "test_collection", "ADMIN_WRITE_ENABLED": "true"}
+    for any_collection, status_code in (("false", 403), ("true", 404)):
+        with patch.dict(os.environ, {**environment, "ADMIN_WRITE_ANY_COLLECTION": any_collection}):
+            server = QdrantMCPServer(
+                tool_settings=ToolSettings(),
+                qdrant_settings=QdrantSettings(),
+                embedding_provider_settings=EmbeddingProviderSettings(),
+            )
+        client = TestClient(server.sse_app())
+        response = client.post("/admin/payload-indexes", params={"collection_name": "other_collection"})
+        assert response.status_code == status_code
+
+
+class StubContext:
+    async def debug(self, message: str):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_find_by_metadata_paginates(monkeypatch):
+    """Test that the metadata search tool returns a cursor, which gets the next page."""
+    monkeypatch.setattr(
+        mcp_server, "create_embedding_provider", lambda settings, **kwargs: HashEmbeddingProvider()
+    )
+    # The size of the hash embeddings, not of the configured model
+    monkeypatch.setattr(mcp_server, "get_vector_size", lambda settings: HashEmbeddingProvider().vector_size)
+    env = {"QDRANT_URL": ":memory:", "COLLECTION_NAME": "test_collection", "QDRANT_SEARCH_LIMIT": "2"}
+    with patch.dict(os.environ, env):
+        server = QdrantMCPServer(
+            tool_settings=ToolSettings(),
+            qdrant_settings=QdrantSettings(),
+            embedding_provider_settings=EmbeddingProviderSettings(),
+        )
+    store_batch = server._tool_manager.get_tool("qdrant-store-batch").fn
+    find_by_metadata = server._tool_manager.get_tool("qdrant-find-by-metadata").fn
+    entries = [{"information": f"decision {i}", "metadata": {"text": f"decision {i}", "docSource": "daire"}}
+               for i in range(3)]
+    await store_batch(StubContext(), entries)
+
+    first_page = await find_by_metadata(StubContext(), "docSource", "daire")
+    assert len(first_page) == 3
+    cursor = first_page[-1].split("'")[1]
+
+    second_page = await find_by_metadata(StubContext(), "docSource", "daire", cursor)
+    assert len(second_page) == 1
+    texts = [line.splitlines()[0] for line in first_page[:2] + second_page]
+    assert sorted(texts) == ["Content: decision 0", "Content: decision 1", "Content: decision 2"]
+
+
+@pytest.mark.asyncio
+async def test_store_batch_reports_invalid_items(monkeypatch):
+    """Test that an item with invalid metadata fails on its own, and the other items are stored."""
+    monkeypatch.setattr(
+        mcp_server, "create_embedding_provider", lambda settings, **kwargs: HashEmbeddingProvider()
+    )
+    # The size of the hash embeddings, not of the configured model
+    monkeypatch.setattr(mcp_server, "get_vector_size", lambda settings: HashEmbeddingProvider().vector_size)
+    with patch.dict(os.environ, {"QDRANT_URL": ":memory:", "COLLECTION_NAME": "test_collection"}):
+        server = QdrantMCPServer(
+            tool_settings=ToolSettings(),
+            qdrant_settings=QdrantSettings(),
+            embedding_provider_settings=EmbeddingProviderSettings(),
+        )
+    store_batch = server._tool_manager.get_tool("qdrant-store-batch").fn
+    entries = [
+        {"information": "decision 0"},
+        {"information": "decision 1", "metadata": {"wordCount": "many"}},
+        {"information": "decision 2", "metadata": {"wordCount": 2}},
+    ]
+
+    results = await store_batch(StubContext(), entries)
+
+    assert results[0] == "Remembered 2 of 3 entries in collection test_collection"
+    assert results[1].startswith("0: stored with ID")
+    assert results[2].startswith("1: failed: wordCount:")
+    assert results[3].startswith("2: stored with ID")
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_tool_latency(monkeypatch):
+    """Test that the tool calls are measured and exposed in the Prometheus format."""
+    monkeypatch.setattr(
+        mcp_server, "create_embedding_provider", lambda settings, **kwargs: HashEmbeddingProvider()
+    )
+    # The size of the hash embeddings, not of the configured model
+    monkeypatch.setattr(mcp_server, "get_vector_size", lambda settings: HashEmbeddingProvider().vector_size)
+    with patch.dict(os.environ, {"QDRANT_URL": ":memory:"}):
+        server = QdrantMCPServer(
+            tool_settings=ToolSettings(),
+            qdrant_settings=QdrantSettings(),
+            embedding_provider_settings=EmbeddingProviderSettings(),
+        )
+    store = server._tool_manager.get_tool("qdrant-store").fn
+    find = server._tool_manager.get_tool("qdrant-find").fn
+    await store(StubContext(), "tapu iptali", "metrics_collection")
+    await find(StubContext(), "tapu iptali", collection_name="metrics_collection")
+
+    response = TestClient(server.sse_app()).get("/metrics")
+
+    assert response.status_code == 200
+    metrics = response.text
+    assert 'mcp_tool_duration_seconds_count{collection="metrics_collection",tool="qdrant-find"}' in metrics
+    assert 'mcp_qdrant_duration_seconds_count{collection="metrics_collection",operation="query_points"' in metrics
+    assert 'mcp_embed_duration_seconds_count{kind="query",tool="qdrant-find"}' in metrics
+    assert 'mcp_format_duration_seconds_count{tool="qdrant-find"}' in metrics
+
+
+def test_metrics_are_aggregated_over_worker_processes(tmp_path):
+    """Test that with PROMETHEUS_MULTIPROC_DIR, the metrics of every worker process are served by any of them."""
+    environment = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    count_error = "from mcp_server_qdrant.metrics import ERRORS; ERRORS.labels('qdrant-find', 'kararlar', 'E').inc()"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", count_error], env=environment, check=True)
+
+    scrape = "import sys; from mcp_server_qdrant.metrics import latest; sys.stdout.write(latest().decode())"
+    metrics = subprocess.run(
+        [sys.executable, "-c", scrape], env=environment, check=True, capture_output=True, text=True
+    ).stdout
+
+    assert 'mcp_errors_total{collection="kararlar",error="E",tool="qdrant-find"} 2.0' in metrics
+
+
+def test_streamable_http_app_starts_model_loading(monkeypatch):
+    """Test that the app of the streamable HTTP transport loads the model on startup and serves the probes."""
+    monkeypatch.setattr(
+        mcp_server, "create_embedding_provider", lambda settings, **kwargs: HashEmbeddingProvider()
+    )
+    # The size of the hash embeddings, not of the configured model
+    monkeypatch.setattr(mcp_server, "get_vector_size", lambda settings: HashEmbeddingProvider().vector_size)
+    with patch.dict(os.environ, {"QDRANT_URL": ":memory:", "STATELESS_HTTP": "true"}):
+        server = QdrantMCPServer(
+            tool_settings=ToolSettings(),
+            qdrant_settings=QdrantSettings(),
+            embedding_provider_settings=EmbeddingProviderSettings(),
+        )
+    assert server.settings.stateless_http
+
+    with TestClient(server.http_app("streamable-http")) as client:
+        # The model loads on the event loop of the client
+        for _ in range(100):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.01)
+        assert client.get("/ready").json() == {"status": "ready"}
+        response = client.post(
+            "/mcp",
+            json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+            headers={"Accept": "application/json, text/event-stream"},
+        )
+        assert response.status_code == 200
+        assert "qdrant-find" in response.text
@@ -0,0 +1,517 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from httpx import Headers
+from qdrant_client import models
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+from mcp_server_qdrant.embeddings.lazy import LazyEmbeddingProvider
+from mcp_server_qdrant.qdrant import (
+    CollectionProfile,
+    ConnectionProfile,
+    Entry,
+    PayloadProjection,
+    QdrantConnector,
+    decode_cursor,
+    encode_cursor,
+    make_snippet,
+)
+from mcp_server_qdrant.result_cache import ResultCache
+from tests.conftest import HashSparseEmbeddingProvider
+
+
+@pytest.fixture
+async def connector(hash_embedding_provider):
+    """Fixture to provide a QdrantConnector with in-memory Qdrant client and an offline embedding provider."""
+    return QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=hash_embedding_provider,
+    )
+
+
+@pytest.mark.asyncio
+async def test_store_batch_embeds_in_batches(connector, hash_embedding_provider):
+    """Test that the entries are embedded in batches and all of them are stored."""
+    entries = [Entry(content=f"decision number {i}", text=f"text {i}") for i in range(10)]
+
+    results = await connector.store_batch(entries, batch_size=4)
+
+    assert [len(call) for call in hash_embedding_provider.document_calls] == [4, 4, 2]
+    assert [result.index for result in results] == list(range(10))
+    assert all(result.success and result.id for result in results)
+    count = await connector._client.count(connector._default_collection_name)
+    assert count.count == 10
+
+
+@pytest.mark.asyncio
+async def test_store_batch_reports_failures(connector, hash_embedding_provider):
+    """Test that a failing batch is reported per item without stopping the other batches."""
+    original_embed_documents = hash_embedding_provider.embed_documents
+
+    async def flaky_embed_documents(documents):
+        if "broken" in documents:
+            raise RuntimeError("model crashed")
+        return await original_embed_documents(documents)
+
+    hash_embedding_provider.embed_documents = flaky_embed_documents
+    entries = [
+        Entry(content="first"),
+        Entry(content=""),
+        Entry(content="broken"),
+        Entry(content="last"),
+    ]
+
+    results = await connector.store_batch(entries, batch_size=1)
+
+    assert [result.success for result in results] == [True, False, False, True]
+    assert results[1].error == "Empty content"
+    assert "model crashed" in results[2].error
+
+
+@pytest.mark.asyncio
+async def test_collection_info_is_cached(connector):
+    """Test that the search path does not check the collection existence on every call."""
+    await connector.store_batch([Entry(content="cached collection")])
+    info = await connector.get_collection_info(connector._default_collection_name)
+    assert info.exists
+    assert info.vector_size == 32
+    assert info.vector_names == ["test-hash-embedding"]
+
+    calls = 0
+    original_collection_exists = connector._client.collection_exists
+
+    async def counting_collection_exists(collection_name):
+        nonlocal calls
+        calls += 1
+        return await original_collection_exists(collection_name)
+
+    connector._client.collection_exists = counting_collection_exists
+    await connector.search("cached")
+    await connector.search_by_metadata("text", "cached")
+    assert calls == 0
+
+
+@pytest.mark.asyncio
+async def test_store_persists_named_vectors(connector):
+    """Test that the stored points carry the embedding under the vector name of the provider."""
+    await connector.store(Entry(content="named vector", text="named vector"))
+
+    points, _ = await connector._client.scroll(
+        connector._default_collection_name, with_vectors=True
+    )
+    assert len(points) == 1
+    assert list(points[0].vector.keys()) == ["test-hash-embedding"]
+    assert len(points[0].vector["test-hash-embedding"]) == 32
+
+    results = await connector.search("named vector")
+    assert [result["text"] for result in results] == ["named vector"]
+
+
+@pytest.mark.asyncio
+async def test_search_uses_existing_unnamed_vector(connector):
+    """Test that collections created with a single unnamed vector keep working."""
+    collection_name = connector._default_collection_name
+    await connector._client.create_collection(
+        collection_name,
+        vectors_config=models.VectorParams(size=32, distance=models.Distance.COSINE),
+    )
+
+    await connector.store(Entry(content="unnamed vector", text="unnamed vector"))
+
+    points, _ = await connector._client.scroll(collection_name, with_vectors=True)
+    assert isinstance(points[0].vector, list)
+    results = await connector.search("unnamed vector")
+    assert [result["text"] for result in results] == ["unnamed vector"]
+
+
+@pytest.mark.asyncio
+async def test_collection_profile_is_applied(hash_embedding_provider):
+    """Test that new collections are created with the profile and searches use its parameters."""
+    profile = CollectionProfile(
+        quantization="scalar",
+        on_disk=True,
+        hnsw_m=32,
+        hnsw_ef_construct=256,
+        indexing_threshold=50000,
+        search_hnsw_ef=128,
+        search_rescore=True,
+        search_oversampling=2.0,
+    )
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=hash_embedding_provider,
+        collection_profile=profile,
+    )
+    created = {}
+    original_create_collection = connector._client.create_collection
+
+    async def recording_create_collection(**kwargs):
+        created.update(kwargs)
+        return await original_create_collection(**kwargs)
+
+    connector._client.create_collection = recording_create_collection
+    await connector.store(Entry(content="tuned", text="tuned"))
+
+    assert created["vectors_config"]["test-hash-embedding"].on_disk
+    assert created["hnsw_config"] == models.HnswConfigDiff(m=32, ef_construct=256)
+    assert created["optimizers_config"].indexing_threshold == 50000
+    assert created["quantization_config"].scalar.type == models.ScalarType.INT8
+
+    queries = []
+    original_query_points = connector._client.query_points
+
+    async def recording_query_points(**kwargs):
+        queries.append(kwargs)
+        return await original_query_points(**kwargs)
+
+    connector._client.query_points = recording_query_points
+    with pytest.warns(UserWarning):
+        results = await connector.search("tuned")
+    assert [result["text"] for result in results] == ["tuned"]
+    search_params = queries[0]["search_params"]
+    assert search_params.hnsw_ef == 128
+    assert search_params.quantization.oversampling == 2.0
+
+
+def test_default_collection_profile_keeps_server_defaults():
+    """Test that the default profile does not override any server default."""
+    profile = CollectionProfile()
+    assert profile.hnsw_config() is None
+    assert profile.quantization_config() is None
+    assert profile.optimizers_config() is None
+    assert profile.search_params() is None
+
+
+def test_connection_profile_client_kwargs():
+    """Test that the pool and keep-alive settings reach the transport the client uses."""
+    rest = ConnectionProfile(timeout=5, pool_size=8, keepalive=30.0).client_kwargs()
+    assert rest["timeout"] == 5
+    assert rest["prefer_grpc"] is False
+    assert rest["limits"].max_connections == 8
+    assert rest["limits"].keepalive_expiry == 30.0
+    assert "pool_size" not in rest
+
+    grpc = ConnectionProfile(prefer_grpc=True, grpc_port=7334, pool_size=4, keepalive=10.0).client_kwargs()
+    assert grpc["grpc_port"] == 7334
+    assert grpc["pool_size"] == 4
+    assert grpc["grpc_options"] == {"grpc.keepalive_time_ms": 10000}
+    assert "limits" not in grpc
+
+
+@pytest.mark.asyncio
+async def test_search_projects_payload(connector):
+    """Test that the searches request only the projected payload fields and cut long texts."""
+    long_text = " ".join(["filler"] * 50 + ["tapu", "iptali"] + ["filler"] * 50)
+    await connector.store(Entry(content="projection", text=long_text, title="unused", url="https://example.com"))
+    requests = []
+    original_query_points = connector._client.query_points
+
+    async def recording_query_points(**kwargs):
+        requests.append(kwargs)
+        return await original_query_points(**kwargs)
+
+    connector._client.query_points = recording_query_points
+
+    results = await connector.search("projection")
+    assert requests[-1]["with_payload"] == [
+        "id", "karar_no", "karar_tarihi", "daire", "esas_no", "durum", "imported_at", "text"
+    ]
+    assert results[0]["text"] == long_text
+    assert "title" not in results[0]
+
+    projection = PayloadProjection(include=["text", "url"], exclude=["url"], max_text_length=40)
+    results = await connector.search("tapu iptali", projection=projection)
+    assert requests[-1]["with_payload"] == ["text"]
+    assert "tapu iptali" in results[0]["text"]
+    assert len(results[0]["text"]) <= 42
+
+    results = await connector.search_by_metadata(
+        "title", "unused", projection=PayloadProjection(include=["title"])
+    )
+    assert results[0]["title"] == "unused"
+    assert results[0]["text"] is None
+
+
+def test_make_snippet():
+    """Test that the snippets are bounded and marked where the text is cut."""
+    assert make_snippet("short text", 20) == "short text"
+    assert make_snippet("one two three four five", 10) == "one two…"
+    snippet = make_snippet("alpha beta gamma delta epsilon zeta eta theta", 16, "delta")
+    assert "delta" in snippet
+    assert snippet.startswith("…") and snippet.endswith("…")
+
+
+@pytest.mark.asyncio
+async def test_iter_by_metadata_streams_pages(connector):
+    """Test that all the matching points are streamed page by page."""
+    entries = [Entry(content=f"decision {i}", text=f"decision {i}", title="daire" if i % 2 else "other")
+               for i in range(7)]
+    await connector.store_batch(entries)
+
+    pages = [
+        page async for page in connector.iter_by_metadata("title", "daire", page_size=2)
+    ]
+
+    assert [len(page) for page in pages] == [2, 1]
+    assert sorted(result["text"] for page in pages for result in page) == [
+        "decision 1", "decision 3", "decision 5"
+    ]
+
+
+def test_cursor_is_bound_to_its_scope():
+    """Test that a cursor decodes to its offset only for the query it was created for."""
+    offset = uuid.uuid4().hex
+    cursor = encode_cursor(offset, "collection", "durum", "KESİNLEŞTİ")
+    assert decode_cursor(cursor, "collection", "durum", "KESİNLEŞTİ") == offset
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "collection", "durum", "BOZMA")
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor", "collection")
+
+
+@pytest.mark.asyncio
+async def test_payload_indexes_are_created_and_unindexed_filters_reported(hash_embedding_provider):
+    """Test that the configured indexes are created with the collection and unindexed filters are reported."""
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=hash_embedding_provider,
+        payload_indexes={"title": "keyword", "wordCount": "integer"},
+    )
+    indexed = {}
+
+    async def recording_create_payload_index(collection_name, field_name, field_schema):
+        indexed[field_name] = field_schema
+
+    connector._client.create_payload_index = recording_create_payload_index
+    await connector.store(Entry(content="indexed", title="indexed"))
+    assert indexed == {
+        "title": models.PayloadSchemaType.KEYWORD,
+        "wordCount": models.PayloadSchemaType.INTEGER,
+    }
+
+    # Local mode does not keep payload indexes, so every filter is reported
+    await connector.search_by_metadata("title", "indexed")
+    await connector.search_by_metadata("title", "indexed")
+    await connector.search_by_metadata("url", "indexed")
+    assert connector.unindexed_filters() == [
+        {"collection_name": connector._default_collection_name, "field": "title", "count": 2},
+        {"collection_name": connector._default_collection_name, "field": "url", "count": 1},
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fusion", ["rrf", "dbsf"])
+async def test_hybrid_search_fuses_dense_and_sparse(hash_embedding_provider, fusion):
+    """Test that hybrid collections store both vectors and search them with a single fused query."""
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=hash_embedding_provider,
+        sparse_embedding_provider=HashSparseEmbeddingProvider(),
+        hybrid_fusion=fusion,
+    )
+    await connector.store_batch(
+        [Entry(content=f"esas {i} karar", text=f"esas {i} karar") for i in ["2019/12", "2020/7", "2021/3"]]
+    )
+    info = await connector.get_collection_info(connector._default_collection_name)
+    assert info.sparse_vector_names == ["test-hash-sparse"]
+
+    requests = []
+    original_query_points = connector._client.query_points
+
+    async def recording_query_points(**kwargs):
+        requests.append(kwargs)
+        return await original_query_points(**kwargs)
+
+    connector._client.query_points = recording_query_points
+    results = await connector.search("2020/7", limit=1)
+
+    assert [result["text"] for result in results] == ["esas 2020/7 karar"]
+    assert len(requests) == 1
+    assert [prefetch.using for prefetch in requests[0]["prefetch"]] == [
+        "test-hash-embedding", "test-hash-sparse"
+    ]
+    assert requests[0]["query"].fusion == models.Fusion(fusion)
+
+
+@pytest.mark.asyncio
+async def test_search_collections_merges_results(connector, hash_embedding_provider):
+    """Test that several collections are searched with one embedding and their best results are merged."""
+    prefix = uuid.uuid4().hex
+    for court, texts in {"daire1": ["tapu iptali", "kira alacağı"], "daire2": ["tapu iptali ve tescil"],
+                         "daire3": ["işçilik alacağı"]}.items():
+        await connector.store_batch(
+            [Entry(content=text, text=text) for text in texts], collection_name=f"{prefix}_{court}"
+        )
+    original_query_points = connector._client.query_points
+
+    async def slow_query_points(**kwargs):
+        if kwargs["collection_name"].endswith("daire3"):
+            await asyncio.sleep(1)
+        return await original_query_points(**kwargs)
+
+    connector._client.query_points = slow_query_points
+    hash_embedding_provider.query_calls.clear()
+
+    results, failed_collections = await connector.search_collections(
+        "tapu iptali", [f"{prefix}_*"], limit=2, timeout=0.2
+    )
+
+    assert hash_embedding_provider.query_calls == ["tapu iptali"]
+    assert failed_collections == [f"{prefix}_daire3"]
+    assert [result["text"] for result in results] == ["tapu iptali", "tapu iptali ve tescil"]
+    assert [result["collection_name"] for result in results] == [f"{prefix}_daire1", f"{prefix}_daire2"]
+
+
+@pytest.mark.asyncio
+async def test_search_batch_sends_a_single_request(connector):
+    """Test that several queries are searched with one request and their results are grouped."""
+    await connector.store_batch(
+        [Entry(content=text, text=text) for text in ["tapu iptali", "kira alacağı", "işçilik alacağı"]]
+    )
+    requests = []
+    original_query_batch_points = connector._client.query_batch_points
+
+    async def recording_query_batch_points(**kwargs):
+        requests.append(kwargs)
+        return await original_query_batch_points(**kwargs)
+
+    connector._client.query_batch_points = recording_query_batch_points
+
+    results = await connector.search_batch(["tapu iptali", "kira alacağı", "boşanma"], limit=1)
+
+    assert len(requests) == 1
+    assert len(requests[0]["requests"]) == 3
+    assert [[result["text"] for result in entries] for entries in results[:2]] == [
+        ["tapu iptali"], ["kira alacağı"]
+    ]
+    assert len(results[2]) == 1
+    assert await connector.search_batch(["tapu"], collection_name="missing") == [[]]
+
+
+@pytest.mark.asyncio
+async def test_collection_info_refreshes_on_not_found(connector):
+    """Test that a collection deleted behind the connector's back is reported as missing."""
+    await connector.store_batch([Entry(content="soon deleted")])
+    collection_name = connector._default_collection_name
+    assert (await connector.get_collection_info(collection_name)).exists
+
+    await connector._client.delete_collection(collection_name)
+
+    assert await connector.search("deleted") == []
+    assert not (await connector.get_collection_info(collection_name)).exists
+
+
+@pytest.mark.asyncio
+async def test_server_inference_falls_back_to_local_embeddings(hash_embedding_provider):
+    """Test that the connector embeds locally once the server rejects models.Document."""
+    provider = LazyEmbeddingProvider(lambda: hash_embedding_provider, vector_size=32)
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=provider,
+    )
+    # Local mode cannot do server inference, pretend to be connected to a server which lacks it
+    connector._server_inference_model = "sentence-transformers/all-MiniLM-L6-v2"
+    original_upsert = connector._client.upsert
+    original_query_points = connector._client.query_points
+    rejected = []
+
+    def reject_documents(original):
+        async def request(*args, **kwargs):
+            vectors = [
+                vector
+                for point in kwargs.get("points", [])
+                for vector in point.vector.values()
+            ] + [kwargs.get("query")]
+            if any(isinstance(vector, models.Document) for vector in vectors):
+                rejected.append(original.__name__)
+                raise UnexpectedResponse(
+                    400, "Bad Request", b'{"status": {"error": "Inference is not configured"}}', Headers()
+                )
+            return await original(*args, **kwargs)
+
+        return request
+
+    connector._client.upsert = reject_documents(original_upsert)
+    connector._client.query_points = reject_documents(original_query_points)
+    assert not provider.is_loaded
+
+    await connector.store_batch([Entry(content="server side", text="server side")])
+    assert rejected == ["upsert"]
+    assert connector._server_inference_model is None
+
+    results = await connector.search("server side")
+    assert [result["text"] for result in results] == ["server side"]
+    assert rejected == ["upsert"]
+    assert provider.is_loaded
+
+
+@pytest.mark.asyncio
+async def test_collection_creation_waits_for_the_model_off_the_loop(hash_embedding_provider):
+    """Test that creating a collection while the model loads does not block the event loop."""
+
+    def slow_factory():
+        time.sleep(0.3)
+        return hash_embedding_provider
+
+    provider = LazyEmbeddingProvider(slow_factory)
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=provider,
+    )
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker = asyncio.ensure_future(tick())
+    provider.start_loading()
+    await connector.store(Entry(content="tapu iptali"))
+    ticker.cancel()
+
+    assert provider.is_loaded
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_cached_until_a_write(hash_embedding_provider):
+    """Test that repeated searches reuse the cached results and a store drops them."""
+    connector = QdrantConnector(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name=f"test_collection_{uuid.uuid4().hex}",
+        embedding_provider=hash_embedding_provider,
+        result_cache=ResultCache(),
+    )
+    await connector.store(Entry(content="tapu iptali", text="tapu iptali", title="daire"))
+
+    first = await connector.search("tapu iptali")
+    first[0]["text"] = "modified by the caller"
+    second = await connector.search("tapu iptali")
+    await connector.search_by_metadata("title", "daire")
+    await connector.search_by_metadata("title", "daire")
+
+    assert second[0]["text"] == "tapu iptali"
+    assert hash_embedding_provider.query_calls == ["tapu iptali"]
+    assert connector.result_cache_stats()["hits"] == 2
+
+    await connector.store(Entry(content="kira alacağı", text="kira alacağı", title="daire"))
+
+    assert len(await connector.search("tapu iptali")) == 2
+    assert len(await connector.search_by_metadata("title", "daire")) == 2
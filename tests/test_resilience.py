@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from httpx import Headers
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+from mcp_server_qdrant.resilience import (
+    CircuitOpenError,
+    Resilience,
+    ResiliencePolicy,
+    is_transient_error,
+)
+
+
+def unexpected_response(status_code: int) -> UnexpectedResponse:
+    return UnexpectedResponse(status_code, "error", b"{}", Headers())
+
+
+def flaky(failures: int, error: Exception):
+    """A request failing `failures` times before it succeeds."""
+    calls = []
+
+    async def request():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return "ok"
+
+    return request, calls
+
+
+def test_is_transient_error():
+    """Test that timeouts, rate limiting and unavailable servers are transient, client errors are not."""
+    assert is_transient_error(asyncio.TimeoutError())
+    assert is_transient_error(ConnectionResetError())
+    assert is_transient_error(unexpected_response(429))
+    assert is_transient_error(unexpected_response(503))
+    assert not is_transient_error(unexpected_response(404))
+    assert not is_transient_error(ValueError("bad request"))
+
+
+@pytest.mark.asyncio
+class TestResilience:
+    """Tests for the retries, hedging and circuit breaker."""
+
+    async def test_transient_failures_are_retried(self):
+        """Test that a transient failure is retried and counted."""
+        resilience = Resilience("qdrant", ResiliencePolicy(retry_base_delay=0.001))
+        request, calls = flaky(2, unexpected_response(503))
+
+        assert await resilience.call("query_points", request) == "ok"
+        assert len(calls) == 3
+        assert resilience.stats()["operations"]["query_points"]["retries"] == 2
+
+    async def test_other_failures_and_writes_are_not_retried(self):
+        """Test that client errors and non-idempotent calls are tried once."""
+        resilience = Resilience("qdrant", ResiliencePolicy(retry_base_delay=0.001))
+        request, calls = flaky(1, unexpected_response(404))
+        with pytest.raises(UnexpectedResponse):
+            await resilience.call("query_points", request)
+
+        write, write_calls = flaky(1, unexpected_response(503))
+        with pytest.raises(UnexpectedResponse):
+            await resilience.call("create_collection", write, idempotent=False)
+
+        assert len(calls) == 1
+        assert len(write_calls) == 1
+
+    async def test_circuit_opens_and_recovers(self):
+        """Test that the circuit fails fast after repeated failures and closes after a successful trial."""
+        resilience = Resilience(
+            "qdrant", ResiliencePolicy(retry_attempts=1, failure_threshold=2, reset_timeout=0.05)
+        )
+        request, calls = flaky(2, ConnectionResetError())
+        for _ in range(2):
+            with pytest.raises(ConnectionResetError):
+                await resilience.call("query_points", request)
+
+        with pytest.raises(CircuitOpenError):
+            await resilience.call("query_points", request)
+        assert len(calls) == 2
+        assert resilience.stats()["circuit"] == "open"
+
+        await asyncio.sleep(0.06)
+        assert await resilience.call("query_points", request) == "ok"
+        assert resilience.stats()["circuit"] == "closed"
+        assert resilience.stats()["operations"]["query_points"]["rejected"] == 1
+
+    async def test_slow_read_is_hedged(self):
+        """Test that a read slower than the hedge delay is sent again and the faster answer is used."""
+        resilience = Resilience("qdrant", ResiliencePolicy(hedge=True, hedge_delay=0.01))
+        delays = [1.0, 0.0]
+
+        async def request():
+            delay = delays.pop(0)
+            await asyncio.sleep(delay)
+            return delay
+
+        assert await resilience.call("query_points", request, hedge=True) == 0.0
+        operation = resilience.stats()["operations"]["query_points"]
+        assert operation["hedges"] == 1
+        assert operation["hedge_wins"] == 1
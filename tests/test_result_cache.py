@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from mcp_server_qdrant.result_cache import ResultCache
+
+
+@pytest.mark.asyncio
+class TestResultCache:
+    """Tests for the search result cache."""
+
+    async def test_concurrent_misses_share_one_call(self):
+        """Test that concurrent misses for the same key wait for a single computation."""
+        cache = ResultCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["result"]
+
+        results = await asyncio.gather(*(cache.get_or_compute("kararlar", "key", compute) for _ in range(5)))
+
+        assert results == [["result"]] * 5
+        assert len(calls) == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hits"] == 4
+
+    async def test_invalidate_drops_only_the_collection(self):
+        """Test that invalidating a collection drops its results and keeps the others."""
+        cache = ResultCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        await cache.get_or_compute("a", "key", compute)
+        await cache.get_or_compute("b", "key", compute)
+        cache.invalidate("a")
+
+        assert await cache.get_or_compute("a", "key", compute) == 3
+        assert await cache.get_or_compute("b", "key", compute) == 2
+        assert cache.stats()["invalidations"] == 1
+
+    async def test_result_computed_during_a_write_is_not_cached(self):
+        """Test that a result computed while the collection is written to is not cached."""
+        cache = ResultCache()
+
+        async def compute():
+            cache.invalidate("kararlar")
+            return "stale"
+
+        assert await cache.get_or_compute("kararlar", "key", compute) == "stale"
+        assert cache.stats()["entries"] == 0
+
+    async def test_failures_are_not_cached(self):
+        """Test that a failed computation is raised to the callers and tried again on the next call."""
+        cache = ResultCache()
+
+        async def fail():
+            raise RuntimeError("Qdrant is down")
+
+        async def succeed():
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("kararlar", "key", fail)
+        assert await cache.get_or_compute("kararlar", "key", succeed) == "ok"
+
+    async def test_lru_eviction_and_ttl_expiry(self):
+        """Test that the least recently used result is evicted and expired results are computed again."""
+        cache = ResultCache(max_entries=2, ttl=0.05)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            return len(calls)
+
+        await cache.get_or_compute("kararlar", "a", compute)
+        await cache.get_or_compute("kararlar", "b", compute)
+        await cache.get_or_compute("kararlar", "c", compute)
+        assert cache.stats()["entries"] == 2
+        assert await cache.get_or_compute("kararlar", "a", compute) == 4
+
+        await asyncio.sleep(0.06)
+        assert await cache.get_or_compute("kararlar", "a", compute) == 5
+
+    async def test_cancelled_caller_does_not_cancel_the_waiters(self):
+        """Test that cancelling the caller which started a computation, e.g. on a timeout, keeps it for the others."""
+        cache = ResultCache()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        first = asyncio.create_task(cache.get_or_compute("kararlar", "key", compute))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_compute("kararlar", "key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await asyncio.wait_for(second, timeout=1) == "result"
+        assert first.cancelled()
+        assert len(calls) == 1
+        assert await cache.get_or_compute("kararlar", "key", compute) == "result"
+
+    async def test_computation_is_cancelled_without_callers(self):
+        """Test that a computation nobody waits for anymore is cancelled."""
+        cache = ResultCache()
+        cancelled = asyncio.Event()
+
+        async def compute():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_compute("kararlar", "key", compute), timeout=0.01)
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert cache.stats()["entries"] == 0
@@ -0,0 +1,121 @@
+import json
+import sys
+
+import numpy as np
+import onnxruntime as ort
+import pytest
+
+from mcp_server_qdrant.embeddings.fastembed import load_model
+from mcp_server_qdrant.embeddings.shared_weights import (
+    configure_shared_session,
+    export_shared_model,
+    is_shared_session,
+    shared_model_dir,
+)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    """A model directory with a small ONNX model and a tokenizer file."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    weights = numpy_helper.from_array(np.arange(64 * 32, dtype=np.float32).reshape(64, 32) / 1000, "weights")
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["x", "weights"], ["y"])],
+        "model",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["batch", 64])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, ["batch", 32])],
+        [weights],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    directory = tmp_path / "model"
+    (directory / "onnx").mkdir(parents=True)
+    onnx.save(model, str(directory / "onnx" / "model.onnx"))
+    (directory / "tokenizer.json").write_text("{}")
+    return directory
+
+
+@pytest.fixture
+def model_cache(tmp_path, monkeypatch):
+    """A model cache holding a small stand-in of MODEL_NAME, like a download from the Hugging Face hub."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    vocabulary = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "[SEP]": 3, "tapu": 4, "iptali": 5, "karar": 6}
+    rng = np.random.default_rng(0)
+    graph = helper.make_graph(
+        [
+            helper.make_node("Gather", ["embeddings", "input_ids"], ["hidden"]),
+            helper.make_node("MatMul", ["hidden", "weights"], ["last_hidden_state"]),
+        ],
+        "model",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+            helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"]),
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", 64])],
+        [
+            numpy_helper.from_array(rng.standard_normal((len(vocabulary), 64)).astype(np.float32), "embeddings"),
+            numpy_helper.from_array(rng.standard_normal((64, 64)).astype(np.float32), "weights"),
+        ],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+
+    repository = tmp_path / "cache" / "models--Qdrant--all-MiniLM-L6-v2-onnx"
+    snapshot = repository / "snapshots" / "main"
+    snapshot.mkdir(parents=True)
+    (repository / "refs").mkdir()
+    (repository / "refs" / "main").write_text("main")
+    onnx.save(model, str(snapshot / "model.onnx"))
+    tokenizer = Tokenizer(models.WordLevel(vocabulary, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.save(str(snapshot / "tokenizer.json"))
+    (snapshot / "config.json").write_text(json.dumps({"pad_token_id": 0}))
+    (snapshot / "tokenizer_config.json").write_text(json.dumps({"model_max_length": 32, "pad_token": "[PAD]"}))
+    special_tokens = {"pad_token": "[PAD]", "unk_token": "[UNK]", "cls_token": "[CLS]", "sep_token": "[SEP]"}
+    (snapshot / "special_tokens_map.json").write_text(json.dumps(special_tokens))
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+    return tmp_path / "cache"
+
+
+def test_exported_model_keeps_its_weights_in_an_external_file(model_dir, tmp_path):
+    """Test that the exported model computes the same results, with the weights in a file next to it."""
+    target_dir = export_shared_model(model_dir, "onnx/model.onnx", tmp_path / "shared" / "model")
+
+    assert (target_dir / "tokenizer.json").exists()
+    assert (target_dir / "onnx" / "model.onnx.data").stat().st_size >= 64 * 32 * 4
+    assert (target_dir / "onnx" / "model.onnx").stat().st_size < 1024
+
+    options = ort.SessionOptions()
+    configure_shared_session(options)
+    shared = ort.InferenceSession(str(target_dir / "onnx" / "model.onnx"), options, providers=["CPUExecutionProvider"])
+    original = ort.InferenceSession(str(model_dir / "onnx" / "model.onnx"), providers=["CPUExecutionProvider"])
+    x = np.ones((2, 64), dtype=np.float32)
+    np.testing.assert_allclose(shared.run(None, {"x": x})[0], original.run(None, {"x": x})[0], rtol=1e-6)
+
+    # Exporting again reuses the shared copy
+    assert export_shared_model(model_dir, "onnx/model.onnx", target_dir) == target_dir
+    assert not list((tmp_path / "shared").glob("*.tmp"))
+
+
+def test_shared_model_memory_maps_its_weights(model_cache):
+    """Test that the model loaded with shared weights runs the exported copy, with the shared session options."""
+    shared = load_model(MODEL_NAME, str(model_cache), shared_weights=True)
+
+    weights_file = shared_model_dir(model_cache, MODEL_NAME) / "model.onnx.data"
+    assert weights_file.exists()
+    assert is_shared_session(shared.model)
+    if sys.platform == "linux":
+        with open("/proc/self/maps") as maps:
+            assert str(weights_file) in maps.read()
+
+    private = load_model(MODEL_NAME, str(model_cache))
+    assert not is_shared_session(private.model.model)
+    query = ["tapu iptali karar"]
+    np.testing.assert_allclose(list(shared.query_embed(query)), list(private.query_embed(query)), rtol=1e-5)
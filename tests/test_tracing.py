@@ -0,0 +1,68 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from mcp_server_qdrant import mcp_server
+from mcp_server_qdrant.mcp_server import QdrantMCPServer
+from mcp_server_qdrant.settings import (
+    EmbeddingProviderSettings,
+    QdrantSettings,
+    ToolSettings,
+    TracingSettings,
+)
+from mcp_server_qdrant.tracing import setup_tracing, shutdown_tracing, span
+from tests.conftest import HashEmbeddingProvider
+
+
+class StubContext:
+    async def debug(self, message: str):
+        pass
+
+
+def test_span_is_a_noop_without_tracing():
+    """Test that spans can be used and annotated while tracing is disabled."""
+    with patch.dict(os.environ, {"TRACING_EXPORTER": "none"}):
+        assert not setup_tracing(TracingSettings())
+    with span("query_points", {"qdrant.limit": 10}) as current_span:
+        current_span.set_attribute("qdrant.hits", 3)
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_traced_to_a_file(tmp_path, monkeypatch):
+    """Test that a tool call is exported as a root span with the embedding and Qdrant spans as children."""
+    pytest.importorskip("opentelemetry.sdk")
+    monkeypatch.setattr(
+        mcp_server, "create_embedding_provider", lambda settings, **kwargs: HashEmbeddingProvider()
+    )
+    # The size of the hash embeddings, not of the configured model
+    monkeypatch.setattr(mcp_server, "get_vector_size", lambda settings: HashEmbeddingProvider().vector_size)
+    trace_file = tmp_path / "traces.jsonl"
+    with patch.dict(os.environ, {"TRACING_EXPORTER": "file", "TRACING_FILE": str(trace_file)}):
+        assert setup_tracing(TracingSettings())
+    try:
+        with patch.dict(os.environ, {"QDRANT_URL": ":memory:"}):
+            server = QdrantMCPServer(
+                tool_settings=ToolSettings(),
+                qdrant_settings=QdrantSettings(),
+                embedding_provider_settings=EmbeddingProviderSettings(),
+            )
+        store = server._tool_manager.get_tool("qdrant-store").fn
+        find = server._tool_manager.get_tool("qdrant-find").fn
+        await store(StubContext(), "tapu iptali", "traced_collection")
+        await find(StubContext(), "tapu iptali", collection_name="traced_collection")
+    finally:
+        shutdown_tracing()
+
+    spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+    root = next(s for s in spans if s["name"] == "qdrant-find")
+    assert root["parent_id"] is None
+    assert root["attributes"]["db.collection.name"] == "traced_collection"
+    assert root["attributes"]["mcp.hits"] == 1
+
+    children = {s["name"]: s for s in spans if s["context"]["trace_id"] == root["context"]["trace_id"]}
+    assert {"embed_query", "query_points", "format_results"} <= set(children)
+    assert children["embed_query"]["attributes"]["embedding.dimension"] == HashEmbeddingProvider().get_vector_size()
+    assert children["query_points"]["attributes"]["qdrant.limit"] == server.qdrant_settings.search_limit
+    assert children["query_points"]["attributes"]["qdrant.hits"] == 1